@@ -4,8 +4,11 @@ DAS - 당직 업무 자동화 시스템
 
 실행: streamlit run app.py
 """
+from datetime import date
+
 import streamlit as st
-from config import APP_TITLE, APP_VERSION
+from config import APP_TITLE, APP_VERSION, DB_BACKEND
+from services import db, payment_service
 
 # ── 페이지 설정 ──
 st.set_page_config(
@@ -15,6 +18,9 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# 발령/변경 쓰기 → 당직비 스냅샷 갱신 대기 (각 페이지는 page_header에서 등록)
+payment_service.register_listeners()
+
 # ── 사이드바 ──
 with st.sidebar:
     st.title("🏭 DAS")
@@ -34,19 +40,34 @@ with st.sidebar:
 st.title(APP_TITLE)
 st.markdown("---")
 
+# 대시보드 지표 (RPC 한 번으로 조회, 실패 시 "-" 표시)
+try:
+    stats = db.table_stats(month=date.today().strftime("%Y-%m"))
+except Exception:
+    stats = None
+
+
+def _metric(label: str, value, unit: str):
+    if stats is None:
+        st.metric(label, f"- {unit}", help="DB 연결 후 표시")
+    else:
+        st.metric(label, f"{value:,}{unit}")
+
+
+month_stats = (stats or {}).get("month", {})
 col1, col2, col3 = st.columns(3)
 
 with col1:
-    st.metric("👥 등록 직원", "- 명", help="DB 연결 후 표시")
-    st.metric("📋 이번달 당직", "- 건", help="DB 연결 후 표시")
+    _metric("👥 등록 직원", (stats or {}).get("active_employees"), "명")
+    _metric("📋 이번달 당직", month_stats.get("duty_assignments"), "건")
 
 with col2:
-    st.metric("🔄 이번달 변경", "- 건", help="DB 연결 후 표시")
-    st.metric("📝 미승인 일지", "- 건", help="DB 연결 후 표시")
+    _metric("🔄 이번달 변경", month_stats.get("duty_changes"), "건")
+    _metric("📝 미승인 일지", (stats or {}).get("pending_logs"), "건")
 
 with col3:
-    st.metric("💰 이번달 당직비", "- 원", help="DB 연결 후 표시")
-    st.metric("📞 연락망 등록", "- 명", help="DB 연결 후 표시")
+    _metric("💰 이번달 당직비", month_stats.get("payment_amount"), "원")
+    _metric("📞 연락망 등록", (stats or {}).get("emergency_contacts"), "명")
 
 st.markdown("---")
 st.info("👈 왼쪽 사이드바에서 메뉴를 선택하세요.")
@@ -56,6 +77,6 @@ with st.expander("🔧 시스템 상태"):
     st.markdown(f"""
     - **버전**: {APP_VERSION}
     - **환경**: Development (독립형 테스트)
-    - **DB**: Supabase 연결 대기
+    - **DB**: {DB_BACKEND} ({"연결됨" if stats is not None else "연결 대기"})
     - **n8n**: Phase 6에서 연동 예정
     """)
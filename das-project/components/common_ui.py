@@ -4,10 +4,13 @@
 """
 import streamlit as st
 from config import APP_TITLE, APP_VERSION
+from services import instrumentation, payment_service
 
 
 def page_header(title: str, icon: str = "📋"):
-    """공통 페이지 헤더"""
+    """공통 페이지 헤더 (렌더 단위 쿼리 계측 시작, 당직비 스냅샷 쓰기 리스너 등록)"""
+    instrumentation.begin_render(title)
+    payment_service.register_listeners()
     st.title(f"{icon} {title}")
     st.markdown("---")
 
@@ -16,7 +16,7 @@ def employee_selector(key: str = "emp_select", label: str = "직원 선택"):
 
     if emp_no:
         try:
-            employees = db.select_where("employees", "employee_no", emp_no)
+            employees = db.select_where("employees", "employee_no", emp_no, columns="id, employee_no, name, department, position")
             if employees:
                 emp = employees[0]
                 st.caption(f"✅ {emp['name']} | {emp['department']} | {emp['position']}")
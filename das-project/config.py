@@ -25,6 +25,59 @@ APP_DEBUG = os.getenv("APP_DEBUG", "true").lower() == "true"
 APP_TITLE = "DAS - 당직 업무 자동화 시스템"
 APP_VERSION = "2.0.0"
 
+# ── DB 백엔드 ──
+DB_BACKEND = os.getenv("DB_BACKEND", "supabase")                     # supabase | local (SQLite 임베디드)
+LOCAL_DB_PATH = os.getenv("LOCAL_DB_PATH", ":memory:")               # local 백엔드 DB 파일 경로
+DAS_TABLES = (                                                       # 건수 집계 대상 테이블 (das_table_stats)
+    "employees", "duty_assignments", "duty_changes",
+    "duty_logs", "duty_payments", "emergency_contacts",
+)
+
+# ── DB 연결 풀 ──
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))                  # 최대 동시 연결 수
+DB_POOL_KEEPALIVE = float(os.getenv("DB_POOL_KEEPALIVE", "30"))      # keep-alive 유지 시간(초)
+DB_TIMEOUT = float(os.getenv("DB_TIMEOUT", "10"))                    # 요청 타임아웃(초)
+DB_CONNECT_TIMEOUT = float(os.getenv("DB_CONNECT_TIMEOUT", "5"))     # 연결 타임아웃(초)
+
+# ── DB 조회 캐시 ──
+DB_CACHE_ENABLED = os.getenv("DB_CACHE_ENABLED", "true").lower() == "true"
+DB_CACHE_TTL = float(os.getenv("DB_CACHE_TTL", "30"))               # 캐시 유효 시간(초)
+DB_CACHE_MAX_ENTRIES = int(os.getenv("DB_CACHE_MAX_ENTRIES", "256"))  # 최대 캐시 항목 수 (LRU)
+
+# ── DB 일괄 쓰기 ──
+DB_BULK_CHUNK_SIZE = int(os.getenv("DB_BULK_CHUNK_SIZE", "500"))    # 요청당 행 수
+DB_BULK_MAX_WORKERS = int(os.getenv("DB_BULK_MAX_WORKERS", "4"))    # 동시 전송 청크 수
+DB_BULK_RETRIES = int(os.getenv("DB_BULK_RETRIES", "3"))            # 청크 재시도 횟수
+DB_BULK_BACKOFF = float(os.getenv("DB_BULK_BACKOFF", "0.5"))        # 재시도 대기 기본값(초, 지수 증가)
+
+# ── DB 스트리밍 조회 ──
+DB_PAGE_SIZE = int(os.getenv("DB_PAGE_SIZE", "1000"))               # 키셋 페이지 크기 (PostgREST max-rows 이하)
+
+# ── DB 쿼리 계측 ──
+DB_QUERY_LOG_SIZE = int(os.getenv("DB_QUERY_LOG_SIZE", "2000"))     # 링 버퍼에 보관할 호출 기록 수
+DB_QUERY_LOG_PATH = os.getenv("DB_QUERY_LOG_PATH", "")              # 지정 시 JSONL로 추가 기록
+DB_QUERY_LOG_BYTES = os.getenv("DB_QUERY_LOG_BYTES", "false").lower() == "true"  # Content-Length 없는 응답도 직렬화해 크기 계산
+
+# ── 당직 달력 ──
+HOLIDAY_FILE = os.getenv(                                             # 공휴일 목록 (CSV: date,name)
+    "HOLIDAY_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "holidays.csv")
+)
+
+# ── 당직 명단 공정 배정 ──
+ROSTER_MIN_REST_DAYS = int(os.getenv("ROSTER_MIN_REST_DAYS", "3"))           # 같은 직원 당직 사이 최소 일수
+ROSTER_HOLIDAY_WEIGHT = float(os.getenv("ROSTER_HOLIDAY_WEIGHT", "1.5"))      # 휴무일 당직 1건의 부하
+ROSTER_FAIRNESS_WINDOW_DAYS = int(os.getenv("ROSTER_FAIRNESS_WINDOW_DAYS", "90"))  # 부하에 포함할 최근 이력 기간
+
+# ── 당직 중복/휴식 검사 ──
+DUTY_MIN_REST_HOURS = float(os.getenv("DUTY_MIN_REST_HOURS", "11"))          # 같은 직원 근무 사이 최소 휴식 시간
+
+# ── 당직비 스냅샷 ──
+PAYMENT_AUTO_REFRESH = os.getenv("PAYMENT_AUTO_REFRESH", "true").lower() == "true"  # 발령/변경 쓰기 시 duty_payments 갱신 대기 (조회 시 증분 갱신)
+
+# ── 내보내기 (CSV/Parquet) ──
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))                # 파일에 한 번에 기록하는 행 수
+EXPORT_PARQUET_COMPRESSION = os.getenv("EXPORT_PARQUET_COMPRESSION", "zstd")  # snappy/gzip/zstd/none
+
 # ── n8n ──
 N8N_WEBHOOK_URL = os.getenv("N8N_WEBHOOK_URL", "http://localhost:5678/webhook")
 
@@ -60,16 +113,20 @@ DUTY_RULES = {
     "weekday_sub":  {"grades": [3, 4], "positions": ["대리", "사원"], "label": "평일 부당직"},
 }
 
-# ── 근무 시간 ──
+# ── 근무 시간 (payment: 적용 당직비 기준) ──
 WORK_HOURS = {
-    "holiday_day":   {"start": "08:00", "end": "20:00", "label": "휴무일 주간"},
-    "holiday_night": {"start": "20:00", "end": "08:00", "label": "휴무일 야간"},
-    "weekday_night": {"start": "19:30", "end": "08:00", "label": "평일 야간"},
-    "sat_2_4":       {"start": "17:00", "end": "08:00", "label": "2,4주 토요일"},
-    "sat_5_day":     {"start": "12:00", "end": "22:00", "label": "5주 토요일 주간"},
-    "sat_5_night":   {"start": "22:00", "end": "08:00", "label": "5주 토요일 야간"},
+    "holiday_day":   {"start": "08:00", "end": "20:00", "label": "휴무일 주간", "payment": "holiday_day"},
+    "holiday_night": {"start": "20:00", "end": "08:00", "label": "휴무일 야간", "payment": "holiday_night"},
+    "weekday_night": {"start": "19:30", "end": "08:00", "label": "평일 야간", "payment": "weekday_night"},
+    "sat_2_4":       {"start": "17:00", "end": "08:00", "label": "2,4주 토요일", "payment": "weekday_night"},
+    "sat_5_day":     {"start": "12:00", "end": "22:00", "label": "5주 토요일 주간", "payment": "holiday_day"},
+    "sat_5_night":   {"start": "22:00", "end": "08:00", "label": "5주 토요일 야간", "payment": "holiday_night"},
 }
 
+# ── 토요일 근무 패턴 (월 내 주차 → 패턴) ──
+# holiday: 휴무일 주간+야간 / sat_2_4: 근무 토요일 야간 1회 / sat_5: 5주 토요일 주간+야간
+SATURDAY_PATTERNS = {1: "holiday", 2: "sat_2_4", 3: "holiday", 4: "sat_2_4", 5: "sat_5"}
+
 # ── 당직 변경 사유 ──
 CHANGE_REASONS = ["출장", "파견", "교육", "경조사", "병가", "기타"]
 
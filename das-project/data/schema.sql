@@ -46,8 +46,10 @@ CREATE TABLE IF NOT EXISTS duty_changes (
     duty_role VARCHAR(10) NOT NULL,                -- 총당직/부당직
     change_reason VARCHAR(100) NOT NULL,           -- 변경사유
     change_date DATE DEFAULT CURRENT_DATE,
-    created_at TIMESTAMPTZ DEFAULT now()
+    created_at TIMESTAMPTZ DEFAULT now(),
+    seq BIGSERIAL                                  -- 입력 순서 (created_at은 트랜잭션 시작 시각: 일괄 등록의 이어진 변경 구분)
 );
+ALTER TABLE duty_changes ADD COLUMN IF NOT EXISTS seq BIGSERIAL;  -- 기존 DB
 
 -- 4. 당직근무일지
 CREATE TABLE IF NOT EXISTS duty_logs (
@@ -108,15 +110,48 @@ CREATE TABLE IF NOT EXISTS duty_rules (
     created_at TIMESTAMPTZ DEFAULT now()
 );
 
+-- 8. 순번 포인터 (LAST 사번) - duty_assignments 트리거가 유지
+--    (역할, 구분)별 가장 최근 완료/확정 발령의 당직자
+CREATE TABLE IF NOT EXISTS duty_rotation_pointers (
+    duty_role VARCHAR(10) NOT NULL,                -- 총당직/부당직
+    day_category VARCHAR(10) NOT NULL,             -- 휴무일/평일
+    employee_id UUID REFERENCES employees(id) ON DELETE SET NULL,
+    assignment_id UUID,                            -- 기준 발령
+    duty_date DATE,
+    duty_type VARCHAR(10),
+    updated_at TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (duty_role, day_category)
+);
+
+-- 9. 실제 당직자 명단 (유효 명단) - duty_assignments/duty_changes 트리거가 유지
+--    발령 x 역할 1행: 편성 원본 위에 같은 역할의 마지막 변경을 반영한 실제 당직자
+--    당직비/일지/비상연락/알림은 변경 이력을 다시 조인하지 않고 이 테이블을 조회
+CREATE TABLE IF NOT EXISTS duty_roster_effective (
+    assignment_id UUID NOT NULL REFERENCES duty_assignments(id) ON DELETE CASCADE,
+    duty_role VARCHAR(10) NOT NULL,                -- 총당직/부당직
+    duty_date DATE NOT NULL,                       -- 발령 필드 사본 (일자/직원 인덱스 조회용)
+    duty_type VARCHAR(10) NOT NULL,
+    day_category VARCHAR(10) NOT NULL,
+    status VARCHAR(10) NOT NULL,
+    employee_id UUID REFERENCES employees(id),     -- 실제 당직자
+    rostered_employee_id UUID REFERENCES employees(id),  -- 편성 원본 당직자
+    change_id UUID,                                -- 반영된 마지막 변경 (없으면 NULL)
+    updated_at TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (assignment_id, duty_role)
+);
+
 -- ── 인덱스 ──
 CREATE INDEX IF NOT EXISTS idx_employees_no ON employees(employee_no);
 CREATE INDEX IF NOT EXISTS idx_employees_factory ON employees(factory);
 CREATE INDEX IF NOT EXISTS idx_employees_grade ON employees(grade);
 CREATE INDEX IF NOT EXISTS idx_assignments_date ON duty_assignments(duty_date);
 CREATE INDEX IF NOT EXISTS idx_assignments_status ON duty_assignments(status);
+CREATE INDEX IF NOT EXISTS idx_assignments_rotation ON duty_assignments(day_category, duty_date DESC, duty_type);
 CREATE INDEX IF NOT EXISTS idx_logs_date ON duty_logs(log_date);
 CREATE INDEX IF NOT EXISTS idx_logs_approval ON duty_logs(approval_status);
 CREATE INDEX IF NOT EXISTS idx_payments_month ON duty_payments(payment_month);
+CREATE INDEX IF NOT EXISTS idx_roster_effective_date ON duty_roster_effective(duty_date, duty_type);
+CREATE INDEX IF NOT EXISTS idx_roster_effective_employee ON duty_roster_effective(employee_id, duty_date);
 
 -- ── RLS (Row Level Security) ──
 -- 테스트 환경에서는 기본적으로 anon key로 접근 가능하도록 설정
@@ -127,6 +162,8 @@ ALTER TABLE duty_logs ENABLE ROW LEVEL SECURITY;
 ALTER TABLE duty_payments ENABLE ROW LEVEL SECURITY;
 ALTER TABLE emergency_contacts ENABLE ROW LEVEL SECURITY;
 ALTER TABLE duty_rules ENABLE ROW LEVEL SECURITY;
+ALTER TABLE duty_rotation_pointers ENABLE ROW LEVEL SECURITY;
+ALTER TABLE duty_roster_effective ENABLE ROW LEVEL SECURITY;
 
 -- 테스트용: 모든 접근 허용 (운영 시 세분화 필요)
 CREATE POLICY "Allow all for anon" ON employees FOR ALL USING (true);
@@ -136,3 +173,330 @@ CREATE POLICY "Allow all for anon" ON duty_logs FOR ALL USING (true);
 CREATE POLICY "Allow all for anon" ON duty_payments FOR ALL USING (true);
 CREATE POLICY "Allow all for anon" ON emergency_contacts FOR ALL USING (true);
 CREATE POLICY "Allow all for anon" ON duty_rules FOR ALL USING (true);
+CREATE POLICY "Allow all for anon" ON duty_rotation_pointers FOR ALL USING (true);
+CREATE POLICY "Allow all for anon" ON duty_roster_effective FOR ALL USING (true);
+
+-- ── RPC ──
+-- 테이블별 건수 + 대시보드 지표를 한 번의 요청으로 반환 (services.db.table_stats)
+-- p_month: 'YYYY-MM' 지정 시 해당 월 발령/변경 건수, 당직비 합계 포함
+-- p_estimated: true이면 pg_class 통계 추정치 사용 (대용량 테이블에서 count(*) 생략)
+CREATE OR REPLACE FUNCTION das_table_stats(p_month TEXT DEFAULT NULL, p_estimated BOOLEAN DEFAULT false)
+RETURNS JSONB
+LANGUAGE plpgsql STABLE
+AS $$
+DECLARE
+    result JSONB;
+    month_start DATE;
+BEGIN
+    IF p_estimated THEN
+        SELECT jsonb_object_agg(c.relname, GREATEST(c.reltuples, 0)::BIGINT) INTO result
+        FROM pg_class c
+        WHERE c.relnamespace = 'public'::regnamespace
+          AND c.relkind = 'r'
+          AND c.relname IN ('employees', 'duty_assignments', 'duty_changes',
+                            'duty_logs', 'duty_payments', 'emergency_contacts');
+    ELSE
+        result := jsonb_build_object(
+            'employees', (SELECT count(*) FROM employees),
+            'duty_assignments', (SELECT count(*) FROM duty_assignments),
+            'duty_changes', (SELECT count(*) FROM duty_changes),
+            'duty_logs', (SELECT count(*) FROM duty_logs),
+            'duty_payments', (SELECT count(*) FROM duty_payments),
+            'emergency_contacts', (SELECT count(*) FROM emergency_contacts)
+        );
+    END IF;
+
+    result := result || jsonb_build_object(
+        'active_employees', (SELECT count(*) FROM employees WHERE is_active),
+        'pending_logs', (SELECT count(*) FROM duty_logs WHERE approval_status <> '승인')
+    );
+
+    IF p_month IS NOT NULL THEN
+        month_start := to_date(p_month || '-01', 'YYYY-MM-DD');
+        result := result || jsonb_build_object('month', jsonb_build_object(
+            'duty_assignments', (SELECT count(*) FROM duty_assignments
+                                 WHERE duty_date >= month_start AND duty_date < month_start + INTERVAL '1 month'),
+            'duty_changes', (SELECT count(*) FROM duty_changes
+                             WHERE change_date >= month_start AND change_date < month_start + INTERVAL '1 month'),
+            'payment_amount', (SELECT COALESCE(sum(amount), 0) FROM duty_payments WHERE payment_month = p_month)
+        ));
+    END IF;
+
+    RETURN result;
+END;
+$$;
+
+-- 구분(휴무일/평일)의 순번 포인터 재계산: 가장 최근 완료/확정 발령 1건 (idx_assignments_rotation 사용)
+-- 같은 날 주간/야간이 있으면 야간이 나중 ('야간' < '주간' 이므로 오름차순)
+CREATE OR REPLACE FUNCTION das_refresh_rotation_pointers(p_day_category TEXT)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO duty_rotation_pointers (duty_role, day_category, employee_id, assignment_id, duty_date, duty_type, updated_at)
+    SELECT r.role, p_day_category,
+           CASE r.role WHEN '총당직' THEN a.main_duty_id ELSE a.sub_duty_id END,
+           a.id, a.duty_date, a.duty_type, now()
+    FROM (VALUES ('총당직'), ('부당직')) AS r(role)
+    LEFT JOIN LATERAL (
+        SELECT id, main_duty_id, sub_duty_id, duty_date, duty_type
+        FROM duty_assignments
+        WHERE day_category = p_day_category AND status IN ('완료', '확정')
+        ORDER BY duty_date DESC, duty_type ASC
+        LIMIT 1
+    ) a ON true
+    ON CONFLICT (duty_role, day_category) DO UPDATE SET
+        employee_id = EXCLUDED.employee_id,
+        assignment_id = EXCLUDED.assignment_id,
+        duty_date = EXCLUDED.duty_date,
+        duty_type = EXCLUDED.duty_type,
+        updated_at = EXCLUDED.updated_at;
+$$;
+
+-- 발령 쓰기와 같은 트랜잭션에서 포인터 갱신 (완료/확정 발령이 관련된 경우만)
+CREATE OR REPLACE FUNCTION das_rotation_pointer_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status IN ('완료', '확정') THEN
+        PERFORM das_refresh_rotation_pointers(OLD.day_category);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status IN ('완료', '확정')
+       AND NOT (TG_OP = 'UPDATE' AND OLD.status IN ('완료', '확정') AND OLD.day_category = NEW.day_category) THEN
+        PERFORM das_refresh_rotation_pointers(NEW.day_category);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_duty_rotation_pointers ON duty_assignments;
+CREATE TRIGGER trg_duty_rotation_pointers
+    AFTER INSERT OR DELETE OR UPDATE OF duty_date, duty_type, day_category, status, main_duty_id, sub_duty_id
+    ON duty_assignments
+    FOR EACH ROW EXECUTE FUNCTION das_rotation_pointer_trigger();
+
+-- 유효 명단: (발령, 역할) 1건을 변경 이력에서 재계산 (변경 삭제/수정 시)
+CREATE OR REPLACE FUNCTION das_refresh_roster_effective(p_assignment_id UUID, p_duty_role TEXT)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    UPDATE duty_roster_effective r SET
+        change_id = c.id,
+        employee_id = COALESCE(c.new_employee_id, r.rostered_employee_id),
+        updated_at = now()
+    FROM (SELECT 1) one
+    LEFT JOIN LATERAL (
+        SELECT id, new_employee_id FROM duty_changes
+        WHERE assignment_id = p_assignment_id AND duty_role = p_duty_role
+        ORDER BY seq DESC
+        LIMIT 1
+    ) c ON true
+    WHERE r.assignment_id = p_assignment_id AND r.duty_role = p_duty_role;
+$$;
+
+-- 발령 쓰기와 같은 트랜잭션에서 유효 명단 갱신
+-- INSERT: 역할별 2행 추가 / UPDATE: 발령 필드 사본 + 변경이 없는 역할의 당직자 갱신 / DELETE: FK CASCADE
+CREATE OR REPLACE FUNCTION das_roster_effective_assignment_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO duty_roster_effective
+            (assignment_id, duty_role, duty_date, duty_type, day_category, status, employee_id, rostered_employee_id)
+        SELECT NEW.id, r.role, NEW.duty_date, NEW.duty_type, NEW.day_category, NEW.status, r.employee_id, r.employee_id
+        FROM (VALUES ('총당직', NEW.main_duty_id), ('부당직', NEW.sub_duty_id)) AS r(role, employee_id)
+        ON CONFLICT (assignment_id, duty_role) DO NOTHING;
+    ELSE
+        UPDATE duty_roster_effective SET
+            duty_date = NEW.duty_date,
+            duty_type = NEW.duty_type,
+            day_category = NEW.day_category,
+            status = NEW.status,
+            rostered_employee_id = CASE duty_role WHEN '총당직' THEN NEW.main_duty_id ELSE NEW.sub_duty_id END,
+            employee_id = CASE WHEN change_id IS NOT NULL THEN employee_id
+                               WHEN duty_role = '총당직' THEN NEW.main_duty_id ELSE NEW.sub_duty_id END,
+            updated_at = now()
+        WHERE assignment_id = NEW.id;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_duty_roster_effective_assignment ON duty_assignments;
+CREATE TRIGGER trg_duty_roster_effective_assignment
+    AFTER INSERT OR UPDATE OF duty_date, duty_type, day_category, status, main_duty_id, sub_duty_id
+    ON duty_assignments
+    FOR EACH ROW EXECUTE FUNCTION das_roster_effective_assignment_trigger();
+
+-- 변경 쓰기와 같은 트랜잭션에서 유효 명단 갱신
+-- INSERT: 새 변경을 그대로 반영 (증분) / UPDATE, DELETE: 해당 (발령, 역할) 재계산
+CREATE OR REPLACE FUNCTION das_roster_effective_change_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE duty_roster_effective SET employee_id = NEW.new_employee_id, change_id = NEW.id, updated_at = now()
+        WHERE assignment_id = NEW.assignment_id AND duty_role = NEW.duty_role;
+        RETURN NULL;
+    END IF;
+    PERFORM das_refresh_roster_effective(OLD.assignment_id, OLD.duty_role);
+    IF TG_OP = 'UPDATE' THEN
+        PERFORM das_refresh_roster_effective(NEW.assignment_id, NEW.duty_role);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_duty_roster_effective_change ON duty_changes;
+CREATE TRIGGER trg_duty_roster_effective_change
+    AFTER INSERT OR UPDATE OR DELETE ON duty_changes
+    FOR EACH ROW EXECUTE FUNCTION das_roster_effective_change_trigger();
+
+-- 유효 명단 전체 재계산 (스키마 적용 직후, 데이터 이관 후 실행)
+CREATE OR REPLACE FUNCTION das_rebuild_roster_effective()
+RETURNS BIGINT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_count BIGINT;
+BEGIN
+    DELETE FROM duty_roster_effective;
+    INSERT INTO duty_roster_effective
+        (assignment_id, duty_role, duty_date, duty_type, day_category, status,
+         employee_id, rostered_employee_id, change_id)
+    SELECT a.id, r.role, a.duty_date, a.duty_type, a.day_category, a.status,
+           COALESCE(c.new_employee_id, r.employee_id), r.employee_id, c.id
+    FROM duty_assignments a
+    CROSS JOIN LATERAL (VALUES ('총당직', a.main_duty_id), ('부당직', a.sub_duty_id)) AS r(role, employee_id)
+    LEFT JOIN LATERAL (
+        SELECT id, new_employee_id FROM duty_changes
+        WHERE assignment_id = a.id AND duty_role = r.role
+        ORDER BY seq DESC
+        LIMIT 1
+    ) c ON true;
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$;
+
+-- 순번 포인터 전체 재계산 (스키마 적용 직후, 데이터 이관 후 실행)
+CREATE OR REPLACE FUNCTION das_rebuild_rotation_pointers()
+RETURNS SETOF duty_rotation_pointers
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM das_refresh_rotation_pointers('휴무일');
+    PERFORM das_refresh_rotation_pointers('평일');
+    RETURN QUERY SELECT * FROM duty_rotation_pointers ORDER BY day_category, duty_role;
+END;
+$$;
+
+-- 당직 변경 등록 (한 트랜잭션, services.change_service.register_change)
+-- 1) 발령 행 잠금  2) 변경 후 직원 확인 (사번 또는 id, 재직자만)
+-- 3) 현재 당직자 = 유효 명단(duty_roster_effective)의 실제 당직자 → 변경 전 직원
+--    p_original_employee_id 지정 시 현재 당직자와 다르면 거부 (동시 변경 방지)
+-- 4) 변경 이력 추가 + 발령 상태 '변경' (발령의 총당직/부당직 id는 편성 원본으로 유지)
+-- 반환: 변경 행 + assignment/original/new (change_service.CHANGE_DETAIL_COLUMNS와 같은 형태)
+CREATE OR REPLACE FUNCTION das_register_change(
+    p_assignment_id UUID,
+    p_duty_role TEXT,
+    p_change_reason TEXT,
+    p_new_employee_no TEXT DEFAULT NULL,
+    p_new_employee_id UUID DEFAULT NULL,
+    p_original_employee_id UUID DEFAULT NULL,
+    p_change_date DATE DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_assignment duty_assignments%ROWTYPE;
+    v_new employees%ROWTYPE;
+    v_original_id UUID;
+    v_change duty_changes%ROWTYPE;
+BEGIN
+    IF p_duty_role NOT IN ('총당직', '부당직') THEN
+        RAISE EXCEPTION '변경 구분이 올바르지 않습니다: %', p_duty_role USING ERRCODE = '22023';
+    END IF;
+
+    SELECT * INTO v_assignment FROM duty_assignments WHERE id = p_assignment_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION '발령을 찾을 수 없습니다: %', p_assignment_id USING ERRCODE = 'P0002';
+    END IF;
+
+    IF p_new_employee_id IS NOT NULL THEN
+        SELECT * INTO v_new FROM employees WHERE id = p_new_employee_id;
+    ELSE
+        SELECT * INTO v_new FROM employees WHERE employee_no = p_new_employee_no;
+    END IF;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION '직원을 찾을 수 없습니다: %', COALESCE(p_new_employee_no, p_new_employee_id::TEXT)
+            USING ERRCODE = 'P0002';
+    END IF;
+    IF NOT v_new.is_active THEN
+        RAISE EXCEPTION '재직 중인 직원이 아닙니다: %', v_new.employee_no;
+    END IF;
+
+    SELECT employee_id INTO v_original_id
+    FROM duty_roster_effective
+    WHERE assignment_id = p_assignment_id AND duty_role = p_duty_role;
+    IF v_original_id IS NULL THEN
+        RAISE EXCEPTION '% % 당직자가 배정되지 않았습니다.', v_assignment.duty_date, p_duty_role;
+    END IF;
+    IF p_original_employee_id IS NOT NULL AND p_original_employee_id <> v_original_id THEN
+        RAISE EXCEPTION '다른 변경이 먼저 등록되었습니다. 현재 당직자를 다시 확인하세요.' USING ERRCODE = '40001';
+    END IF;
+    IF v_original_id = v_new.id THEN
+        RAISE EXCEPTION '변경 전/후 당직자가 같습니다.';
+    END IF;
+
+    INSERT INTO duty_changes (assignment_id, original_employee_id, new_employee_id, duty_role, change_reason, change_date)
+    VALUES (p_assignment_id, v_original_id, v_new.id, p_duty_role, p_change_reason,
+            COALESCE(p_change_date, v_assignment.duty_date))  -- 변경일 기본값: 당직일자 (단건/일괄 공통)
+    RETURNING * INTO v_change;
+
+    UPDATE duty_assignments SET status = '변경', updated_at = now()
+    WHERE id = p_assignment_id
+    RETURNING * INTO v_assignment;
+
+    RETURN to_jsonb(v_change) || jsonb_build_object(
+        'assignment', to_jsonb(v_assignment),
+        'original', (SELECT to_jsonb(e) FROM employees e WHERE e.id = v_original_id),
+        'new', to_jsonb(v_new)
+    );
+END;
+$$;
+
+-- 당직 변경 일괄 등록 (전체가 한 트랜잭션, services.change_service.apply_bulk_changes)
+-- p_changes: [{assignment_id, duty_role, change_reason, new_employee_id, original_employee_id, change_date}, ...]
+-- 항목마다 das_register_change와 같은 검증, 하나라도 실패하면 몇 번째 항목인지 포함해 전체 취소
+CREATE OR REPLACE FUNCTION das_register_changes(p_changes JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_item JSONB;
+    v_index INTEGER := 0;
+    v_result JSONB := '[]'::JSONB;
+BEGIN
+    FOR v_item IN SELECT value FROM jsonb_array_elements(p_changes) LOOP
+        v_index := v_index + 1;
+        BEGIN
+            v_result := v_result || jsonb_build_array(das_register_change(
+                p_assignment_id => (v_item->>'assignment_id')::UUID,
+                p_duty_role => v_item->>'duty_role',
+                p_change_reason => v_item->>'change_reason',
+                p_new_employee_no => v_item->>'new_employee_no',
+                p_new_employee_id => (v_item->>'new_employee_id')::UUID,
+                p_original_employee_id => (v_item->>'original_employee_id')::UUID,
+                p_change_date => (v_item->>'change_date')::DATE
+            ));
+        EXCEPTION WHEN OTHERS THEN
+            RAISE EXCEPTION '%번째 변경: %', v_index, SQLERRM USING ERRCODE = SQLSTATE;
+        END;
+    END LOOP;
+    RETURN v_result;
+END;
+$$;
@@ -22,6 +22,7 @@ from config import (
     FACTORIES, FACTORY1_DEPARTMENTS, FACTORY2_DEPARTMENTS,
     BUSINESS_UNITS, GRADES, CHANGE_REASONS,
 )
+from services import duty_calendar
 
 fake = Faker("ko_KR")
 Faker.seed(42)  # 재현 가능한 데이터
@@ -76,46 +77,22 @@ def generate_assignments(employees: list, months: int = 6) -> list:
     main_idx = 0
     sub_idx = 0
 
-    for day_offset in range(months * 30):
-        current_date = start_date + timedelta(days=day_offset)
-        if current_date > date(2025, 6, 30):
-            break
-
-        weekday = current_date.weekday()
-        day_names = ["월", "화", "수", "목", "금", "토", "일"]
-        is_holiday = weekday >= 5  # 토,일
-
-        if is_holiday:
-            # 휴무일: 주간 + 야간
-            for duty_type in ["주간", "야간"]:
-                main_emp = main_candidates[main_idx % len(main_candidates)]
-                sub_emp = sub_candidates[sub_idx % len(sub_candidates)]
-                assignments.append({
-                    "duty_date": current_date.isoformat(),
-                    "day_of_week": day_names[weekday],
-                    "duty_type": duty_type,
-                    "day_category": "휴무일",
-                    "main_duty_employee_no": main_emp["employee_no"],
-                    "sub_duty_employee_no": sub_emp["employee_no"],
-                    "status": random.choice(["예정", "확정", "완료"]),
-                })
-                main_idx += 1
-                sub_idx += 1
-        else:
-            # 평일: 야간만
-            main_emp = main_candidates[main_idx % len(main_candidates)]
-            sub_emp = sub_candidates[sub_idx % len(sub_candidates)]
-            assignments.append({
-                "duty_date": current_date.isoformat(),
-                "day_of_week": day_names[weekday],
-                "duty_type": "야간",
-                "day_category": "평일",
-                "main_duty_employee_no": main_emp["employee_no"],
-                "sub_duty_employee_no": sub_emp["employee_no"],
-                "status": random.choice(["예정", "확정", "완료"]),
-            })
-            main_idx += 1
-            sub_idx += 1
+    # 근무 슬롯은 당직 달력 기준 (공휴일, 2·4주/5주 토요일 패턴 반영)
+    end_date = min(start_date + timedelta(days=months * 30 - 1), date(2025, 6, 30))
+    for shift in duty_calendar.shifts(start_date, end_date):
+        main_emp = main_candidates[main_idx % len(main_candidates)]
+        sub_emp = sub_candidates[sub_idx % len(sub_candidates)]
+        assignments.append({
+            "duty_date": shift["duty_date"],
+            "day_of_week": shift["day_of_week"],
+            "duty_type": shift["duty_type"],
+            "day_category": shift["day_category"],
+            "main_duty_employee_no": main_emp["employee_no"],
+            "sub_duty_employee_no": sub_emp["employee_no"],
+            "status": random.choice(["예정", "확정", "완료"]),
+        })
+        main_idx += 1
+        sub_idx += 1
 
     return assignments
 
@@ -210,6 +187,15 @@ def generate_all() -> dict:
     }
 
 
+def _report(results: list, unit: str = "건"):
+    """청크별 일괄 쓰기 결과 출력"""
+    ok_rows = sum(r["rows"] for r in results if r["ok"])
+    print(f"    ✅ {ok_rows}{unit} 삽입 완료 ({len(results)}개 청크)")
+    for r in results:
+        if not r["ok"]:
+            print(f"    ❌ 청크 {r['chunk']} ({r['rows']}건, {r['attempts']}회 시도) 실패: {r['error']}")
+
+
 def insert_to_supabase(data: dict) -> dict:
     """
     생성된 데이터를 Supabase에 삽입
@@ -228,10 +214,11 @@ def insert_to_supabase(data: dict) -> dict:
     print("  → 직원 마스터 삽입 중...")
     emp_map = {}  # employee_no -> UUID
     try:
-        inserted_emps = db.insert_many("employees", data["employees"])
+        results = db.bulk_upsert("employees", data["employees"], on_conflict="employee_no")
+        inserted_emps = db.bulk_data(results)
         for emp in inserted_emps:
             emp_map[emp["employee_no"]] = emp["id"]
-        print(f"    ✅ {len(inserted_emps)}명 삽입 완료")
+        _report(results, "명")
     except Exception as e:
         print(f"    ❌ 직원 삽입 실패: {e}")
         return emp_map
@@ -249,8 +236,9 @@ def insert_to_supabase(data: dict) -> dict:
         assignments_with_ids.append(asmt_copy)
 
     try:
-        inserted_asmts = db.insert_many("duty_assignments", assignments_with_ids)
-        print(f"    ✅ {len(inserted_asmts)}건 삽입 완료")
+        results = db.bulk_upsert("duty_assignments", assignments_with_ids, on_conflict="duty_date,duty_type")
+        inserted_asmts = db.bulk_data(results)
+        _report(results)
         # duty_date + duty_type -> assignment UUID 매핑 생성
         asmt_map = {(a["duty_date"], a["duty_type"]): a["id"] for a in inserted_asmts}
     except Exception as e:
@@ -285,8 +273,7 @@ def insert_to_supabase(data: dict) -> dict:
 
     try:
         if changes_with_ids:
-            inserted_changes = db.insert_many("duty_changes", changes_with_ids)
-            print(f"    ✅ {len(inserted_changes)}건 삽입 완료")
+            _report(db.bulk_upsert("duty_changes", changes_with_ids))
         else:
             print(f"    ⚠️  삽입할 변경 데이터 없음")
     except Exception as e:
@@ -303,16 +290,14 @@ def insert_to_supabase(data: dict) -> dict:
             contacts_with_ids.append(contact_copy)
 
     try:
-        inserted_contacts = db.insert_many("emergency_contacts", contacts_with_ids)
-        print(f"    ✅ {len(inserted_contacts)}건 삽입 완료")
+        _report(db.bulk_upsert("emergency_contacts", contacts_with_ids, on_conflict="employee_id"))
     except Exception as e:
         print(f"    ❌ 비상연락망 삽입 실패: {e}")
 
     # 5. 당직근무일지 삽입 (main_duty_id, sub_duty_id는 None으로)
     print("  → 당직근무일지 삽입 중...")
     try:
-        inserted_logs = db.insert_many("duty_logs", data["logs"])
-        print(f"    ✅ {len(inserted_logs)}건 삽입 완료")
+        _report(db.bulk_upsert("duty_logs", data["logs"], on_conflict="log_date,factory,duty_type"))
     except Exception as e:
         print(f"    ❌ 당직근무일지 삽입 실패: {e}")
 
@@ -4,16 +4,25 @@
 - 총당직 + 부당직 명단 병기 표시
 - 휴무일 행 별도 색상 구분
 - LAST 사번 기반 순번 자동배정
+- 월 중복/휴식 부족 당직 경고 (실제 당직자 기준)
 """
 import streamlit as st
 import pandas as pd
 from datetime import date, datetime, timedelta
 from components.common_ui import page_header, page_footer, show_success, show_error, show_info
 from components.duty_rules_help import show_duty_rules
-from services import assignment_service
+from services import assignment_service, async_db, conflict_index, duty_calendar, roster_service
 
 page_header("당직 예정자 LIST", "📋")
 
+# 목록에 표시하는 필드만 조회 (당직자는 유효 명단의 실제 당직자, 편성 원본은 변경 표시용)
+ASSIGNMENT_LIST_COLUMNS = (
+    "id, duty_date, day_of_week, day_category, duty_type, status, "
+    f"{assignment_service.duty_embed('main_duty', 'name')}, "
+    f"{assignment_service.duty_embed('sub_duty', 'name')}, "
+    + assignment_service.effective_embed(f"duty_role, change_id, {assignment_service.effective_employee_embed('name')}")
+)
+
 # ── 월 선택 ──
 col1, col2, col3 = st.columns([2, 2, 6])
 with col1:
@@ -23,7 +32,13 @@ with col2:
 
 # ── 발령 조회 ──
 try:
-    assignments = assignment_service.get_assignments_by_month(year, month)
+    # 발령 목록과 월 중복/휴식 검사(유효 명단 적재)는 서로 독립 → 동시에 조회
+    loaded = async_db.run_all({
+        "assignments": async_db.call(assignment_service.get_assignments_by_month, year, month,
+                                     columns=ASSIGNMENT_LIST_COLUMNS),
+        "conflicts": async_db.call(conflict_index.find_conflicts, *duty_calendar.month_bounds(year, month)),
+    })
+    assignments = loaded["assignments"]
 
     if assignments:
         # DataFrame 변환 및 표시 형식 정리
@@ -32,17 +47,22 @@ try:
         # 직원 정보 조인 (간단한 표시용)
         display_data = []
         for asmt in assignments:
-            main_name = asmt.get("main_duty", {}).get("name", "-") if isinstance(asmt.get("main_duty"), dict) else "-"
-            sub_name = asmt.get("sub_duty", {}).get("name", "-") if isinstance(asmt.get("sub_duty"), dict) else "-"
+            holders = assignment_service.effective_holders(asmt)
+            names = {role: (holders.get(role, {}).get("employee") or {}).get("name", "-") for role in ("총당직", "부당직")}
+            rostered = {"총당직": asmt.get("main_duty") or {}, "부당직": asmt.get("sub_duty") or {}}
 
             display_data.append({
                 "일자": asmt["duty_date"],
                 "요일": asmt["day_of_week"],
                 "구분": asmt["day_category"],
                 "근무": asmt["duty_type"],
-                "총당직": main_name,
-                "부당직": sub_name,
+                "총당직": names["총당직"],
+                "부당직": names["부당직"],
                 "상태": asmt["status"],
+                "변경": ", ".join(
+                    f"{role} {rostered[role].get('name', '-')}→{names[role]}"
+                    for role, row in holders.items() if row.get("change_id")
+                ),
                 "id": asmt["id"],
             })
 
@@ -59,12 +79,39 @@ try:
         st.dataframe(styled_df, use_container_width=True, height=400)
         st.caption(f"총 {len(assignments)}건 조회됨")
 
+        conflicts = loaded["conflicts"]
+        if conflicts:
+            st.warning(
+                f"⚠️ 중복/휴식 부족 당직 {len(conflicts)}건 (최소 휴식 {conflict_index.DUTY_MIN_REST_HOURS:g}시간): "
+                + ", ".join(f"{c['current'][0]} {c['current'][1]} {c['current'][2]} "
+                            f"(앞 근무 {c['previous'][0]} {c['previous'][1]}, 휴식 {c['rest_hours']:g}시간)"
+                            for c in conflicts[:10])
+                + (" 외" if len(conflicts) > 10 else "")
+            )
+
     else:
         show_info(f"{year}년 {month}월 발령 데이터가 없습니다.")
 
 except Exception as e:
     show_error(f"데이터 조회 실패: {e}")
 
+# ── 월 명단 일괄 생성 ──
+with st.expander("🗓️ 월 명단 일괄 생성"):
+    st.caption(f"{year}년 {month}월의 모든 총당직/부당직 슬롯을 한 번에 배정합니다.")
+    roster_mode = st.radio(
+        "배정 방식", ["rotation", "fair"], horizontal=True,
+        format_func=lambda m: {"rotation": "LAST 사번 순번", "fair": "공정 배정"}[m],
+        help="공정 배정: 최근 당직 부하(휴무일 가중)가 낮은 직원부터, 최소 간격 유지",
+    )
+    overwrite = st.checkbox("기존 발령 덮어쓰기", value=False, help="해제 시 이미 등록된 (일자, 근무)는 유지")
+    if st.button("🗓️ 명단 생성", type="primary"):
+        try:
+            result = roster_service.generate_month(year, month, overwrite=overwrite, mode=roster_mode)
+            show_success(f"{len(result['rows'])}개 슬롯 중 {result['written']}건 저장되었습니다.")
+            st.rerun()
+        except Exception as e:
+            show_error(f"명단 생성 실패: {e}")
+
 # ── 발령 등록 ──
 st.markdown("---")
 st.subheader("📝 새 발령 등록")
@@ -74,13 +121,14 @@ with st.form("new_assignment_form"):
 
     with col1:
         duty_date = st.date_input("당직일자", value=date(year, month, 1))
-        day_of_week = ["월", "화", "수", "목", "금", "토", "일"][duty_date.weekday()]
-        st.text_input("요일", value=day_of_week, disabled=True)
+        day = duty_calendar.day_info(duty_date)
+        st.text_input("요일", value=day["day_of_week"], disabled=True)
 
     with col2:
-        is_holiday = duty_date.weekday() >= 5
-        day_category = st.selectbox("구분", ["휴무일", "평일"], index=0 if is_holiday else 1)
-        duty_type = st.selectbox("근무", ["주간", "야간"])
+        day_category = st.selectbox("구분", ["휴무일", "평일"], index=0 if day["day_category"] == "휴무일" else 1)
+        duty_type = st.selectbox("근무", ["주간", "야간"], index=0 if len(day["shifts"]) > 1 else 1)
+        st.caption(" / ".join(f"{s['label']} {s['start_time']}~{s['end_time']}" for s in day["shifts"])
+                   + (f" · {day['holiday_name']}" if day["holiday_name"] else ""))
 
     with col3:
         status = st.selectbox("상태", ["예정", "확정", "변경", "완료"])
@@ -95,10 +143,13 @@ with st.form("new_assignment_form"):
     with col3:
         if st.form_submit_button("🤖 자동배정", help="LAST 사번 기반 자동 배정"):
             try:
-                main_auto = assignment_service.auto_assign_next("총당직", day_category)
-                sub_auto = assignment_service.auto_assign_next("부당직", day_category)
+                shift = {"duty_date": duty_date.isoformat(), "shift_type": duty_type}
+                main_auto = assignment_service.auto_assign_next("총당직", day_category, columns="employee_no", **shift)
+                sub_auto = assignment_service.auto_assign_next("부당직", day_category, columns="employee_no", **shift)
 
-                if main_auto and sub_auto:
+                if not (main_auto and sub_auto):
+                    show_error("해당 근무에 배정 가능한 대상 직원이 없습니다 (중복/휴식 부족).")
+                else:
                     st.session_state["auto_main"] = main_auto["employee_no"]
                     st.session_state["auto_sub"] = sub_auto["employee_no"]
                     st.rerun()
@@ -121,15 +172,15 @@ with st.form("new_assignment_form"):
 
             # 직원 조회하여 UUID 가져오기
             from services import db
-            main_emps = db.select_where("employees", "employee_no", main_emp_no)
-            sub_emps = db.select_where("employees", "employee_no", sub_emp_no)
+            main_emps = db.select_where("employees", "employee_no", main_emp_no, columns="id")
+            sub_emps = db.select_where("employees", "employee_no", sub_emp_no, columns="id")
 
             if not main_emps or not sub_emps:
                 show_error("입력한 사번의 직원을 찾을 수 없습니다.")
             else:
                 new_assignment = {
                     "duty_date": duty_date.isoformat(),
-                    "day_of_week": day_of_week,
+                    "day_of_week": day["day_of_week"],
                     "duty_type": duty_type,
                     "day_category": day_category,
                     "main_duty_id": main_emps[0]["id"],
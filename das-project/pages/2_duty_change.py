@@ -2,16 +2,30 @@
 당직일정 변경등록 / 변경자 LIST
 - 변경 전/후 당직자 + 변경사유 입력
 - 변경자 LIST: 당직구분별 SORT
+- 일괄 변경: CSV/Excel 업로드 → 검증 결과 확인 → 통과한 행 등록
 """
 import streamlit as st
 import pandas as pd
 from datetime import datetime
 from components.common_ui import page_header, page_footer, show_success, show_error, show_info
-from services import change_service, assignment_service, db
+from services import change_service, assignment_service
 from config import CHANGE_REASONS
 
 page_header("당직일정 변경", "🔄")
 
+# 변경자 LIST 표시 필드
+CHANGE_LIST_COLUMNS = (
+    "change_date, duty_role, change_reason, assignment:duty_assignments(duty_date), "
+    "original:employees!duty_changes_original_employee_id_fkey(name), "
+    "new:employees!duty_changes_new_employee_id_fkey(name)"
+)
+# 변경 대상 발령 선택 필드
+ASSIGNMENT_OPTION_COLUMNS = (
+    "id, duty_date, duty_type, main_duty_id, sub_duty_id, "
+    f"{assignment_service.duty_embed('main_duty', 'name')}, "
+    f"{assignment_service.duty_embed('sub_duty', 'name')}"
+)
+
 # ── 월 선택 ──
 col1, col2, col3 = st.columns([2, 2, 6])
 with col1:
@@ -21,7 +35,7 @@ with col2:
 
 # ── 변경 이력 조회 ──
 try:
-    changes = change_service.get_changes_by_month(year, month)
+    changes = change_service.get_changes_by_month(year, month, columns=CHANGE_LIST_COLUMNS)
 
     if changes:
         display_data = []
@@ -59,7 +73,7 @@ with st.form("new_change_form"):
     with col1:
         # 당직 발령 선택 (당월 발령만)
         try:
-            assignments = assignment_service.get_assignments_by_month(year, month)
+            assignments = assignment_service.get_assignments_by_month(year, month, columns=ASSIGNMENT_OPTION_COLUMNS)
             if assignments:
                 asmt_options = {}
                 for asmt in assignments:
@@ -87,32 +101,51 @@ with st.form("new_change_form"):
 
     if submitted and selected_asmt:
         try:
-            # 직원 조회
-            new_emps = db.select_where("employees", "employee_no", new_emp_no)
-
-            if not new_emps:
-                show_error("입력한 사번의 직원을 찾을 수 없습니다.")
-            else:
-                # 변경 전 직원 ID 가져오기
-                if change_role == "총당직":
-                    original_emp_id = selected_asmt["main_duty_id"]
-                else:
-                    original_emp_id = selected_asmt["sub_duty_id"]
-
-                new_change = {
-                    "assignment_id": selected_asmt["id"],
-                    "original_employee_id": original_emp_id,
-                    "new_employee_id": new_emps[0]["id"],
-                    "duty_role": change_role,
-                    "change_reason": change_reason,
-                    "change_date": selected_asmt["duty_date"],
-                }
-
-                result = change_service.create_change(new_change)
-                show_success("변경이 등록되었습니다.")
-                st.rerun()
+            # 사번 확인 + 변경 등록 + 발령 상태 변경을 요청 1회로 처리
+            result = change_service.register_change(selected_asmt["id"], change_role, new_emp_no.strip(), change_reason)
+            show_success(f"변경이 등록되었습니다. ({change_role}: {result['original']['name']} → {result['new']['name']})")
+            st.rerun()
 
         except Exception as e:
             show_error(f"등록 실패: {e}")
 
+# ── 일괄 변경 ──
+st.markdown("---")
+with st.expander("📤 일괄 변경 등록 (CSV/Excel)"):
+    st.caption(f"컬럼: {', '.join(change_service.BULK_CHANGE_HEADERS)} (변경일 생략 시 당직일자)")
+    st.download_button("📄 양식 다운로드", data=change_service.bulk_change_template(),
+                       file_name="당직변경_양식.csv", mime="text/csv")
+    uploaded = st.file_uploader("변경 목록 파일", type=["csv", "xlsx"], key="bulk_change_file")
+    if uploaded is not None:
+        try:
+            plan = change_service.plan_bulk_changes(change_service.read_change_file(uploaded, uploaded.name))
+            report_area = st.container()  # 등록 후 실패 행을 반영해 표시하도록 결과 표는 아래에서 채움
+
+            if plan["changes"] and st.button(f"✅ {plan['valid']}건 등록", type="primary"):
+                result = change_service.apply_bulk_changes(plan["changes"])
+                change_service.mark_bulk_results(plan["rows"], result)
+                for failure in result["failed"]:
+                    show_error(f"{len(failure['rows'])}건 등록 실패 (전체 취소, "
+                               f"{', '.join(map(str, failure['rows']))}행): {failure['error']}")
+                if result["skipped"]:
+                    show_error(f"{len(result['skipped'])}건은 앞 청크 실패로 등록하지 않았습니다. 파일을 확인 후 다시 올려 주세요.")
+                show_success(f"{len(result['written'])}건 변경이 등록되었습니다.")
+
+            with report_area:
+                report_df = pd.DataFrame([{
+                    "행": r["row"],
+                    "당직일자": r.get("duty_date"),
+                    "근무": r.get("duty_type"),
+                    "구분": r.get("duty_role"),
+                    "변경후사번": r.get("new_employee_no"),
+                    "사유": r.get("change_reason"),
+                    "결과": "✅" if r["ok"] else "❌",
+                    "오류": r.get("message") or "",
+                } for r in plan["rows"]])
+                st.dataframe(report_df, use_container_width=True, hide_index=True)
+                valid = sum(1 for r in plan["rows"] if r["ok"])
+                st.caption(f"등록 가능 {valid}건 / 오류 {len(plan['rows']) - valid}건")
+        except Exception as e:
+            show_error(f"일괄 변경 실패: {e}")
+
 page_footer()
@@ -2,14 +2,58 @@
 비상연락망 관리
 - 직원별 비상연락처 CRUD
 - 성명으로 SORT, 사번 입력 시 자동조회
+- 오늘 당직자 연락처 (유효 명단: 변경 반영된 실제 당직자)
 """
 import streamlit as st
 import pandas as pd
+from datetime import date
 from components.common_ui import page_header, page_footer, show_success, show_error, show_info
-from services import db
+from services import assignment_service, db
 
 page_header("비상연락망", "📞")
 
+# 연락망 화면 표시 필드 (계좌번호/타임스탬프 등은 조회하지 않음)
+CONTACT_LIST_COLUMNS = (
+    "id, employee_no, name, department, position, factory, "
+    "contact:emergency_contacts(id, phone_home, phone_mobile, note)"
+)
+
+# 당직자 연락처 표시 필드 (유효 명단 → 실제 당직자 → 비상연락처)
+DUTY_CONTACT_COLUMNS = (
+    "duty_type, duty_role, "
+    + assignment_service.effective_employee_embed(
+        "employee_no, name, department, phone_home, phone_mobile, contact:emergency_contacts(phone_home, phone_mobile)"
+    )
+)
+
+# ── 당직자 연락처 ──
+duty_day = st.date_input("당직일자", value=date.today())
+try:
+    holders = assignment_service.get_duty_holders(duty_day.isoformat(), columns=DUTY_CONTACT_COLUMNS)
+    if holders:
+        rows = []
+        for holder in holders:
+            emp = holder.get("employee") or {}
+            contact = emp.get("contact")
+            if isinstance(contact, list):
+                contact = contact[0] if contact else None
+            rows.append({
+                "근무": holder["duty_type"],
+                "역할": holder["duty_role"],
+                "사번": emp.get("employee_no", "-"),
+                "성명": emp.get("name", "-"),
+                "소속": emp.get("department", "-"),
+                "핸드폰": (contact or {}).get("phone_mobile") or emp.get("phone_mobile") or "-",
+                "자택전화": (contact or {}).get("phone_home") or emp.get("phone_home") or "-",
+            })
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    else:
+        show_info("해당 일자의 당직 발령이 없습니다.")
+except Exception as e:
+    show_error(f"당직자 연락처 조회 실패: {e}")
+
+st.markdown("---")
+
 # ── 검색 ──
 col1, col2, col3 = st.columns([2, 2, 6])
 with col1:
@@ -20,22 +64,20 @@ with col2:
 # ── 연락망 조회 ──
 try:
     # 전체 직원 + 비상연락망 조인
-    client = db.get_client()
-    query = (
-        client.table("employees")
-        .select("*, contact:emergency_contacts(*)")
-        .eq("is_active", True)
-        .order("name")
-    )
+    filters = [("eq", "is_active", True)]
 
     # 검색 조건 추가
     if search_emp_no:
-        query = query.ilike("employee_no", f"%{search_emp_no}%")
+        filters.append(("ilike", "employee_no", f"%{search_emp_no}%"))
     if search_name:
-        query = query.ilike("name", f"%{search_name}%")
+        filters.append(("ilike", "name", f"%{search_name}%"))
 
-    response = query.execute()
-    employees = response.data
+    employees = db.select(
+        "employees",
+        columns=CONTACT_LIST_COLUMNS,
+        filters=filters,
+        order_by="name",
+    )
 
     if employees:
         display_data = []
@@ -87,7 +129,7 @@ with st.form("contact_form"):
     if submitted:
         try:
             # 직원 조회
-            emps = db.select_where("employees", "employee_no", emp_no)
+            emps = db.select_where("employees", "employee_no", emp_no, columns="id")
 
             if not emps:
                 show_error("입력한 사번의 직원을 찾을 수 없습니다.")
@@ -95,7 +137,7 @@ with st.form("contact_form"):
                 emp_id = emps[0]["id"]
 
                 # 기존 연락처 확인
-                existing_contacts = db.select_where("emergency_contacts", "employee_id", emp_id)
+                existing_contacts = db.select_where("emergency_contacts", "employee_id", emp_id, columns="id")
 
                 contact_data = {
                     "employee_id": emp_id,
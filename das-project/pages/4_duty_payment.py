@@ -1,19 +1,23 @@
 """
 당직비 지급 LIST
-- 월별 당직비 명세 조회
+- 월별 당직비 명세 조회 (저장된 스냅샷, 재계산 버튼으로 갱신)
 - 사업부별 소계/합계, 창원1/2 구분 집계
-- Excel 다운로드
+- 분기/연간 정산 (월별/사업부별/공장별)
+- Excel 다운로드 (월 / 기간: 요약 + 월별 시트, 사업부 소계)
 """
+import os
+
 import streamlit as st
 import pandas as pd
-from datetime import datetime
-from components.common_ui import page_header, page_footer, show_success, show_error, show_info
-from services import payment_service
+from datetime import date, datetime, timedelta
+from components.common_ui import page_header, page_footer, show_success, show_error, show_info, show_warning
+from services import payment_service, export_service
+from config import FACTORIES
 
 page_header("당직비 지급", "💰")
 
 # ── 월 선택 ──
-col1, col2, col3, col4 = st.columns([2, 2, 3, 3])
+col1, col2, col3, col4, col5 = st.columns([2, 2, 2, 2, 2])
 with col1:
     year = st.selectbox("연도", range(2024, 2027), index=1, key="payment_year")
 with col2:
@@ -22,6 +26,14 @@ with col3:
     if st.button("📊 계산", type="primary"):
         st.session_state["calculate_payment"] = True
 with col4:
+    if st.button("🔄 재계산", help="발령 데이터로 이 달의 당직비 스냅샷을 다시 계산해 저장"):
+        try:
+            report = payment_service.get_report(year, month, refresh=True)
+            show_success(f"{len(report.payments)}명 당직비를 다시 계산했습니다.")
+            st.session_state["calculate_payment"] = True
+        except Exception as e:
+            show_error(f"재계산 실패: {e}")
+with col5:
     if st.button("📥 Excel 다운로드"):
         try:
             excel_data = payment_service.generate_excel_data(year, month)
@@ -37,11 +49,24 @@ with col4:
 # ── 당직비 계산 및 조회 ──
 if st.session_state.get("calculate_payment"):
     try:
-        payments = payment_service.calculate_monthly_payments(year, month)
+        # 명세/집계/Excel이 같은 보고서를 공유 (조회/계산 1회)
+        report = payment_service.get_report(year, month)
+        payments = report.payments
+        errors = payment_service.refresh_errors()
+        for key in (f"{year}-{month:02d}", "*"):
+            if key in errors:
+                show_warning(f"당직비 스냅샷 갱신 실패 (이전 값 표시 중, 재계산 필요): {errors[key]}")
 
         if payments:
+            # 공장별 집계
+            factory_cols = st.columns(len(FACTORIES) + 1)
+            for col, factory in zip(factory_cols, [*FACTORIES, "전체"]):
+                data = report.factories.get(factory, {"count": 0, "amount": 0, "employees": 0})
+                col.metric(factory, f"{data['amount']:,}원", f"{data['employees']}명 / {data['count']}회",
+                           delta_color="off")
+
             # 사업부별 집계
-            summary = payment_service.get_summary_by_business_unit(year, month)
+            summary = report.business_units
 
             # 집계 표시
             st.subheader("📊 사업부별 집계")
@@ -73,12 +98,13 @@ if st.session_state.get("calculate_payment"):
                     "공장": emp.get("factory", "-"),
                     "횟수": payment["duty_count"],
                     "당직비": f"{payment['amount']:,}원",
+                    "지급": payment.get("payment_status") or "-",
                     "계좌": emp.get("bank_account", "-"),
                 })
 
             display_df = pd.DataFrame(display_data)
             st.dataframe(display_df, use_container_width=True, height=400, hide_index=True)
-            st.caption(f"총 {len(payments)}명 / {summary.get('전체', {}).get('amount', 0):,}원")
+            st.caption(f"총 {len(payments)}명 / {report.total['amount']:,}원")
 
         else:
             show_info(f"{year}년 {month}월 당직비 데이터가 없습니다.")
@@ -88,4 +114,45 @@ if st.session_state.get("calculate_payment"):
 else:
     st.info("월을 선택하고 '📊 계산' 버튼을 눌러주세요.")
 
+# ── 분기/연간 정산 ──
+with st.expander("📆 분기/연간 정산"):
+    period = st.selectbox("기간", ["연간", "1분기", "2분기", "3분기", "4분기"], key="payment_period")
+    first_month, last_month = (1, 12) if period == "연간" else (int(period[0]) * 3 - 2, int(period[0]) * 3)
+    if st.button("📥 기간 Excel 생성", help="요약 시트 + 월별 시트(사업부 소계)를 한 파일로 생성"):
+        try:
+            # 워크북은 임시 파일에 한 달씩 기록 → 파일에서 읽어 다운로드 후 삭제
+            path = export_service.export_payments_xlsx(year, first_month, last_month)
+            try:
+                with open(path, "rb") as f:
+                    st.download_button(
+                        label="다운로드",
+                        data=f,
+                        file_name=f"당직비_{year}_{period}.xlsx",
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    )
+            finally:
+                os.remove(path)
+        except Exception as e:
+            show_error(f"Excel 생성 실패: {e}")
+    if st.button("📊 정산 계산"):
+        try:
+            if period == "연간":
+                start, end = date(year, 1, 1), date(year + 1, 1, 1)
+            else:
+                quarter = int(period[0])
+                start = date(year, quarter * 3 - 2, 1)
+                end = date(year + 1, 1, 1) if quarter == 4 else date(year, quarter * 3 + 1, 1)
+            totals = payment_service.calculate_payments(start, end)
+            st.markdown(f"**{year}년 {period}** ({start} ~ {end - timedelta(days=1)})")
+            tab_month, tab_bu, tab_factory = st.tabs(["월별", "사업부별", "공장별"])
+            labels = {"duty_count": "당직 횟수", "amount": "총액", "employees": "인원"}
+            with tab_month:
+                st.dataframe(totals["month"].rename(columns=labels), use_container_width=True)
+            with tab_bu:
+                st.dataframe(totals["business_unit"].rename(columns=labels), use_container_width=True)
+            with tab_factory:
+                st.dataframe(totals["factory"].rename(columns=labels), use_container_width=True)
+        except Exception as e:
+            show_error(f"정산 계산 실패: {e}")
+
 page_footer()
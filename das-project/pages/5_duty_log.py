@@ -3,6 +3,7 @@
 - 1공장/2공장 탭 구성
 - 근무인원현황, 공사현황, 문제점/조치사항, 특이사항
 - 승인 프로세스: 저장 → 승인요청 → 승인/부결
+- 총당직/부당직: 유효 명단의 실제 당직자 표시/기록
 """
 import streamlit as st
 import json
@@ -13,6 +14,9 @@ from config import FACTORIES
 
 page_header("당직근무일지", "📝")
 
+# 일지 화면 표시 필드
+LOG_FORM_COLUMNS = "id, issues, special_notes, approval_status, approved_at, rejection_reason"
+
 # ── 공장 탭 ──
 tab1, tab2 = st.tabs(["🏭 창원1공장", "🏭 창원2공장"])
 
@@ -29,10 +33,20 @@ for tab, factory in zip([tab1, tab2], FACTORIES):
 
         # 기존 일지 조회
         try:
-            existing_log = log_service.get_log_by_date(log_date.isoformat(), factory, duty_type)
+            existing_log = log_service.get_log_by_date(log_date.isoformat(), factory, duty_type, columns=LOG_FORM_COLUMNS)
         except:
             existing_log = None
 
+        # 실제 당직자 (유효 명단: 변경 반영)
+        holders = log_service.get_duty_holders(log_date.isoformat(), duty_type)
+        if holders:
+            st.caption(" / ".join(
+                f"{role}: {(holders[role].get('employee') or {}).get('name', '-')}"
+                for role in ("총당직", "부당직") if role in holders
+            ))
+        else:
+            show_info("해당 근무의 당직 발령이 없습니다.")
+
         # ── 일지 입력 폼 ──
         with st.form(f"log_form_{factory}"):
             # 근무인원현황 (간략화)
@@ -96,6 +110,8 @@ for tab, factory in zip([tab1, tab2], FACTORIES):
                         "log_date": log_date.isoformat(),
                         "factory": factory,
                         "duty_type": duty_type,
+                        "main_duty_id": (holders.get("총당직") or {}).get("employee_id"),
+                        "sub_duty_id": (holders.get("부당직") or {}).get("employee_id"),
                         "workforce_status": json.dumps({
                             "special_workers": special_workers,
                             "night_workers": night_workers,
@@ -3,15 +3,34 @@
 - 발령기준/근무시간 관리
 - 테스트 데이터 초기화
 - 시스템 상태 확인
+- 데이터 내보내기 (CSV/Parquet)
 """
+import os
+from datetime import date
+
+import pandas as pd
 import streamlit as st
 from components.common_ui import page_header, page_footer, show_success, show_error, show_warning
 from components.duty_rules_help import show_duty_rules
-from services import db
+from services import assignment_service, db, export_service, instrumentation
 from config import APP_VERSION, DUTY_RULES, WORK_HOURS
 
 page_header("관리자", "⚙️")
 
+# 시스템 정보/데이터 통계에 필요한 건수를 RPC 한 번으로 조회
+STAT_LABELS = {
+    "employees": "직원",
+    "duty_assignments": "당직 발령",
+    "duty_changes": "당직 변경",
+    "duty_logs": "당직근무일지",
+    "emergency_contacts": "비상연락망",
+    "duty_payments": "당직비 기록",
+}
+try:
+    stats, stats_error = db.table_stats(), None
+except Exception as e:
+    stats, stats_error = None, e
+
 # ── 시스템 정보 ──
 st.subheader("📊 시스템 정보")
 col1, col2, col3 = st.columns(3)
@@ -20,18 +39,10 @@ with col1:
     st.metric("버전", APP_VERSION)
 
 with col2:
-    try:
-        emp_count = db.count("employees")
-        st.metric("등록 직원", f"{emp_count}명")
-    except:
-        st.metric("등록 직원", "연결 실패")
+    st.metric("등록 직원", f"{stats['employees']}명" if stats else "연결 실패")
 
 with col3:
-    try:
-        asmt_count = db.count("duty_assignments")
-        st.metric("총 당직 발령", f"{asmt_count}건")
-    except:
-        st.metric("총 당직 발령", "연결 실패")
+    st.metric("총 당직 발령", f"{stats['duty_assignments']}건" if stats else "연결 실패")
 
 # ── 발령 기준 ──
 st.markdown("---")
@@ -79,8 +90,7 @@ with col2:
 
                 for table in tables:
                     try:
-                        client = db.get_client()
-                        client.table(table).delete().neq("id", "00000000-0000-0000-0000-000000000000").execute()
+                        db.delete_all(table)
                         st.success(f"✅ {table} 삭제 완료")
                     except Exception as e:
                         st.error(f"❌ {table} 삭제 실패: {e}")
@@ -91,16 +101,55 @@ with col2:
             except Exception as e:
                 show_error(f"삭제 실패: {e}")
 
+# ── 순번 포인터 ──
+st.markdown("---")
+st.subheader("🔁 순번 포인터 (LAST 사번)")
+st.caption("발령 등록/수정/삭제 시 자동 갱신됩니다. 데이터 이관/복구 후에는 이력에서 재계산하세요.")
+
+if st.button("순번 포인터 재계산"):
+    try:
+        pointers = assignment_service.rebuild_rotation_pointers()
+        show_success(f"순번 포인터 {len(pointers)}건 재계산 완료")
+    except Exception as e:
+        show_error(f"재계산 실패: {e}")
+
+try:
+    pointers = assignment_service.get_rotation_pointers("employee_no, name")
+    st.dataframe(pd.DataFrame([{
+        "역할": role,
+        "구분": category,
+        "사번": (employee or {}).get("employee_no", "-"),
+        "성명": (employee or {}).get("name", "-"),
+    } for (role, category), employee in sorted(pointers.items())]), use_container_width=True, hide_index=True)
+except Exception as e:
+    show_error(f"순번 포인터 조회 실패: {e}")
+
+# ── 유효 명단 ──
+st.markdown("---")
+st.subheader("🧾 유효 명단 (실제 당직자)")
+st.caption("발령/변경 등록 시 자동 갱신됩니다. 데이터 이관/복구 후에는 발령/변경 이력에서 재계산하세요.")
+
+if st.button("유효 명단 재계산"):
+    try:
+        count = assignment_service.rebuild_effective_roster()
+        show_success(f"유효 명단 {count}건 재계산 완료")
+    except Exception as e:
+        show_error(f"재계산 실패: {e}")
+
 # ── DB 연결 테스트 ──
 st.markdown("---")
 st.subheader("🔌 DB 연결 테스트")
 
 if st.button("연결 테스트"):
     try:
-        client = db.get_client()
-        result = client.table("employees").select("*").limit(1).execute()
+        result = db.select("employees", columns="id", limit=1, use_cache=False)
         show_success("✅ Supabase 연결 성공!")
-        st.json({"status": "connected", "sample_count": len(result.data)})
+        st.json({
+            "status": "connected",
+            "sample_count": len(result),
+            "pool": db.get_pool_stats(),
+            "cache": db.get_cache_stats(),
+        })
     except Exception as e:
         show_error(f"❌ Supabase 연결 실패: {e}")
         st.error("`.env` 파일에 SUPABASE_URL과 SUPABASE_KEY가 올바르게 설정되어 있는지 확인하세요.")
@@ -109,24 +158,89 @@ if st.button("연결 테스트"):
 st.markdown("---")
 st.subheader("📈 데이터 통계")
 
-try:
-    stats = {
-        "직원": db.count("employees"),
-        "당직 발령": db.count("duty_assignments"),
-        "당직 변경": db.count("duty_changes"),
-        "당직근무일지": db.count("duty_logs"),
-        "비상연락망": db.count("emergency_contacts"),
-        "당직비 기록": db.count("duty_payments"),
-    }
-
+if stats_error:
+    show_error(f"통계 조회 실패: {stats_error}")
+else:
     col1, col2, col3 = st.columns(3)
-    items = list(stats.items())
+    items = [(label, stats[table]) for table, label in STAT_LABELS.items()]
 
     for i, (label, count) in enumerate(items):
         with [col1, col2, col3][i % 3]:
             st.metric(label, f"{count}건")
 
-except Exception as e:
-    show_error(f"통계 조회 실패: {e}")
+# ── 데이터 내보내기 ──
+st.markdown("---")
+st.subheader("📤 데이터 내보내기")
+st.caption("급여/인사 분석 시스템 연동용 - CSV(gzip) 또는 Parquet(pyarrow 필요), 배치 단위로 파일에 기록")
+
+EXPORT_DATASETS = {"당직비 명세": "payments", "당직 발령": "assignments", "당직근무일지": "logs"}
+col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
+with col1:
+    dataset = st.selectbox("데이터", list(EXPORT_DATASETS), key="export_dataset")
+with col2:
+    export_start = st.date_input("시작일", value=date(date.today().year, 1, 1), key="export_start")
+with col3:
+    export_end = st.date_input("종료일", value=date.today(), key="export_end")
+with col4:
+    export_format = st.radio("형식", list(export_service.EXPORT_FORMATS), key="export_format")
+
+if st.button("📤 파일 생성"):
+    try:
+        kind = EXPORT_DATASETS[dataset]
+        end_exclusive = date.fromordinal(export_end.toordinal() + 1).isoformat()
+        if kind == "payments":
+            if export_start.year != export_end.year:
+                raise ValueError("당직비 명세는 같은 연도 안에서만 내보낼 수 있습니다.")
+            path = export_service.export_payments(export_format, export_start.year, export_start.month, export_end.month)
+        elif kind == "assignments":
+            path = export_service.export_assignments(export_format, export_start.isoformat(), end_exclusive)
+        else:
+            path = export_service.export_logs(export_format, export_start.isoformat(), end_exclusive)
+        try:
+            with open(path, "rb") as f:
+                st.download_button(
+                    label="다운로드",
+                    data=f,
+                    file_name=f"das_{kind}_{export_start:%Y%m%d}_{export_end:%Y%m%d}"
+                              f"{export_service.EXPORT_FORMATS[export_format]}",
+                    mime="application/gzip" if export_format == "csv" else "application/vnd.apache.parquet",
+                )
+        finally:
+            os.remove(path)
+    except Exception as e:
+        show_error(f"내보내기 실패: {e}")
+
+# ── 쿼리 계측 ──
+st.markdown("---")
+st.subheader("⏱️ 쿼리 계측")
+
+tab1, tab2, tab3 = st.tabs(["테이블/연산별", "느린 호출", "페이지 렌더"])
+
+with tab1:
+    rows = instrumentation.summary()
+    if rows:
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    else:
+        st.info("기록된 호출이 없습니다.")
+
+with tab2:
+    rows = instrumentation.slowest(20)
+    if rows:
+        df = pd.DataFrame(rows)
+        df["filters"] = df["filters"].astype(str)
+        st.dataframe(df, use_container_width=True, hide_index=True)
+    else:
+        st.info("기록된 호출이 없습니다.")
+
+with tab3:
+    rows = instrumentation.render_summary()
+    if rows:
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    else:
+        st.info("기록된 렌더가 없습니다.")
+
+if st.button("계측 기록 초기화"):
+    instrumentation.reset()
+    st.rerun()
 
 page_footer()
@@ -3,23 +3,132 @@
 - Layer 2: 비즈니스 로직
 - 발령 생성/조회/수정/삭제
 - LAST 사번 기반 순번 자동배정
+- 발령 생성/자동배정 시 중복/휴식 부족 검사 (services/conflict_index.py)
+- 유효 명단 조회 (실제 당직자: 편성 원본 + 마지막 변경, 당직비/일지/비상연락/알림 공용)
 """
-from services import db
+from datetime import date
+
+from services import conflict_index, db, eligibility
 from config import DUTY_RULES
 
+# ── 컬럼 projection ──
+MAIN_DUTY_FKEY = "duty_assignments_main_duty_id_fkey"
+SUB_DUTY_FKEY = "duty_assignments_sub_duty_id_fkey"
+EMPLOYEE_SUMMARY_COLUMNS = "id, employee_no, name, department, position, grade"
+CHANGE_SUMMARY_COLUMNS = (
+    "id, duty_role, change_reason, change_date, original_employee_id, new_employee_id, "
+    "new_employee:employees!duty_changes_new_employee_id_fkey(employee_no, name)"
+)
+
+
+def duty_embed(alias: str, fields: str = EMPLOYEE_SUMMARY_COLUMNS) -> str:
+    """총당직/부당직 직원 임베딩 projection (alias: 'main_duty' | 'sub_duty')"""
+    fkey = MAIN_DUTY_FKEY if alias == "main_duty" else SUB_DUTY_FKEY
+    return f"{alias}:employees!{fkey}({fields})"
+
+
+def change_embed(fields: str = CHANGE_SUMMARY_COLUMNS) -> str:
+    """발령에 딸린 변경 이력 임베딩 projection (없으면 빈 목록)"""
+    return f"changes:duty_changes({fields})"
+
+
+# 월 발령 화면 기본 projection: 발령 + 총당직/부당직 직원 + 변경 이력
+MONTH_VIEW_COLUMNS = f"*, {duty_embed('main_duty')}, {duty_embed('sub_duty')}, {change_embed()}"
+
+# ── 유효 명단 (duty_roster_effective: 발령 x 역할, 마지막 변경 반영, DB 트리거가 유지) ──
+EFFECTIVE_TABLE = "duty_roster_effective"
+EFFECTIVE_FKEY = "duty_roster_effective_employee_id_fkey"
+
+
+def effective_employee_embed(fields: str = EMPLOYEE_SUMMARY_COLUMNS) -> str:
+    """유효 명단의 실제 당직자 직원 임베딩 projection"""
+    return f"employee:employees!{EFFECTIVE_FKEY}({fields})"
+
+
+def effective_embed(fields: str = None) -> str:
+    """발령에 딸린 유효 명단(역할별 실제 당직자) 임베딩 projection"""
+    fields = fields or f"duty_role, employee_id, {effective_employee_embed()}"
+    return f"effective:{EFFECTIVE_TABLE}({fields})"
 
-def get_assignments_by_month(year: int, month: int) -> list:
-    """월별 당직 발령 조회"""
+
+def effective_holders(assignment: dict) -> dict:
+    """effective_embed로 조회한 발령 → {역할: 유효 명단 행}"""
+    return {row["duty_role"]: row for row in assignment.get("effective") or []}
+
+
+EFFECTIVE_COLUMNS = (
+    "assignment_id, duty_role, duty_date, duty_type, day_category, status, employee_id, rostered_employee_id, "
+    f"change_id, {effective_employee_embed()}"
+)
+
+
+def month_range(year: int, month: int) -> tuple:
+    """월 조회 범위 (시작일 포함, 다음달 1일 미포함)"""
     start_date = f"{year}-{month:02d}-01"
-    if month == 12:
-        end_date = f"{year + 1}-01-01"
-    else:
-        end_date = f"{year}-{month + 1:02d}-01"
-    return db.select_between("duty_assignments", "duty_date", start_date, end_date, order_by="duty_date")
+    end_date = f"{year + 1}-01-01" if month == 12 else f"{year}-{month + 1:02d}-01"
+    return start_date, end_date
+
+
+def get_assignments_by_month(year: int, month: int, columns: str = MONTH_VIEW_COLUMNS) -> list:
+    """
+    월별 당직 발령 조회 (월 화면/서비스 공용, 요청 1회)
+    - 기본: 총당직/부당직 직원과 변경 이력을 함께 임베딩
+    - columns: 화면에서 필요한 필드만 지정 (임베딩 projection은 duty_embed/change_embed 사용)
+    """
+    return get_assignments_between(*month_range(year, month), columns=columns)
+
+
+def get_assignments_between(start_date: str, end_date: str, columns: str = MONTH_VIEW_COLUMNS) -> list:
+    """기간 당직 발령 조회 (start_date 포함, end_date 미포함 - 분기/연간 정산 등)"""
+    return db.select_between("duty_assignments", "duty_date", start_date, end_date, order_by="duty_date", columns=columns)
 
 
-def create_assignment(data: dict) -> dict:
-    """당직 발령 생성"""
+def check_assignment_conflicts(data: dict):
+    """발령 행의 총당직/부당직이 다른 근무와 겹치거나 휴식이 부족하면 ValueError"""
+    index = conflict_index.get_index(date.fromisoformat(data["duty_date"]))
+    for role, field in conflict_index.ROLE_FIELDS.items():
+        if not data.get(field):
+            continue
+        key = (data["duty_date"], data["duty_type"], role)
+        conflicts = index.conflicts(data[field], data["duty_date"], data["duty_type"], ignore=[key])
+        if conflicts:
+            raise ValueError(f"{role} 당직자가 {conflicts[0][0]} {conflicts[0][1]} {conflicts[0][2]} 근무와 겹치거나 "
+                             f"휴식 시간({index.rest_hours:g}시간)이 부족합니다.")
+
+
+def get_effective_roster(start_date: str, end_date: str, columns: str = EFFECTIVE_COLUMNS,
+                         employee_ids=None, statuses=None) -> list:
+    """
+    기간 유효 명단 조회 (start_date 포함, end_date 미포함, 요청 1회) - 실제 당직자 기준 단일 조회원
+    - employee_ids: 해당 직원이 실제 당직자인 행만, statuses: 발령 상태 필터
+    """
+    filters = [("gte", "duty_date", start_date), ("lt", "duty_date", end_date)]
+    if employee_ids is not None:
+        filters.append(("in_", "employee_id", sorted(employee_ids)))
+    if statuses is not None:
+        filters.append(("in_", "status", list(statuses)))
+    return db.select(EFFECTIVE_TABLE, columns=columns, filters=filters, order_by="duty_date")
+
+
+def get_duty_holders(duty_date: str, duty_type: str = None, columns: str = EFFECTIVE_COLUMNS) -> list:
+    """일자(+근무)의 실제 당직자 (유효 명단 행 목록)"""
+    filters = [("eq", "duty_date", duty_date)]
+    if duty_type:
+        filters.append(("eq", "duty_type", duty_type))
+    return db.select(EFFECTIVE_TABLE, columns=columns, filters=filters, order_by="duty_type")
+
+
+def rebuild_effective_roster() -> int:
+    """유효 명단을 발령/변경 이력에서 전체 재계산 (데이터 이관/복구 후 실행) → 행 수"""
+    count = db.rpc("das_rebuild_roster_effective")
+    db.invalidate_cache(EFFECTIVE_TABLE)
+    return count
+
+
+def create_assignment(data: dict, check_conflicts: bool = True) -> dict:
+    """당직 발령 생성 (check_conflicts: 중복/휴식 부족 검사)"""
+    if check_conflicts:
+        check_assignment_conflicts(data)
     return db.insert("duty_assignments", data)
 
 
@@ -33,101 +142,92 @@ def delete_assignment(assignment_id: str):
     return db.delete("duty_assignments", assignment_id)
 
 
-def get_last_duty_person(duty_type: str, day_category: str) -> dict | None:
+def get_last_duty_person(duty_type: str, day_category: str,
+                         columns: str = EMPLOYEE_SUMMARY_COLUMNS) -> dict | None:
     """
-    LAST 사번 조회: 해당 유형의 가장 최근 당직자 반환
+    LAST 사번 조회: 해당 유형의 가장 최근(완료/확정) 당직자 반환
     - duty_type: '총당직' | '부당직'
     - day_category: '휴무일' | '평일'
+    - columns: 반환할 직원 필드
+    - duty_rotation_pointers (발령 쓰기 시 트리거가 갱신)에서 키 조회 1건
     """
-    # 가장 최근 완료/확정된 발령 조회
-    client = db.get_client()
-    query = (
-        client.table("duty_assignments")
-        .select("*, main_duty:employees!duty_assignments_main_duty_id_fkey(*), sub_duty:employees!duty_assignments_sub_duty_id_fkey(*)")
-        .eq("day_category", day_category)
-        .in_("status", ["완료", "확정"])
-        .order("duty_date", desc=True)
-        .limit(1)
-    )
+    if duty_type not in ("총당직", "부당직"):
+        return None
 
-    response = query.execute()
-    if not response.data:
+    rows = db.select(
+        "duty_rotation_pointers",
+        columns=f"employee:employees({columns})",
+        filters=[("eq", "duty_role", duty_type), ("eq", "day_category", day_category)],
+        limit=1,
+    )
+    if not rows:
         return None
 
-    assignment = response.data[0]
+    return rows[0].get("employee")
+
+
+def get_rotation_pointers(columns: str = "employee_no") -> dict:
+    """모든 (역할, 구분)의 LAST 당직자 → {("총당직", "휴무일"): 직원 | None, ...}"""
+    rows = db.select("duty_rotation_pointers", columns=f"duty_role, day_category, employee:employees({columns})")
+    return {(r["duty_role"], r["day_category"]): r["employee"] for r in rows}
 
-    # duty_type에 따라 총당직/부당직 반환
-    if duty_type == "총당직":
-        return assignment.get("main_duty")
-    elif duty_type == "부당직":
-        return assignment.get("sub_duty")
 
-    return None
+def rebuild_rotation_pointers() -> list:
+    """순번 포인터를 발령 이력에서 전체 재계산 (데이터 이관/복구 후 실행)"""
+    rows = db.rpc("das_rebuild_rotation_pointers")
+    db.invalidate_cache("duty_rotation_pointers")
+    return rows
 
 
-def get_eligible_employees(duty_type: str, day_category: str) -> list:
+def get_eligible_employees(duty_type: str, day_category: str, columns: str = "*") -> list:
     """
     발령 대상 직원 목록 조회 (직급 기준 필터링)
     - DUTY_RULES에서 해당 유형의 대상 직급/직위 확인
     - employees 테이블에서 해당 조건의 활동 직원 조회
     """
-    # DUTY_RULES에서 규칙 찾기
-    rule_key = f"{day_category.replace('무일', '')}_{'main' if duty_type == '총당직' else 'sub'}"
-    # 예: "휴무일" + "총당직" -> "휴_main" (X) -> "holiday_main"
-    # 변환 로직
-    if day_category == "휴무일":
-        prefix = "holiday"
-    elif day_category == "평일":
-        prefix = "weekday"
-    else:
-        return []
-
-    suffix = "main" if duty_type == "총당직" else "sub"
-    rule_key = f"{prefix}_{suffix}"
-
-    rule = DUTY_RULES.get(rule_key)
+    rule = DUTY_RULES.get(eligibility.rule_key(duty_type, day_category))
     if not rule:
         return []
 
     # 해당 직급의 활동 직원 조회
     target_grades = rule["grades"]
-    client = db.get_client()
-    query = (
-        client.table("employees")
-        .select("*")
-        .eq("is_active", True)
-        .in_("grade", target_grades)
-        .order("employee_no")
+    return db.select(
+        "employees",
+        columns=columns,
+        filters=[("eq", "is_active", True), ("in_", "grade", target_grades)],
+        order_by="employee_no",
     )
 
-    response = query.execute()
-    return response.data
-
 
-def auto_assign_next(duty_type: str, day_category: str) -> dict | None:
+def auto_assign_next(duty_type: str, day_category: str,
+                     columns: str = EMPLOYEE_SUMMARY_COLUMNS,
+                     duty_date: str = None, shift_type: str = None) -> dict | None:
     """
     LAST 사번 기반 다음 순번 자동 배정
-    1. get_last_duty_person으로 최근 당직자 조회
-    2. get_eligible_employees로 대상자 목록 조회
-    3. 최근 당직자 다음 순번 반환 (순환)
+    1. get_last_duty_person으로 최근 당직자 사번 조회 (순번 포인터 키 조회)
+    2. 대상자 풀(services/eligibility.py)에서 사번순 다음 직원 조회 (bisect, 순환)
+       - 최근 당직자가 퇴직/직급 변경으로 풀에서 빠졌어도 사번순 다음 직원부터 이어감
+    3. duty_date/shift_type(주간/야간) 지정 시 그 근무와 겹치거나 휴식이 부족한 직원은 건너뜀
+       (모두 불가하면 None)
     """
-    last_person = get_last_duty_person(duty_type, day_category)
-    eligible_list = get_eligible_employees(duty_type, day_category)
-
-    if not eligible_list:
+    pool = eligibility.get_pools().pool(duty_type, day_category)
+    if not pool:
         return None
 
-    # 최근 당직자가 없으면 첫 번째 직원 반환
-    if not last_person:
-        return eligible_list[0]
-
-    # 최근 당직자 다음 순번 찾기
-    last_emp_no = last_person.get("employee_no")
-    for i, emp in enumerate(eligible_list):
-        if emp["employee_no"] == last_emp_no:
-            # 다음 순번 (순환)
-            next_idx = (i + 1) % len(eligible_list)
-            return eligible_list[next_idx]
+    last_person = get_last_duty_person(duty_type, day_category, columns="employee_no")
+    start = pool.index_after(last_person["employee_no"] if last_person else None)
+    if duty_date and shift_type:
+        index = conflict_index.get_index(date.fromisoformat(duty_date))
+        key = (duty_date, shift_type, duty_type)
+        candidates = (pool.at(start + i) for i in range(len(pool)))
+        employee = next((e for e in candidates if index.is_free(e["id"], duty_date, shift_type, ignore=[key])), None)
+        if employee is None:
+            return None
+    else:
+        employee = pool.at(start)
 
-    # 못 찾으면 첫 번째 반환
-    return eligible_list[0]
+    # 풀에 없는 필드를 요청하면 해당 직원만 다시 조회
+    fields = [c.strip() for c in columns.split(",")]
+    if all(f in employee for f in fields):
+        return {f: employee[f] for f in fields}
+    return db.select_by_id("employees", employee["id"], columns=columns)
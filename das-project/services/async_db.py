@@ -0,0 +1,193 @@
+"""
+비동기 데이터 접근 (Layer 3)
+- 독립적인 조회를 동시에 실행 → 화면 지연이 쿼리 합계가 아닌 가장 느린 쿼리로 제한됨
+- supabase: 공용 httpx.AsyncClient(keep-alive 풀) + AsyncClient, 백그라운드 이벤트 루프 스레드에서 실행
+- 그 외 백엔드(local 등): 동기 services.db 함수를 워커 스레드에서 실행
+- 조회 캐시/계측은 services.db와 공유 (services.db의 공개 쿼리 빌더/캐시 키 함수 사용)
+- call(): 동기 서비스 함수도 워커 스레드에서 함께 실행 (예: 발령 화면의 목록 + 중복 검사)
+- 동기 래퍼 run/run_all: Streamlit 페이지에서 그대로 사용
+
+사용 예:
+    results = async_db.run_all({
+        "직원": async_db.count("employees"),
+        "발령": async_db.select("duty_assignments", columns="id, status"),
+        "중복": async_db.call(conflict_index.find_conflicts, start, end),
+    })
+"""
+import asyncio
+import threading
+
+import httpx
+from supabase import AsyncClient, AsyncClientOptions, create_async_client
+from config import DB_POOL_SIZE, DB_POOL_KEEPALIVE, DB_TIMEOUT, DB_CONNECT_TIMEOUT
+from services import db, instrumentation
+from services.query_cache import tables_in_select
+
+# ── 이벤트 루프 / 클라이언트 (프로세스 공용) ──
+# httpx.AsyncClient의 연결은 생성된 이벤트 루프에 묶이므로,
+# 루프 하나를 데몬 스레드에서 계속 돌리고 모든 비동기 호출을 그 루프로 보낸다.
+_lock = threading.Lock()
+_loop: asyncio.AbstractEventLoop | None = None
+_client: AsyncClient | None = None
+_http_client: httpx.AsyncClient | None = None
+_client_lock: asyncio.Lock | None = None
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """백그라운드 이벤트 루프 반환 (최초 호출 시 스레드 시작)"""
+    global _loop, _client_lock
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _client_lock = asyncio.Lock()
+            threading.Thread(target=_loop.run_forever, name="das-async-db", daemon=True).start()
+        return _loop
+
+
+async def _get_client() -> AsyncClient:
+    """공용 비동기 Supabase 클라이언트 (이벤트 루프 스레드 안에서만 사용)"""
+    global _client, _http_client
+    async with _client_lock:
+        if _client is None:
+            if not db.SUPABASE_URL or not db.SUPABASE_KEY:
+                raise ValueError(
+                    "SUPABASE_URL과 SUPABASE_KEY가 .env 파일에 설정되어야 합니다. "
+                    ".env.example을 참고하세요."
+                )
+            _http_client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=DB_POOL_SIZE,
+                    max_keepalive_connections=DB_POOL_SIZE,
+                    keepalive_expiry=DB_POOL_KEEPALIVE,
+                ),
+                timeout=httpx.Timeout(DB_TIMEOUT, connect=DB_CONNECT_TIMEOUT),
+                follow_redirects=True,
+                event_hooks={"response": [_note_response]},
+            )
+            options = AsyncClientOptions(
+                httpx_client=_http_client,
+                postgrest_client_timeout=DB_TIMEOUT,
+                auto_refresh_token=False,
+                persist_session=False,
+            )
+            _client = await create_async_client(db.SUPABASE_URL, db.SUPABASE_KEY, options=options)
+        return _client
+
+
+async def _note_response(response: httpx.Response):
+    """응답 크기 계측 (같은 태스크의 instrumentation.track 기록에 반영)"""
+    instrumentation.note_response(response.headers)
+
+
+def close():
+    """비동기 클라이언트와 연결 풀 정리 (이벤트 루프는 유지)"""
+    global _client, _http_client
+    with _lock:
+        loop, http_client = _loop, _http_client
+        _client = None
+        _http_client = None
+    if loop is not None and http_client is not None:
+        asyncio.run_coroutine_threadsafe(http_client.aclose(), loop).result()
+
+
+def _native() -> bool:
+    """비동기 클라이언트를 직접 사용하는 백엔드인지 (그 외는 동기 함수를 스레드에서 실행)"""
+    return db.DB_BACKEND == "supabase"
+
+
+async def _execute(query, table: str, operation: str, filters=None):
+    """비동기 쿼리 실행 + 계측 기록"""
+    with instrumentation.track(table, operation, filters) as record:
+        response = await query.execute()
+        db.record_response(record, operation, response)
+    return response
+
+
+async def _cached(key: tuple, tables: set, loader, use_cache: bool = True, filters=None):
+    """services.db와 같은 캐시를 쓰는 read-through (loader는 코루틴 함수)"""
+    if not (db.DB_CACHE_ENABLED and use_cache):
+        return await loader()
+    hit, value = db.cache_lookup(key, filters)
+    if hit:
+        return value
+    value = await loader()
+    db.cache_store(key, tables, value)
+    return value
+
+
+# ── 비동기 조회 ──
+
+async def select(table: str, columns: str = "*", filters: list = None, order_by: str = None,
+                 desc: bool = False, limit: int = None, use_cache: bool = True) -> list:
+    """범용 조회 (인자는 services.db.select와 동일)"""
+    if not _native():
+        return await asyncio.to_thread(db.select, table, columns, filters, order_by, desc, limit, use_cache)
+
+    async def load():
+        query = db.select_query(await _get_client(), table, columns, filters, order_by, desc, limit)
+        return (await _execute(query, table, "select", filters)).data
+
+    key = db.select_key(table, columns, filters, order_by, desc, limit)
+    return await _cached(key, tables_in_select(table, columns), load, use_cache, filters)
+
+
+async def select_by_id(table: str, record_id: str, columns: str = "*"):
+    """ID로 단건 조회"""
+    if not _native():
+        return await asyncio.to_thread(db.select_by_id, table, record_id, columns)
+
+    filters = [("eq", "id", record_id)]
+
+    async def load():
+        client = await _get_client()
+        query = client.table(table).select(columns).eq("id", record_id).single()
+        return (await _execute(query, table, "select_by_id", filters)).data
+
+    return await _cached(db.select_by_id_key(table, record_id, columns), tables_in_select(table, columns), load, filters=filters)
+
+
+async def count(table: str, column: str = None, value=None, mode: str = "exact") -> int:
+    """건수 조회 (mode: exact | planned | estimated)"""
+    if not _native():
+        return await asyncio.to_thread(db.count, table, column, value, mode)
+
+    filters = db.count_filters(column, value)
+
+    async def load():
+        query = db.count_query(await _get_client(), table, filters, mode)
+        return (await _execute(query, table, "count", filters)).count or 0
+
+    return await _cached(db.count_key(table, column, value, mode), {table}, load, filters=filters)
+
+
+async def call(func, *args, **kwargs):
+    """동기 서비스 함수를 워커 스레드에서 실행 (서비스 단위 조회를 다른 조회와 동시에 실행)"""
+    return await asyncio.to_thread(func, *args, **kwargs)
+
+
+async def gather(*aws, return_exceptions: bool = False) -> list:
+    """독립적인 조회들을 동시에 실행 (asyncio.gather)"""
+    return await asyncio.gather(*aws, return_exceptions=return_exceptions)
+
+
+# ── 동기 래퍼 ──
+
+def run(coro, timeout: float = None):
+    """
+    코루틴을 백그라운드 이벤트 루프에서 실행하고 결과 반환 (동기 코드/Streamlit 페이지용)
+    - 호출 스레드의 contextvars(계측 렌더 정보 등)가 그대로 전달된다
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result(timeout)
+
+
+def run_all(calls: dict, return_exceptions: bool = False) -> dict:
+    """
+    {이름: 코루틴} 동시 실행 → {이름: 결과}
+    - return_exceptions=True: 실패한 항목은 예외 객체로 반환 (나머지 결과는 유지)
+    """
+    async def _all():
+        results = await gather(*calls.values(), return_exceptions=return_exceptions)
+        return dict(zip(calls, results))
+
+    return run(_all())
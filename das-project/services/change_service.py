@@ -1,45 +1,313 @@
 """
 당직 변경 서비스
 - 변경 등록/조회
-- 원본 발령 상태 업데이트
+- 변경 등록은 RPC das_register_change 한 번으로 처리 (사번 확인 + 변경 이력 + 발령 상태 '변경', 한 트랜잭션)
+  · 변경 전 직원 = 현재 당직자 (같은 역할의 마지막 변경 반영), 발령의 총당직/부당직 id는 편성 원본 유지
+  · 등록 전 변경 후 직원의 중복/휴식 부족 검사 (services/conflict_index.py, 메모리)
+- 일괄 변경 (CSV/Excel): 사번 in_ 조회 1회 + 발령 기간 조회 1회(중복 검사 인덱스 적재) → 메모리 검증
+  → RPC das_register_changes로 청크(DB_BULK_CHUNK_SIZE)마다 한 트랜잭션 기록, 행별 결과 보고
 """
-from services import db
+import os
+from datetime import date
 
+import pandas as pd
 
-def get_changes_by_month(year: int, month: int) -> list:
-    """월별 변경 이력 조회"""
-    start_date = f"{year}-{month:02d}-01"
-    if month == 12:
-        end_date = f"{year + 1}-01-01"
-    else:
-        end_date = f"{year}-{month + 1:02d}-01"
-
-    client = db.get_client()
-    query = (
-        client.table("duty_changes")
-        .select("*, assignment:duty_assignments(*), original:employees!duty_changes_original_employee_id_fkey(*), new:employees!duty_changes_new_employee_id_fkey(*)")
-        .gte("change_date", start_date)
-        .lt("change_date", end_date)
-        .order("change_date", desc=True)
+from services import assignment_service, conflict_index, db, eligibility
+from services.eligibility import DUTY_ROLES, rule_key
+from config import CHANGE_REASONS, DB_BULK_CHUNK_SIZE, DUTY_RULES
+
+# 변경 이력 기본 projection (발령 + 변경 전/후 직원 임베딩)
+CHANGE_DETAIL_COLUMNS = (
+    "*, assignment:duty_assignments(*), "
+    "original:employees!duty_changes_original_employee_id_fkey(*), "
+    "new:employees!duty_changes_new_employee_id_fkey(*)"
+)
+
+
+def get_changes_by_month(year: int, month: int, columns: str = CHANGE_DETAIL_COLUMNS) -> list:
+    """월별 변경 이력 조회 (columns: 화면에서 필요한 필드만 지정)"""
+    start_date, end_date = assignment_service.month_range(year, month)
+    return db.select(
+        "duty_changes",
+        columns=columns,
+        filters=[("gte", "change_date", start_date), ("lt", "change_date", end_date)],
+        order_by="change_date",
+        desc=True,
     )
 
-    response = query.execute()
-    return response.data
+
+# RPC 응답에서 변경 행이 아닌 임베딩 키 (assignment는 리스너가 월/편성 확인에 쓰도록 유지)
+_CHANGE_EMBEDS = ("original", "new")
+
+
+def _change_row(change: dict) -> dict:
+    """RPC 응답 → 쓰기 리스너에 전달할 변경 행 (+ assignment)"""
+    return {k: v for k, v in change.items() if k not in _CHANGE_EMBEDS}
+
+
+def _conflict_message(conflicts: list, rest_hours: float) -> str:
+    duty_date, duty_type, role = conflicts[0]
+    return f"{duty_date} {duty_type} {role} 근무와 겹치거나 휴식 시간({rest_hours:g}시간)이 부족합니다."
 
 
-def create_change(data: dict) -> dict:
-    """변경 등록 + 원본 발령 상태 업데이트"""
-    # 1. 변경 등록
-    inserted_change = db.insert("duty_changes", data)
+def check_change_conflicts(assignment_id: str, duty_role: str, new_employee_id: str,
+                           original_employee_id: str = None):
+    """
+    변경 후 직원이 다른 근무와 겹치거나 휴식이 부족하면 ValueError
+    - 발령이 없거나 original_employee_id가 현재 당직자와 다르면 검사하지 않음 (RPC가 거부)
+    """
+    duty_date = conflict_index.loaded_date(assignment_id)
+    if duty_date is None:
+        rows = db.select_where("duty_assignments", "id", assignment_id, columns="duty_date")
+        if not rows:
+            return
+        duty_date = rows[0]["duty_date"]
+    index = conflict_index.get_index(date.fromisoformat(duty_date))
+    entry = index.assignments.get(assignment_id)
+    if entry is None:
+        return
+    key = (entry["duty_date"], entry["duty_type"], duty_role)
+    if original_employee_id is not None and index.holder(key) != original_employee_id:
+        return
+    conflicts = index.conflicts(new_employee_id, entry["duty_date"], entry["duty_type"], ignore=[key])
+    if conflicts:
+        raise ValueError(f"변경 후 당직자가 {_conflict_message(conflicts, index.rest_hours)}")
 
-    # 2. 원본 발령 상태를 '변경'으로 업데이트
-    assignment_id = data.get("assignment_id")
-    if assignment_id:
-        db.update("duty_assignments", assignment_id, {"status": "변경"})
 
-    return inserted_change
+def register_change(assignment_id: str, duty_role: str, new_employee_no: str, change_reason: str,
+                    change_date: str = None, original_employee_id: str = None, new_employee_id: str = None,
+                    check_conflicts: bool = True) -> dict:
+    """
+    변경 등록 (쓰기 요청 1회, 원자적)
+    - 사전 검사는 공용 대상자 풀/중복 인덱스 사용: 화면에서 이미 적재했으면 추가 조회 없이 RPC 1회,
+      적재 전(프로세스 시작 직후, TTL 경과)에는 대상자 풀 + 발령 일자 + 월 인덱스 조회 3회 후 RPC
+    - new_employee_no: 변경 후 사번 (new_employee_id를 알면 대신 지정)
+    - original_employee_id: 화면에서 본 현재 당직자 (지정 시 그 사이 다른 변경이 있으면 거부)
+    - change_date: 미지정 시 당직일자 (RPC에서 적용, 일괄 등록과 동일)
+    - check_conflicts: 변경 후 직원의 중복/휴식 부족 검사 (대상자 풀에 없는 사번은 RPC가 판단)
+    반환: 변경 행 + assignment/original/new 임베딩 (new = 현재 당직자)
+    """
+    if check_conflicts:
+        employee_id = new_employee_id
+        if employee_id is None:
+            employee = eligibility.get_pools().find(new_employee_no)
+            employee_id = employee["id"] if employee else None
+        if employee_id is not None:
+            check_change_conflicts(assignment_id, duty_role, employee_id, original_employee_id)
+    change = db.rpc("das_register_change", {
+        "p_assignment_id": assignment_id,
+        "p_duty_role": duty_role,
+        "p_change_reason": change_reason,
+        "p_new_employee_no": new_employee_no,
+        "p_new_employee_id": new_employee_id,
+        "p_original_employee_id": original_employee_id,
+        "p_change_date": change_date,
+    })
+    db.notify_write("duty_changes", "insert", [_change_row(change)])
+    db.notify_write("duty_assignments", "change", [change["assignment"]])
+    return change
 
 
-def get_changes_by_assignment(assignment_id: str) -> list:
+def create_change(data: dict, check_conflicts: bool = True) -> dict:
+    """변경 등록 (duty_changes 행 형태 입력 → register_change)"""
+    return register_change(
+        data["assignment_id"], data["duty_role"], None, data["change_reason"],
+        change_date=data.get("change_date"),
+        original_employee_id=data.get("original_employee_id"),
+        new_employee_id=data["new_employee_id"],
+        check_conflicts=check_conflicts,
+    )
+
+
+def get_changes_by_assignment(assignment_id: str, columns: str = "*") -> list:
     """특정 발령의 변경 이력"""
-    return db.select_where("duty_changes", "assignment_id", assignment_id)
+    return db.select_where("duty_changes", "assignment_id", assignment_id, columns=columns)
+
+
+# ── 일괄 변경 ──
+
+# 파일 헤더 → 필드 (영문 필드명 헤더도 허용)
+BULK_CHANGE_HEADERS = {
+    "당직일자": "duty_date", "근무": "duty_type", "구분": "duty_role",
+    "변경후사번": "new_employee_no", "변경사유": "change_reason", "변경일": "change_date",
+}
+BULK_CHANGE_FIELDS = list(BULK_CHANGE_HEADERS.values())
+_REQUIRED_FIELDS = ("duty_date", "duty_type", "duty_role", "new_employee_no", "change_reason")
+_DUTY_TYPES = ("주간", "야간")
+
+
+def bulk_change_template() -> bytes:
+    """일괄 변경 CSV 양식 (헤더 + 예시 1행)"""
+    example = ["2025-03-15", "주간", "부당직", "E0001", "출장", ""]
+    return (",".join(BULK_CHANGE_HEADERS) + "\n" + ",".join(example) + "\n").encode("utf-8-sig")
+
+
+def read_change_file(file, filename: str) -> list:
+    """CSV/Excel 파일 → 행 목록 (필드명으로 정규화, 빈 칸은 None)"""
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == ".csv":
+        frame = pd.read_csv(file, dtype=str, encoding="utf-8-sig")
+    elif ext in (".xlsx", ".xls"):
+        frame = pd.read_excel(file, dtype=str)
+    else:
+        raise ValueError(f"지원하지 않는 파일 형식입니다: {ext} (CSV/Excel)")
+    frame = frame.rename(columns=lambda c: BULK_CHANGE_HEADERS.get(str(c).replace(" ", ""), str(c).strip()))
+    missing = [f for f in _REQUIRED_FIELDS if f not in frame.columns]
+    if missing:
+        labels = {v: k for k, v in BULK_CHANGE_HEADERS.items()}
+        raise ValueError(f"필수 컬럼이 없습니다: {', '.join(labels[f] for f in missing)}")
+    rows = []
+    for record in frame.to_dict("records"):
+        rows.append({
+            field: value.strip() if isinstance(value, str) and value.strip() else None
+            for field, value in ((f, record.get(f)) for f in BULK_CHANGE_FIELDS)
+        })
+    return rows
+
+
+def _parse_date(value: str | None) -> str | None:
+    """'2025-03-15' / '2025.03.15' / '2025/3/15' / Excel 일시 → ISO 일자 (형식 오류 시 ValueError)"""
+    if value is None:
+        return None
+    text = value.split(" ")[0].replace(".", "-").replace("/", "-").strip("-")
+    year, month, day = (int(part) for part in text.split("-"))
+    return date(year, month, day).isoformat()
+
+
+def plan_bulk_changes(rows: list) -> dict:
+    """
+    일괄 변경 검증 (조회 최대 2회: 사번 in_ 1회 + 중복 검사 인덱스의 미적재 월 1회, 나머지는 메모리)
+    - 행 순서대로 적용한다고 보고 현재 당직자를 이어서 계산 (같은 당직을 여러 번 바꾸는 파일 허용)
+    - 검증: 필수값/형식, 발령 존재, 재직 직원, DUTY_RULES 직급, 변경 전/후 동일, 같은 발령의 다른 역할과 중복,
+      다른 근무와 겹침/휴식 부족 (앞 행 변경 포함)
+    반환: {"rows": [{row, ..., ok, message}], "changes": [RPC 항목 + row], "valid": n, "invalid": n}
+    """
+    report, parsed = [], []
+    for i, row in enumerate(rows):
+        entry = dict(row, row=i + 2, ok=False, message=None)  # row: 파일 행 번호 (헤더 = 1행)
+        report.append(entry)
+        try:
+            missing = [f for f in _REQUIRED_FIELDS if not row.get(f)]
+            if missing:
+                raise ValueError(f"필수값 누락: {', '.join(missing)}")
+            if row["duty_type"] not in _DUTY_TYPES:
+                raise ValueError(f"근무는 {'/'.join(_DUTY_TYPES)} 중 하나여야 합니다.")
+            if row["duty_role"] not in DUTY_ROLES:
+                raise ValueError(f"구분은 {'/'.join(DUTY_ROLES)} 중 하나여야 합니다.")
+            if row["change_reason"] not in CHANGE_REASONS:
+                raise ValueError(f"변경사유는 {'/'.join(CHANGE_REASONS)} 중 하나여야 합니다.")
+            try:
+                duty_date, change_date = _parse_date(row["duty_date"]), _parse_date(row.get("change_date"))
+            except ValueError:
+                raise ValueError("일자 형식이 올바르지 않습니다 (YYYY-MM-DD).")
+        except ValueError as e:
+            entry["message"] = str(e)
+            continue
+        entry.update(duty_date=duty_date, change_date=change_date)
+        parsed.append(entry)
+
+    employees, work = {}, None
+    if parsed:
+        numbers = sorted({e["new_employee_no"] for e in parsed})
+        employees = {
+            e["employee_no"]: e for e in db.select(
+                "employees", columns="id, employee_no, name, grade, is_active",
+                filters=[("in_", "employee_no", numbers)],
+            )
+        }
+        index = conflict_index.get_index(date.fromisoformat(min(e["duty_date"] for e in parsed)),
+                                         date.fromisoformat(max(e["duty_date"] for e in parsed)))
+        work = index.scratch()  # 앞 행 적용 결과를 이어서 반영 (공용 인덱스는 그대로)
+
+    changes = []
+    for entry in parsed:
+        asmt = work.assignment(entry["duty_date"], entry["duty_type"])
+        employee = employees.get(entry["new_employee_no"])
+        if asmt is None:
+            entry["message"] = f"{entry['duty_date']} {entry['duty_type']} 발령이 없습니다."
+            continue
+        if employee is None:
+            entry["message"] = f"사번 {entry['new_employee_no']} 직원이 없습니다."
+            continue
+        if employee.get("is_active") is False:
+            entry["message"] = f"사번 {entry['new_employee_no']} 직원은 재직 중이 아닙니다."
+            continue
+        rule = DUTY_RULES[rule_key(entry["duty_role"], asmt["day_category"])]
+        if employee["grade"] not in rule["grades"]:
+            entry["message"] = f"{rule['label']} 대상 직급이 아닙니다 ({employee['grade']}급)."
+            continue
+        role, other = entry["duty_role"], next(r for r in DUTY_ROLES if r != entry["duty_role"])
+        key = (entry["duty_date"], entry["duty_type"], role)
+        original = work.holder(key)
+        if original is None:
+            entry["message"] = f"{entry['duty_date']} {entry['duty_type']} {role} 당직자가 배정되지 않았습니다."
+            continue
+        if original == employee["id"]:
+            entry["message"] = "변경 전/후 당직자가 같습니다."
+            continue
+        if work.holder((entry["duty_date"], entry["duty_type"], other)) == employee["id"]:
+            entry["message"] = f"같은 당직의 {other} 당직자입니다."
+            continue
+        conflicts = work.conflicts(employee["id"], entry["duty_date"], entry["duty_type"], ignore=[key])
+        if conflicts:
+            entry["message"] = _conflict_message(conflicts, work.rest_hours)
+            continue
+
+        work.assign(key, employee["id"])
+        entry.update(ok=True, new_employee_name=employee["name"])
+        changes.append({
+            "assignment_id": asmt["id"], "duty_role": role, "change_reason": entry["change_reason"],
+            "new_employee_id": employee["id"], "original_employee_id": original,
+            "change_date": entry["change_date"], "row": entry["row"],
+        })
+
+    valid = sum(1 for entry in report if entry["ok"])
+    return {"rows": report, "changes": changes, "valid": valid, "invalid": len(report) - valid}
+
+
+def apply_bulk_changes(changes: list, chunk_size: int = None) -> dict:
+    """
+    검증된 변경 기록 (청크마다 RPC 1회 = 한 트랜잭션)
+    - 실패 청크는 전체 취소 후 중단: 뒤 행은 앞 행 적용을 전제로 검증했으므로 (이어진 변경 등) 기록하지 않음
+    - changes의 row(파일 행 번호)는 결과 표시용 (없으면 목록 순번)
+    반환: {"written": [변경 행], "failed": [{"chunk", "rows": [행 번호], "error"}], "skipped": [행 번호]}
+    """
+    chunk_size = chunk_size or DB_BULK_CHUNK_SIZE
+    written, failed, skipped = [], [], []
+    for i in range(0, len(changes), chunk_size):
+        chunk = changes[i:i + chunk_size]
+        rows = [c.get("row", i + n + 1) for n, c in enumerate(chunk)]
+        if failed:
+            skipped.extend(rows)
+            continue
+        try:
+            written.extend(db.rpc("das_register_changes",
+                                  {"p_changes": [{k: v for k, v in c.items() if k != "row"} for c in chunk]}))
+        except Exception as e:
+            failed.append({"chunk": i // chunk_size, "rows": rows, "error": str(e)})
+    if written:
+        db.notify_write("duty_changes", "insert", [_change_row(c) for c in written])
+        db.notify_write("duty_assignments", "change",
+                        list({c["assignment"]["id"]: c["assignment"] for c in written}.values()))
+    return {"written": written, "failed": failed, "skipped": skipped}
+
+
+def mark_bulk_results(report: list, result: dict) -> list:
+    """검증 결과 행(plan["rows"])에 기록 실패/미기록 행 표시 (ok=False, message=오류)"""
+    errors = {row: f"등록 실패 (청크 전체 취소): {f['error']}" for f in result["failed"] for row in f["rows"]}
+    errors.update((row, "앞 청크 등록 실패로 기록하지 않았습니다.") for row in result["skipped"])
+    for entry in report:
+        if entry["ok"] and entry["row"] in errors:
+            entry.update(ok=False, message=errors[entry["row"]])
+    return report
+
+
+def import_changes(rows: list) -> dict:
+    """일괄 변경: 검증 후 통과한 행만 기록 → plan_bulk_changes 결과 (기록 실패 행 반영) + written/failed/skipped"""
+    plan = plan_bulk_changes(rows)
+    if not plan["changes"]:
+        return dict(plan, written=[], failed=[], skipped=[])
+    result = apply_bulk_changes(plan["changes"])
+    mark_bulk_results(plan["rows"], result)
+    valid = sum(1 for entry in plan["rows"] if entry["ok"])
+    return dict(plan, valid=valid, invalid=len(plan["rows"]) - valid, **result)
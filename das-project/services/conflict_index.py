@@ -0,0 +1,311 @@
+"""
+당직 중복/휴식 부족 검사 (메모리 인덱스)
+- 직원 id → 근무 구간(시작, 종료, 슬롯) 정렬 목록 (실제 당직자 기준: 같은 역할의 마지막 변경 반영)
+  · 슬롯 키: (duty_date, duty_type, 역할) / 구간: 당직 달력 근무 시간 (분 단위, 야간은 다음날 종료)
+- "D일 근무에 N시간 휴식을 지켜 배정 가능한가" → bisect로 앞뒤 구간만 확인 O(log n)
+- 발령/변경 쓰기 시 증분 갱신 (services.db 쓰기 리스너), 월 단위로 필요한 기간만 적재
+- 프로세스 공용 인덱스는 조회 캐시와 같은 TTL로 재구성 (다른 프로세스의 변경 반영)
+- scratch(): 공용 인덱스 위에 임시 배정을 쌓는 작업용 인덱스 (명단 생성/일괄 변경 검증, 공용 인덱스는 그대로)
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import date, timedelta
+from functools import lru_cache
+
+from services import db, duty_calendar
+from config import DB_CACHE_TTL, DUTY_MIN_REST_HOURS, WORK_HOURS
+
+ROLE_FIELDS = {"총당직": "main_duty_id", "부당직": "sub_duty_id"}
+_MAX_SHIFT_MINUTES = 24 * 60  # 한 근무의 최대 길이 (앞쪽 탐색 범위)
+
+# 인덱스 적재 projection: 유효 명단 (발령 x 역할, 편성 원본 + 변경 반영된 실제 당직자)
+INDEX_TABLE = "duty_roster_effective"
+INDEX_COLUMNS = "assignment_id, duty_role, duty_date, duty_type, day_category, employee_id, rostered_employee_id, change_id"
+
+
+def _minutes(hhmm: str) -> int:
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+@lru_cache(maxsize=4096)
+def shift_interval(duty_date: str, duty_type: str) -> tuple:
+    """근무 구간 (시작 분, 종료 분) - 기준: 0001-01-01 00:00, 달력에 없는 근무는 휴무일 근무 시간"""
+    day = date.fromisoformat(duty_date)
+    shift = duty_calendar.shift(day, duty_type)
+    if shift is None:
+        hours = WORK_HOURS["holiday_day" if duty_type == "주간" else "holiday_night"]
+        shift = {"start_time": hours["start"], "end_time": hours["end"]}
+    base = day.toordinal() * 24 * 60
+    start, end = base + _minutes(shift["start_time"]), base + _minutes(shift["end_time"])
+    return start, end if end > start else end + 24 * 60
+
+
+class ConflictIndex:
+    """
+    직원별 근무 구간 인덱스
+
+    사용 예:
+        index = conflict_index.get_index(start, end)
+        index.conflicts(employee_id, "2025-03-15", "주간")     # 충돌 슬롯 목록 (없으면 [])
+        work = index.scratch(); work.assign(("2025-03-15", "주간", "부당직"), employee_id)
+    """
+
+    def __init__(self, rest_hours: float = DUTY_MIN_REST_HOURS, parent: "ConflictIndex" = None):
+        self.rest_hours = rest_hours
+        self.parent = parent
+        self.shifts = {}       # 직원 id -> 정렬된 [(시작, 종료, 슬롯 키)]
+        self.holders = {}      # 슬롯 키 -> 직원 id
+        self.hidden = set()    # scratch: 상위 인덱스에서 덮어쓴 슬롯 키
+        self.assignments = {}  # 발령 id -> {duty_date, duty_type, day_category, rostered, overrides}
+        self.slots = {}        # (duty_date, duty_type) -> 발령 id
+
+    # ── 슬롯 ──
+
+    def holder(self, key: tuple) -> str | None:
+        """슬롯의 현재 당직자"""
+        if key in self.holders or self.parent is None or key in self.hidden:
+            return self.holders.get(key)
+        return self.parent.holder(key)
+
+    def assign(self, key: tuple, employee_id: str | None):
+        """슬롯 당직자 지정 (None: 비움)"""
+        previous = self.holders.pop(key, None)
+        if previous is not None:
+            entries = self.shifts[previous]
+            entries.pop(bisect_left(entries, (*shift_interval(key[0], key[1]), key)))
+        if self.parent is not None:
+            self.hidden.add(key)
+        if employee_id is not None:
+            insort(self.shifts.setdefault(employee_id, []), (*shift_interval(key[0], key[1]), key))
+            self.holders[key] = employee_id
+
+    def scratch(self) -> "ConflictIndex":
+        """이 인덱스 위에 임시 배정을 쌓는 작업용 인덱스"""
+        return ConflictIndex(self.rest_hours, parent=self)
+
+    # ── 조회 ──
+
+    def _near(self, employee_id: str, start: int, end: int, rest: int) -> list:
+        entries = self.shifts.get(employee_id)
+        if not entries:
+            return []
+        found = []
+        i = bisect_left(entries, (start - rest - _MAX_SHIFT_MINUTES,))
+        while i < len(entries) and entries[i][0] < end + rest:
+            if entries[i][1] + rest > start:
+                found.append(entries[i][2])
+            i += 1
+        return found
+
+    def conflicts(self, employee_id: str, duty_date: str, duty_type: str, ignore=(), rest_hours: float = None) -> list:
+        """
+        해당 근무와 겹치거나 휴식 시간이 부족한 기존 슬롯 키 목록
+        - ignore: 제외할 슬롯 키 (예: 교체 대상 슬롯 자신)
+        """
+        start, end = shift_interval(duty_date, duty_type)
+        rest = int((self.rest_hours if rest_hours is None else rest_hours) * 60)
+        ignore = set(ignore)
+        found = [k for k in self._near(employee_id, start, end, rest) if k not in ignore]
+        index, hidden = self.parent, set(self.hidden)
+        while index is not None:
+            found += [k for k in index._near(employee_id, start, end, rest) if k not in ignore and k not in hidden]
+            hidden |= index.hidden
+            index = index.parent
+        return sorted(found)
+
+    def is_free(self, employee_id: str, duty_date: str, duty_type: str, ignore=(), rest_hours: float = None) -> bool:
+        """해당 근무에 배정 가능한지 (겹침/휴식 부족 없음)"""
+        return not self.conflicts(employee_id, duty_date, duty_type, ignore, rest_hours)
+
+    def violations(self, start: date, end: date, rest_hours: float = None) -> list:
+        """
+        기간(양 끝 포함)에 시작하는 근무 중 앞 근무와 겹치거나 휴식이 부족한 것 (이 인덱스 자체 배정 기준)
+        반환: [{"employee_id", "previous": 슬롯 키, "current": 슬롯 키, "rest_hours": 실제 휴식 시간}]
+        """
+        rest = int((self.rest_hours if rest_hours is None else rest_hours) * 60)
+        first = start.toordinal() * 24 * 60
+        last = (end.toordinal() + 1) * 24 * 60
+        found = []
+        for employee_id, entries in self.shifts.items():
+            i = max(bisect_left(entries, (first,)), 1)
+            while i < len(entries) and entries[i][0] < last:
+                previous, current = entries[i - 1], entries[i]
+                if current[0] - previous[1] < rest:
+                    found.append({"employee_id": employee_id, "previous": previous[2], "current": current[2],
+                                  "rest_hours": (current[0] - previous[1]) / 60})
+                i += 1
+        return sorted(found, key=lambda v: (shift_interval(*v["current"][:2]), v["current"], v["employee_id"]))
+
+    # ── 발령/변경 반영 (공용 인덱스) ──
+
+    def set_assignment(self, row: dict, changes: list = None):
+        """
+        발령 1건 반영 (신규/수정)
+        - changes: 변경 이력 (지정 시 역할별 마지막 변경 후 직원을 실제 당직자로, 미지정 시 기존 변경 반영 유지)
+        """
+        previous = self.assignments.get(row["id"])
+        if changes is not None:
+            overrides = {}
+            for change in sorted(changes, key=lambda c: c.get("seq") or 0):
+                overrides[change["duty_role"]] = change["new_employee_id"]
+        else:
+            overrides = previous["overrides"] if previous else {}
+        if previous is not None:
+            self.remove_assignment(row["id"])
+        entry = {
+            "duty_date": row["duty_date"], "duty_type": row["duty_type"], "day_category": row.get("day_category"),
+            "rostered": {role: row.get(field) for role, field in ROLE_FIELDS.items()}, "overrides": overrides,
+        }
+        self.assignments[row["id"]] = entry
+        self.slots[(row["duty_date"], row["duty_type"])] = row["id"]
+        for role in ROLE_FIELDS:
+            self.assign((row["duty_date"], row["duty_type"], role), overrides.get(role) or entry["rostered"][role])
+
+    def remove_assignment(self, assignment_id: str):
+        entry = self.assignments.pop(assignment_id, None)
+        if entry is None:
+            return
+        self.slots.pop((entry["duty_date"], entry["duty_type"]), None)
+        for role in ROLE_FIELDS:
+            self.assign((entry["duty_date"], entry["duty_type"], role), None)
+
+    def apply_change(self, change: dict) -> bool:
+        """변경 1건 반영 (발령이 적재되지 않았으면 False)"""
+        entry = self.assignments.get(change.get("assignment_id"))
+        if entry is None:
+            return False
+        entry["overrides"][change["duty_role"]] = change["new_employee_id"]
+        self.assign((entry["duty_date"], entry["duty_type"], change["duty_role"]), change["new_employee_id"])
+        return True
+
+    def assignment(self, duty_date: str, duty_type: str) -> dict | None:
+        """(일자, 근무)의 발령 정보 + id + 역할별 현재 당직자 (scratch는 상위 인덱스의 발령 사용)"""
+        index = self
+        while index is not None and (duty_date, duty_type) not in index.slots:
+            index = index.parent
+        if index is None:
+            return None
+        assignment_id = index.slots[(duty_date, duty_type)]
+        entry = index.assignments[assignment_id]
+        holders = {role: self.holder((duty_date, duty_type, role)) for role in ROLE_FIELDS}
+        return dict(entry, id=assignment_id, holders=holders)
+
+
+# ── 프로세스 공용 인덱스 ──
+_lock = threading.RLock()
+_index: ConflictIndex | None = None
+_loaded = set()  # 적재한 월 (YYYY, M)
+_built_at = 0.0
+
+
+def _months(start: date, end: date) -> list:
+    months, year, month = [], start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def _from_effective(rows: list) -> list:
+    """유효 명단 행 → [(발령 행, 변경 반영 목록)] (set_assignment 입력 형태)"""
+    grouped = {}
+    for row in rows:
+        asmt, changes = grouped.setdefault(row["assignment_id"], ({
+            "id": row["assignment_id"], "duty_date": row["duty_date"], "duty_type": row["duty_type"],
+            "day_category": row.get("day_category"),
+        }, []))
+        asmt[ROLE_FIELDS[row["duty_role"]]] = row.get("rostered_employee_id")
+        if row.get("change_id"):
+            changes.append({"duty_role": row["duty_role"], "new_employee_id": row.get("employee_id")})
+    return list(grouped.values())
+
+
+def get_index(start: date, end: date = None) -> ConflictIndex:
+    """
+    기간(양 끝 포함, 앞뒤 휴식 확인 여유 포함)이 적재된 공용 인덱스
+    - 적재되지 않은 월은 한 번의 기간 조회로 적재, 최초/TTL 경과 시 재구성
+    """
+    global _index, _built_at
+    end = end or start
+    margin = timedelta(days=int(DUTY_MIN_REST_HOURS // 24) + 2)
+    with _lock:
+        if _index is None or time.monotonic() - _built_at > DB_CACHE_TTL:
+            _index, _built_at = ConflictIndex(), time.monotonic()
+            _loaded.clear()
+        missing = [m for m in _months(start - margin, end + margin) if m not in _loaded]
+        if missing:
+            first = date(*missing[0], 1)
+            last_year, last_month = missing[-1]
+            until = date(last_year + 1, 1, 1) if last_month == 12 else date(last_year, last_month + 1, 1)
+            rows = db.select_between(INDEX_TABLE, "duty_date", first.isoformat(), until.isoformat(),
+                                     order_by="duty_date", columns=INDEX_COLUMNS)
+            for row, changes in _from_effective(rows):
+                _index.set_assignment(row, changes)
+            _loaded.update(_months(first, until - timedelta(days=1)))
+        return _index
+
+
+def loaded_date(assignment_id: str):
+    """공용 인덱스에 적재된 발령의 당직일자 (미적재/만료 시 None → 호출자가 조회)"""
+    with _lock:
+        if _index is None or time.monotonic() - _built_at > DB_CACHE_TTL:
+            return None
+        entry = _index.assignments.get(assignment_id)
+        return entry["duty_date"] if entry else None
+
+
+def find_conflicts(start: date, end: date, rest_hours: float = None) -> list:
+    """기간(양 끝 포함) 실제 당직자 기준 중복/휴식 부족 목록 (ConflictIndex.violations)"""
+    return get_index(start, end).violations(start, end, rest_hours)
+
+
+def reset():
+    """공용 인덱스 폐기 (다음 get_index에서 재구성)"""
+    global _index
+    with _lock:
+        _index = None
+        _loaded.clear()
+
+
+def _on_assignment_write(operation: str, rows: list):
+    """발령 쓰기를 공용 인덱스에 증분 반영 (적재된 월만)"""
+    with _lock:
+        if _index is None:
+            return
+        if operation == "reset":
+            reset()
+            return
+        for row in rows or []:
+            if "id" not in row:
+                reset()  # 식별 불가한 응답 → 다음 조회 시 재구성
+                return
+            if operation == "delete":
+                _index.remove_assignment(row["id"])
+            elif not {"duty_date", "duty_type", *ROLE_FIELDS.values()} <= row.keys():
+                reset()
+                return
+            elif (int(row["duty_date"][:4]), int(row["duty_date"][5:7])) in _loaded:
+                _index.set_assignment(row)
+            else:
+                _index.remove_assignment(row["id"])  # 적재 범위 밖으로 옮겨진 발령
+
+
+def _on_change_write(operation: str, rows: list):
+    """변경 등록을 공용 인덱스에 반영 (삭제는 이전 당직자를 알 수 없으므로 재구성)"""
+    with _lock:
+        if _index is None:
+            return
+        if operation not in ("insert", "upsert"):
+            reset()
+            return
+        for row in rows or []:
+            if not {"assignment_id", "duty_role", "new_employee_id"} <= row.keys():
+                reset()
+                return
+            _index.apply_change(row)
+
+
+db.add_write_listener("duty_assignments", _on_assignment_write)
+db.add_write_listener("duty_changes", _on_change_write)
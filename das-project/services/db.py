@@ -2,105 +2,691 @@
 Supabase 연결 및 공통 CRUD 함수
 - Layer 3: 데이터 접근 계층
 - 다른 services 모듈에서 이 파일을 통해 DB에 접근
+- 프로세스 공용 클라이언트 + keep-alive 연결 풀 관리
+- 백엔드 선택: supabase (기본) | local (SQLite 임베디드, services/local_backend.py)
+- 조회 결과 캐시 (TTL/LRU, 쓰기 시 테이블 단위 무효화)
+- 청크 단위 병렬 일괄 쓰기 (upsert, 재시도)
+- 키셋 페이지네이션 스트리밍 조회 (iter_select)
+- 모든 호출 계측 (services/instrumentation.py)
+- 건수 조회는 본문 없는 HEAD 요청, 대시보드 지표는 RPC 한 번 (table_stats)
 """
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
 from supabase import create_client, Client
-from config import SUPABASE_URL, SUPABASE_KEY
+from supabase.lib.client_options import SyncClientOptions
+from config import (
+    SUPABASE_URL, SUPABASE_KEY, DB_BACKEND, LOCAL_DB_PATH, DAS_TABLES,
+    DB_POOL_SIZE, DB_POOL_KEEPALIVE, DB_TIMEOUT, DB_CONNECT_TIMEOUT,
+    DB_CACHE_ENABLED, DB_CACHE_TTL, DB_CACHE_MAX_ENTRIES,
+    DB_BULK_CHUNK_SIZE, DB_BULK_MAX_WORKERS, DB_BULK_RETRIES, DB_BULK_BACKOFF,
+    DB_PAGE_SIZE,
+)
+from services import instrumentation
+from services.query_cache import QueryCache, tables_in_select
 
+# ── 클라이언트 관리자 (프로세스 공용) ──
+# Streamlit은 세션마다 스크립트를 재실행하지만 모듈은 프로세스에 한 번만 로드되므로,
+# 여기서 만든 클라이언트와 HTTP 연결 풀은 모든 세션/재실행에서 재사용된다.
+_lock = threading.Lock()
+_shared_client: Client | None = None
+_http_client: httpx.Client | None = None
+_local_client = None
+_generation = 0                # close_client() 호출 시 증가 → data_version() 변경
+_pool_stats = {
+    "clients_created": 0,      # Supabase 클라이언트 생성 횟수
+    "clients_reused": 0,       # 기존 클라이언트 재사용 횟수
+    "connections_opened": 0,   # 새 TCP/TLS 연결을 연 요청 수
+    "connections_reused": 0,   # keep-alive 연결을 재사용한 요청 수
+}
 
-def get_client() -> Client:
-    """Supabase 클라이언트 반환 (싱글톤 패턴)"""
+
+class _PooledTransport(httpx.HTTPTransport):
+    """요청마다 새 연결을 열었는지, 풀의 연결을 재사용했는지 집계하는 트랜스포트 (응답 크기는 계측에 기록)"""
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        pool = getattr(self, "_pool", None)
+        before = {id(conn) for conn in pool.connections} if pool is not None else set()
+        response = super().handle_request(request)
+        after = {id(conn) for conn in pool.connections} if pool is not None else set()
+        key = "connections_opened" if after - before else "connections_reused"
+        with _lock:
+            _pool_stats[key] += 1
+        instrumentation.note_response(response.headers)
+        return response
+
+
+def _get_http_client() -> httpx.Client:
+    """keep-alive 연결 풀을 가진 공용 httpx 클라이언트 (호출 측에서 _lock 보유)"""
+    global _http_client
+    if _http_client is None:
+        limits = httpx.Limits(
+            max_connections=DB_POOL_SIZE,
+            max_keepalive_connections=DB_POOL_SIZE,
+            keepalive_expiry=DB_POOL_KEEPALIVE,
+        )
+        _http_client = httpx.Client(
+            transport=_PooledTransport(http2=True, limits=limits),
+            timeout=httpx.Timeout(DB_TIMEOUT, connect=DB_CONNECT_TIMEOUT),
+            follow_redirects=True,
+        )
+    return _http_client
+
+
+def _create_client() -> Client:
+    """공용 연결 풀을 사용하는 Supabase 클라이언트 생성 (호출 측에서 _lock 보유)"""
+    options = SyncClientOptions(
+        httpx_client=_get_http_client(),
+        postgrest_client_timeout=DB_TIMEOUT,
+        auto_refresh_token=False,
+        persist_session=False,
+    )
+    _pool_stats["clients_created"] += 1
+    return create_client(SUPABASE_URL, SUPABASE_KEY, options=options)
+
+
+def _get_supabase_client() -> Client:
+    """
+    Supabase 클라이언트 반환 (싱글톤 패턴, 프로세스 전체가 하나의 클라이언트와 연결 풀을 공유)
+    - Streamlit은 rerun마다 새 스레드에서 실행하므로 스레드별 클라이언트는 재사용되지 않음
+    """
     if not SUPABASE_URL or not SUPABASE_KEY:
         raise ValueError(
             "SUPABASE_URL과 SUPABASE_KEY가 .env 파일에 설정되어야 합니다. "
             ".env.example을 참고하세요."
         )
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
+    global _shared_client
+    with _lock:
+        if _shared_client is None:
+            _shared_client = _create_client()
+        else:
+            _pool_stats["clients_reused"] += 1
+        return _shared_client
+
+
+def _get_local_client():
+    """로컬 SQLite 클라이언트 반환 (싱글톤, 스레드 간 공유)"""
+    global _local_client
+    from services.local_backend import LocalClient
+
+    with _lock:
+        if _local_client is None:
+            _local_client = LocalClient(LOCAL_DB_PATH)
+            _pool_stats["clients_created"] += 1
+        else:
+            _pool_stats["clients_reused"] += 1
+        return _local_client
+
+
+# 백엔드 이름 → 클라이언트 팩토리
+# 모든 백엔드는 PostgREST 빌더 인터페이스(client.table(...).select(...).eq(...).execute())를 제공해야 한다.
+_BACKENDS = {
+    "supabase": _get_supabase_client,
+    "local": _get_local_client,
+}
+
+
+def register_backend(name: str, factory):
+    """백엔드 등록 (factory: 인자 없이 호출되어 클라이언트를 반환)"""
+    _BACKENDS[name] = factory
+
+
+def get_client() -> Client:
+    """설정된 백엔드(DB_BACKEND)의 클라이언트 반환"""
+    factory = _BACKENDS.get(DB_BACKEND)
+    if factory is None:
+        raise ValueError(
+            f"알 수 없는 DB_BACKEND: {DB_BACKEND} (사용 가능: {', '.join(_BACKENDS)})"
+        )
+    return factory()
+
+
+def get_pool_stats() -> dict:
+    """클라이언트/연결 재사용 통계"""
+    with _lock:
+        return dict(_pool_stats)
+
+
+def close_client():
+    """공용 클라이언트, 연결 풀, 조회 캐시 정리 (설정 변경, 테스트 종료 시)"""
+    global _shared_client, _http_client, _local_client, _generation
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+        if _local_client is not None:
+            _local_client.close()
+        _shared_client = None
+        _http_client = None
+        _local_client = None
+        _generation += 1
+        for key in _pool_stats:
+            _pool_stats[key] = 0
+    _cache.clear()
+    for table in _write_listeners:
+        _notify(table, "reset", None)
+
+
+# ── 조회 캐시 ──
+_cache = QueryCache(max_entries=DB_CACHE_MAX_ENTRIES, ttl=DB_CACHE_TTL)
+
+
+def _freeze(value):
+    """캐시 키용으로 list/dict를 해시 가능한 형태로 변환"""
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+def select_key(table: str, columns: str = "*", filters: list = None, order_by=None, desc: bool = False,
+               limit: int = None) -> tuple:
+    """select 캐시 키 (동기/비동기 조회 공용 - 같은 조회는 같은 캐시 항목을 사용)"""
+    return ("select", table, columns, _freeze(filters), _freeze(order_by), desc, limit)
+
+
+def select_by_id_key(table: str, record_id: str, columns: str = "*") -> tuple:
+    """select_by_id 캐시 키"""
+    return ("select_by_id", table, columns, record_id)
+
+
+def count_key(table: str, column: str = None, value=None, mode: str = "exact") -> tuple:
+    """count 캐시 키"""
+    return ("count", table, column, _freeze(value), mode)
+
+
+def cache_store(key: tuple, tables: set, value):
+    """조회 결과 캐시 저장 (tables 쓰기 시 무효화)"""
+    _cache.set(key, tables, value)
+
+
+def _cached(key: tuple, tables: set, loader, use_cache: bool = True, filters=None):
+    """
+    read-through: 캐시 적중 시 반환, 아니면 loader() 결과를 저장 후 반환
+    - key[0]: 연산명, key[1]: 테이블 (적중 기록용)
+    """
+    if not (DB_CACHE_ENABLED and use_cache):
+        return loader()
+    hit, value = cache_lookup(key, filters)
+    if hit:
+        return value
+    value = loader()
+    cache_store(key, tables, value)
+    return value
+
+
+def cache_lookup(key: tuple, filters=None) -> tuple:
+    """캐시 조회, 적중 시 계측 기록 → (적중 여부, 값)"""
+    hit, value = _cache.get(key)
+    if hit:
+        with instrumentation.track(key[1], key[0], filters, cached=True) as record:
+            record["data"] = value
+    return hit, value
+
+
+# 쓰기 시 DB가 함께 변경하는 테이블 (트리거/ON DELETE CASCADE) → 캐시도 함께 무효화
+DERIVED_TABLES = {
+    "duty_assignments": ("duty_changes", "duty_rotation_pointers", "duty_roster_effective"),
+    "duty_changes": ("duty_roster_effective",),
+    "employees": ("duty_rotation_pointers",),
+}
+
+
+# 테이블별 데이터 버전 (이 프로세스의 쓰기/무효화마다 증가, "*": 전체 무효화)
+_versions = {}
+
+
+def _invalidate(table: str) -> int:
+    """쓰기 후 캐시 무효화 (파생 테이블 포함)"""
+    tables = (table, *DERIVED_TABLES.get(table, ()))
+    for t in tables:
+        _versions[t] = _versions.get(t, 0) + 1
+    return sum(_cache.invalidate(t) for t in tables)
+
+
+def data_version(*tables) -> tuple:
+    """
+    테이블들의 데이터 버전 (계산 결과 메모이제이션 키용)
+    - 쓰기/무효화/클라이언트 재생성 시 값이 바뀜 (다른 프로세스의 쓰기는 반영 안 됨 → TTL 병행)
+    """
+    return (_generation, _versions.get("*", 0), *(_versions.get(t, 0) for t in tables))
+
+
+# ── 쓰기 리스너 ──
+# 테이블 → [callback(operation, rows)] : 메모리 인덱스(예: services/eligibility.py)의 증분 갱신용
+_write_listeners = {}
+
+
+def add_write_listener(table: str, callback):
+    """
+    쓰기 성공 후 호출될 콜백 등록
+    - operation: insert | upsert | update | delete, rows: 반환된 행
+    - 변경 RPC가 갱신한 발령 상태는 operation="change" (변경 자체는 duty_changes 리스너가 처리)
+    - close_client() 시에는 operation="reset", rows=None (메모리 인덱스 폐기)
+    """
+    _write_listeners.setdefault(table, []).append(callback)
+
+
+def _notify(table: str, operation: str, rows):
+    for callback in _write_listeners.get(table, []):
+        callback(operation, rows)
+
+
+def invalidate_cache(table: str = None) -> int:
+    """테이블(미지정 시 전체) 캐시 무효화"""
+    if table is None:
+        count = _cache.stats()["entries"]
+        _versions["*"] = _versions.get("*", 0) + 1
+        _cache.clear()
+        return count
+    return _invalidate(table)
+
+
+def notify_write(table: str, operation: str, rows: list):
+    """
+    서버 함수(RPC)가 쓴 테이블 반영: 캐시 무효화 + 쓰기 리스너 호출
+    (insert/update 등을 거치지 않은 쓰기도 메모리 인덱스/스냅샷이 같은 방식으로 갱신되도록)
+    """
+    _invalidate(table)
+    _notify(table, operation, rows)
+
+
+def get_cache_stats() -> dict:
+    """캐시 적중/미적중 통계"""
+    return _cache.stats()
+
+
+def _execute(query, table: str, operation: str, filters=None):
+    """쿼리 실행 + 계측 기록 (네트워크 왕복이 발생하는 모든 호출은 이 함수를 거친다)"""
+    with instrumentation.track(table, operation, filters) as record:
+        response = query.execute()
+        record_response(record, operation, response)
+    return response
+
+
+def record_response(record: dict, operation: str, response):
+    """계측 기록에 응답 데이터/건수 반영 (동기 조회/services.async_db 공용)"""
+    record["data"] = response.data if response is not None else None
+    if operation == "count":
+        record["rows"] = response.count or 0
+
+
+def _apply_filters(query, filters):
+    """filters: [(연산자, 컬럼, 값), ...] - 연산자는 PostgREST 빌더 메서드명 (eq, in_, gte, lt, ilike ...)"""
+    for op, column, value in filters or []:
+        query = getattr(query, op)(column, value)
+    return query
+
+
+def select_query(client, table: str, columns: str = "*", filters: list = None, order_by: str = None,
+                  desc: bool = False, limit: int = None):
+    """select 쿼리 빌더 구성 (동기/비동기 클라이언트 공용)"""
+    query = _apply_filters(client.table(table).select(columns), filters)
+    if isinstance(order_by, (list, tuple)):
+        for column, column_desc in order_by:
+            query = query.order(column, desc=column_desc)
+    elif order_by:
+        query = query.order(order_by, desc=desc)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def count_query(client, table: str, filters: list = None, mode: str = "exact"):
+    """
+    count 쿼리 빌더 구성 (동기/비동기 클라이언트 공용)
+    - head=True: 행 데이터 없이 Content-Range 헤더의 건수만 받음
+    - mode: exact(정확) | planned(실행계획 추정) | estimated(작은 테이블은 정확, 큰 테이블은 추정)
+    """
+    if mode not in COUNT_MODES:
+        raise ValueError(f"알 수 없는 count mode: {mode} (사용 가능: {', '.join(COUNT_MODES)})")
+    return _apply_filters(client.table(table).select("id", count=mode, head=True), filters)
+
+
+COUNT_MODES = ("exact", "planned", "estimated")
+
+
+def count_filters(column: str = None, value=None):
+    return [("eq", column, value)] if column and value is not None else None
 
 
 # ── 공통 CRUD ──
 
-def select_all(table: str, order_by: str = "id", ascending: bool = True):
+def select(table: str, columns: str = "*", filters: list = None, order_by: str = None,
+           desc: bool = False, limit: int = None, use_cache: bool = True) -> list:
+    """
+    범용 조회 (캐시 적용)
+    - columns: PostgREST projection, 임베딩도 필요한 필드만 지정 가능
+      예: "id, duty_date, main_duty:employees!duty_assignments_main_duty_id_fkey(name)"
+    - filters: [("eq", "status", "확정"), ("in_", "grade", [1, 2]), ("gte", "duty_date", "2025-01-01")]
+    - order_by: 컬럼명 (desc 적용) 또는 [(컬럼, desc), ...] 다중 정렬
+    """
+    def load():
+        query = select_query(get_client(), table, columns, filters, order_by, desc, limit)
+        return _execute(query, table, "select", filters).data
+
+    return _cached(select_key(table, columns, filters, order_by, desc, limit), tables_in_select(table, columns), load,
+                   use_cache, filters)
+
+
+def _top_level_fields(columns: str) -> list:
+    """select 문자열의 최상위 항목 (임베딩 괄호 안은 제외)"""
+    fields, depth, buf = [], 0, ""
+    for ch in columns:
+        depth += (ch == "(") - (ch == ")")
+        if ch == "," and depth == 0:
+            fields.append(buf.strip())
+            buf = ""
+        else:
+            buf += ch
+    fields.append(buf.strip())
+    return [f for f in fields if f]
+
+
+def _keyset_filter(key: tuple, last: dict) -> str:
+    """(k1, k2, ...) > (v1, v2, ...) 를 PostgREST or 논리식으로 변환"""
+    def literal(value):
+        return '"' + str(value).replace('"', '\\"') + '"'
+
+    clauses = []
+    for i, column in enumerate(key):
+        parts = [f"{k}.eq.{literal(last[k])}" for k in key[:i]] + [f"{column}.gt.{literal(last[column])}"]
+        clauses.append(parts[0] if len(parts) == 1 else f"and({','.join(parts)})")
+    return ",".join(clauses)
+
+
+def iter_select(table: str, columns: str = "*", filters: list = None, key: tuple = ("id",),
+                page_size: int = None, prefetch: bool = True):
+    """
+    키셋 페이지네이션 스트리밍 조회 (generator, 캐시 미사용)
+    - key: 정렬 겸 페이지 기준 컬럼, 마지막 컬럼은 유일해야 함 (예: ("duty_date", "id"))
+    - OFFSET 대신 마지막 키 이후를 조회하므로 페이지가 깊어져도 비용이 일정
+    - prefetch: 호출 측이 현재 페이지를 처리하는 동안 다음 페이지를 미리 조회
+    """
+    key = tuple(key)
+    page_size = page_size or DB_PAGE_SIZE
+    fields = _top_level_fields(columns)
+    if "*" not in fields:
+        columns = ", ".join([k for k in key if k not in fields] + fields)
+
+    def fetch(last: dict | None) -> list:
+        query = _apply_filters(get_client().table(table).select(columns), filters)
+        if last is not None:
+            query = query.or_(_keyset_filter(key, last))
+        for column in key:
+            query = query.order(column)
+        return _execute(query.limit(page_size), table, "iter_select", filters).data
+
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        page = fetch(None)
+        while page:
+            next_page = None
+            if len(page) == page_size:
+                if executor:
+                    next_page = executor.submit(fetch, page[-1])
+                else:
+                    next_page = page[-1]
+            yield from page
+            if next_page is None:
+                break
+            page = next_page.result() if executor else fetch(next_page)
+    finally:
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def select_all(table: str, order_by: str = "id", ascending: bool = True, columns: str = "*"):
     """테이블 전체 조회"""
-    client = get_client()
-    query = client.table(table).select("*").order(order_by, desc=not ascending)
-    response = query.execute()
-    return response.data
+    return select(table, columns=columns, order_by=order_by, desc=not ascending)
 
 
-def select_by_id(table: str, record_id: str):
+def select_by_id(table: str, record_id: str, columns: str = "*"):
     """ID로 단건 조회"""
-    client = get_client()
-    response = client.table(table).select("*").eq("id", record_id).single().execute()
-    return response.data
+    filters = [("eq", "id", record_id)]
+
+    def load():
+        query = get_client().table(table).select(columns).eq("id", record_id).single()
+        return _execute(query, table, "select_by_id", filters).data
+
+    return _cached(select_by_id_key(table, record_id, columns), tables_in_select(table, columns), load, filters=filters)
 
 
-def select_where(table: str, column: str, value, order_by: str = "id"):
+def select_where(table: str, column: str, value, order_by: str = "id", columns: str = "*"):
     """조건 조회"""
-    client = get_client()
-    response = (
-        client.table(table)
-        .select("*")
-        .eq(column, value)
-        .order(order_by)
-        .execute()
-    )
-    return response.data
+    return select(table, columns=columns, filters=[("eq", column, value)], order_by=order_by)
 
 
-def select_between(table: str, column: str, start, end, order_by: str = "id"):
-    """범위 조회 (날짜 등)"""
-    client = get_client()
-    response = (
-        client.table(table)
-        .select("*")
-        .gte(column, start)
-        .lte(column, end)
-        .order(order_by)
-        .execute()
-    )
-    return response.data
+def select_between(table: str, column: str, start, end, order_by: str = "id", columns: str = "*"):
+    """범위 조회 (날짜 등, start 포함 / end 미포함)"""
+    return select(table, columns=columns, filters=[("gte", column, start), ("lt", column, end)], order_by=order_by)
 
 
 def insert(table: str, data: dict):
     """단건 삽입"""
     client = get_client()
-    response = client.table(table).insert(data).execute()
+    response = _execute(client.table(table).insert(data), table, "insert")
+    _invalidate(table)
+    _notify(table, "insert", response.data)
     return response.data
 
 
-def insert_many(table: str, data_list: list):
-    """다건 삽입"""
+def upsert(table: str, data: dict, on_conflict: str):
+    """
+    단건 upsert (on_conflict: 유니크 키 컬럼, 예: "log_date,factory,duty_type") → 저장된 행
+    - 요청 1회로 조회 후 삽입/수정 분기와 동시 저장 시 유니크 위반을 대신함
+    - data에 없는 컬럼은 삽입 시 기본값, 충돌(수정) 시 기존 값 유지
+    """
     client = get_client()
-    response = client.table(table).insert(data_list).execute()
+    response = _execute(client.table(table).upsert(data, on_conflict=on_conflict), table, "upsert")
+    _invalidate(table)
+    _notify(table, "upsert", response.data)
     return response.data
 
 
+def insert_many(table: str, data_list: list):
+    """다건 삽입 (청크 단위 전송, 실패 청크가 있으면 BulkWriteError)"""
+    results = bulk_upsert(table, data_list)
+    failed = [r for r in results if not r["ok"]]
+    if failed:
+        raise BulkWriteError(table, results)
+    return bulk_data(results)
+
+
 def update(table: str, record_id: str, data: dict):
     """단건 업데이트"""
     client = get_client()
-    response = client.table(table).update(data).eq("id", record_id).execute()
+    query = client.table(table).update(data).eq("id", record_id)
+    response = _execute(query, table, "update", [("eq", "id", record_id)])
+    _invalidate(table)
+    _notify(table, "update", response.data)
     return response.data
 
 
 def delete(table: str, record_id: str):
     """단건 삭제"""
     client = get_client()
-    response = client.table(table).delete().eq("id", record_id).execute()
+    query = client.table(table).delete().eq("id", record_id)
+    response = _execute(query, table, "delete", [("eq", "id", record_id)])
+    _invalidate(table)
+    _notify(table, "delete", response.data)
     return response.data
 
 
 def delete_where(table: str, column: str, value):
     """조건 삭제"""
     client = get_client()
-    response = client.table(table).delete().eq(column, value).execute()
+    query = client.table(table).delete().eq(column, value)
+    response = _execute(query, table, "delete", [("eq", column, value)])
+    _invalidate(table)
+    _notify(table, "delete", response.data)
+    return response.data
+
+
+def delete_matching(table: str, filters: list):
+    """조건(filters) 일치 행 삭제 (요청 1회)"""
+    client = get_client()
+    query = _apply_filters(client.table(table).delete(), filters)
+    response = _execute(query, table, "delete", filters)
+    _invalidate(table)
+    _notify(table, "delete", response.data)
     return response.data
 
 
-def count(table: str, column: str = None, value=None) -> int:
-    """건수 조회"""
+def delete_all(table: str):
+    """전체 삭제 (관리자 데이터 초기화용)"""
     client = get_client()
-    query = client.table(table).select("*", count="exact")
-    if column and value is not None:
-        query = query.eq(column, value)
-    response = query.execute()
-    return response.count or 0
+    query = client.table(table).delete().neq("id", "00000000-0000-0000-0000-000000000000")
+    response = _execute(query, table, "delete_all")
+    _invalidate(table)
+    _notify(table, "delete", response.data)
+    return response.data
+
+
+def count(table: str, column: str = None, value=None, mode: str = "exact") -> int:
+    """건수 조회 (mode: exact | planned | estimated, local 백엔드는 항상 정확한 건수)"""
+    filters = count_filters(column, value)
+
+    def load():
+        query = count_query(get_client(), table, filters, mode)
+        return _execute(query, table, "count", filters).count or 0
+
+    return _cached(count_key(table, column, value, mode), {table}, load, filters=filters)
+
+
+def rpc(func: str, params: dict = None, tables=(), use_cache: bool = True):
+    """
+    PostgreSQL 함수 호출 (local 백엔드는 services/local_backend.py의 register_rpc 구현)
+    - tables: 결과가 의존하는 테이블 (지정 시 캐시, 해당 테이블 쓰기 시 무효화)
+    """
+    params = params or {}
+
+    def load():
+        return _execute(get_client().rpc(func, params), func, "rpc", params).data
+
+    if not tables:
+        return load()
+    return _cached(("rpc", func, _freeze(params)), set(tables), load, use_cache, params)
+
+
+def table_stats(month: str = None, estimated: bool = False) -> dict:
+    """
+    DAS 테이블별 건수 + 대시보드 지표를 한 번의 요청으로 조회 (RPC das_table_stats)
+    - month: "YYYY-MM" 지정 시 result["month"]에 해당 월 발령/변경 건수, 당직비 합계
+    - estimated: 통계 추정치 사용 (대용량 테이블용)
+    반환: {"employees": n, ..., "active_employees": n, "pending_logs": n, "month": {...}}
+    """
+    params = {"p_month": month, "p_estimated": estimated}
+    return rpc("das_table_stats", params, tables=DAS_TABLES)
+
+
+# ── 일괄 쓰기 ──
+
+class BulkWriteError(Exception):
+    """일괄 쓰기 중 실패한 청크가 있을 때 발생 (results에 청크별 결과 보관)"""
+
+    def __init__(self, table: str, results: list):
+        self.table = table
+        self.results = results
+        failed = [r for r in results if not r["ok"]]
+        super().__init__(
+            f"{table}: {len(failed)}/{len(results)}개 청크 실패 - {failed[0]['error']}"
+        )
+
+
+# 요청이 서버에 전달되기 전에 난 연결 오류 (쓰기가 반영되지 않았음이 확실)
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout, ConnectionRefusedError)
+# 서버가 트랜잭션을 롤백한 일시적 DB 오류 (직렬화 실패/교착/자원 부족/취소)
+_ROLLED_BACK_SQLSTATES = ("40001", "40P01", "53", "57")
+
+
+def _is_retryable(error: Exception, idempotent: bool = True) -> bool:
+    """
+    재시도 가능한 오류인지 (전송/연결 오류, 5xx, 롤백된 일시적 DB 오류만, 제약조건/프로그래밍 오류는 제외)
+    - idempotent=False (plain insert): 서버 반영 여부가 불확실한 오류(응답 타임아웃, 5xx 등)는 중복 방지를 위해 제외
+    """
+    code = str(getattr(error, "code", "") or "")
+    if isinstance(error, _NOT_SENT_ERRORS) or code.startswith(_ROLLED_BACK_SQLSTATES):
+        return True
+    if not idempotent:
+        return False
+    return (isinstance(error, (httpx.TransportError, ConnectionError, TimeoutError))
+            or code.startswith("08") or (len(code) == 3 and code.startswith("5") and code.isdigit()))
+
+
+def _dedupe(rows: list, on_conflict: str) -> list:
+    """같은 충돌 키가 한 요청에 두 번 들어가지 않도록 마지막 값만 유지"""
+    keys = [k.strip() for k in on_conflict.split(",")]
+    unique = {}
+    for row in rows:
+        unique[tuple(row.get(k) for k in keys)] = row
+    return list(unique.values())
+
+
+def _write_chunk(table: str, index: int, chunk: list, on_conflict: str,
+                 ignore_duplicates: bool, retries: int, backoff: float) -> dict:
+    """
+    청크 1개 전송 (일시적 오류는 지수 백오프로 재시도)
+    - upsert는 재전송해도 결과가 같으므로 전송 후 오류도 재시도, plain insert는 전송 전 오류/롤백된 오류만 재시도
+    """
+    attempts = 0
+    while True:
+        attempts += 1
+        sent = False
+        try:
+            query = get_client().table(table)
+            if on_conflict:
+                query = query.upsert(chunk, on_conflict=on_conflict, ignore_duplicates=ignore_duplicates)
+            else:
+                query = query.insert(chunk)
+            sent = True
+            data = _execute(query, table, "upsert" if on_conflict else "insert").data
+            return {"chunk": index, "rows": len(chunk), "ok": True, "data": data,
+                    "error": None, "attempts": attempts}
+        except Exception as e:
+            if attempts > retries or not _is_retryable(e, idempotent=bool(on_conflict) or not sent):
+                return {"chunk": index, "rows": len(chunk), "ok": False, "data": [],
+                        "error": str(e), "attempts": attempts}
+            time.sleep(backoff * (2 ** (attempts - 1)))
+
+
+def bulk_upsert(table: str, rows: list, on_conflict: str = None, ignore_duplicates: bool = False,
+                chunk_size: int = None, max_workers: int = None,
+                retries: int = None, backoff: float = None) -> list:
+    """
+    청크 단위 병렬 일괄 쓰기
+    - on_conflict 지정 시 upsert (예: "duty_date,duty_type"), 미지정 시 insert
+    - 청크는 최대 max_workers개까지 동시에 전송, 실패 청크는 backoff 후 재시도
+    - 반환: 청크 순서대로 [{"chunk", "rows", "ok", "data", "error", "attempts"}]
+    """
+    chunk_size = chunk_size or DB_BULK_CHUNK_SIZE
+    max_workers = max_workers or DB_BULK_MAX_WORKERS
+    retries = DB_BULK_RETRIES if retries is None else retries
+    backoff = DB_BULK_BACKOFF if backoff is None else backoff
+
+    if on_conflict:
+        rows = _dedupe(rows, on_conflict)
+    chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+    if not chunks:
+        return []
+
+    args = (on_conflict, ignore_duplicates, retries, backoff)
+    try:
+        if len(chunks) == 1 or max_workers <= 1:
+            results = [_write_chunk(table, i, chunk, *args) for i, chunk in enumerate(chunks)]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+                futures = [executor.submit(_write_chunk, table, i, chunk, *args) for i, chunk in enumerate(chunks)]
+                results = [f.result() for f in futures]
+    finally:
+        _invalidate(table)
+    _notify(table, "upsert" if on_conflict else "insert", bulk_data(results))
+    return results
+
+
+def bulk_data(results: list) -> list:
+    """bulk_upsert 결과에서 성공 청크의 반환 행만 모아서 반환"""
+    return [row for result in results if result["ok"] for row in result["data"]]
@@ -0,0 +1,179 @@
+"""
+당직 달력
+- 일자별 구분(휴무일/평일), 필요한 근무(주간/야간)와 근무 시간(config.WORK_HOURS)
+- 휴무일: 일요일, 공휴일(HOLIDAY_FILE), 토요일 패턴(SATURDAY_PATTERNS: 월 내 주차별)
+  · 1,3주 토요일: 휴무일 주간+야간 / 2,4주: 근무 토요일 야간 1회 / 5주: 5주 토요일 주간+야간
+- 연도별 표를 pandas로 한 번에 계산해 캐시 → 일자/기간 조회는 표 조회만
+- 명단 생성, 당직비 계산, 알림은 이 모듈로 일자 정보를 얻는다 (행마다 요일 판정하지 않음)
+"""
+import csv
+import os
+from datetime import date, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from config import HOLIDAY_FILE, SATURDAY_PATTERNS, WORK_HOURS
+
+DAY_NAMES = ["월", "화", "수", "목", "금", "토", "일"]
+
+# 패턴 → (구분, [(근무 유형, WORK_HOURS 키)])
+PATTERN_SHIFTS = {
+    "holiday": ("휴무일", [("주간", "holiday_day"), ("야간", "holiday_night")]),
+    "weekday": ("평일", [("야간", "weekday_night")]),
+    "sat_2_4": ("평일", [("야간", "sat_2_4")]),
+    "sat_5":   ("휴무일", [("주간", "sat_5_day"), ("야간", "sat_5_night")]),
+}
+
+
+@lru_cache(maxsize=4)
+def load_holidays(path: str = None) -> dict:
+    """공휴일 목록 {date: 이름} (기본: HOLIDAY_FILE, 파일이 없거나 경로가 비어 있으면 빈 목록)"""
+    path = HOLIDAY_FILE if path is None else path
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return {
+            date.fromisoformat(row["date"].strip()): (row.get("name") or "공휴일").strip()
+            for row in csv.DictReader(f) if row.get("date")
+        }
+
+
+def reload():
+    """공휴일 파일/연도 표 캐시 폐기 (공휴일 파일 변경 후 호출)"""
+    load_holidays.cache_clear()
+    _year_frame.cache_clear()
+    _year_days.cache_clear()
+
+
+def _shift(duty_type: str, hours_key: str) -> dict:
+    hours = WORK_HOURS[hours_key]
+    return {"duty_type": duty_type, "hours_key": hours_key, "start_time": hours["start"],
+            "end_time": hours["end"], "label": hours["label"]}
+
+
+# ── 연도별 표 (캐시) ──
+
+@lru_cache(maxsize=16)
+def _year_frame(year: int) -> pd.DataFrame:
+    """연도 전체 일자 표 (벡터 연산으로 계산)"""
+    dates = pd.date_range(date(year, 1, 1), date(year, 12, 31), freq="D")
+    holidays = load_holidays()
+    names = pd.Series(dates.date).map(holidays)
+    weekday = dates.weekday.to_numpy()
+    saturday_week = np.where(weekday == 5, (dates.day.to_numpy() - 1) // 7 + 1, 0)
+    saturday_pattern = pd.Series(saturday_week).map(SATURDAY_PATTERNS).fillna("holiday").to_numpy()
+    pattern = np.select(
+        [names.notna().to_numpy(), weekday == 6, weekday == 5],
+        ["holiday", "holiday", saturday_pattern],
+        default="weekday",
+    )
+    frame = pd.DataFrame({
+        "duty_date": dates.strftime("%Y-%m-%d"),
+        "day_of_week": np.array(DAY_NAMES)[weekday],
+        "day_category": pd.Series(pattern).map({p: c for p, (c, _) in PATTERN_SHIFTS.items()}).to_numpy(),
+        "pattern": pattern,
+        "saturday_week": saturday_week,
+        "holiday_name": names.to_numpy(),
+    })
+    frame.index = dates
+    return frame
+
+
+@lru_cache(maxsize=16)
+def _year_days(year: int) -> tuple:
+    """연도 전체 일자 정보 (레코드, 일자 조회용 - 공휴일 이름이 없으면 None)"""
+    return tuple(
+        dict(row, holiday_name=row["holiday_name"] if isinstance(row["holiday_name"], str) else None,
+             shifts=tuple(_shift(t, k) for t, k in PATTERN_SHIFTS[row["pattern"]][1]))
+        for row in _year_frame(year).to_dict("records")
+    )
+
+
+# ── 조회 API ──
+
+def day_info(day: date) -> dict:
+    """일자 정보: duty_date, day_of_week, day_category, pattern, saturday_week, holiday_name, shifts"""
+    info = _year_days(day.year)[day.timetuple().tm_yday - 1]
+    return dict(info, shifts=[dict(s) for s in info["shifts"]])
+
+
+def day_category(day: date) -> str:
+    """휴무일 / 평일"""
+    return _year_days(day.year)[day.timetuple().tm_yday - 1]["day_category"]
+
+
+def shift(day: date, duty_type: str) -> dict | None:
+    """해당 일자의 근무 정보 (그 날 없는 근무 유형이면 None)"""
+    for s in _year_days(day.year)[day.timetuple().tm_yday - 1]["shifts"]:
+        if s["duty_type"] == duty_type:
+            return dict(s)
+    return None
+
+
+def days(start: date, end: date) -> list:
+    """기간(양 끝 포함) 일자 정보 목록"""
+    result = []
+    for year in range(start.year, end.year + 1):
+        table = _year_days(year)
+        first = start.timetuple().tm_yday - 1 if year == start.year else 0
+        last = end.timetuple().tm_yday if year == end.year else len(table)
+        result.extend(dict(d, shifts=[dict(s) for s in d["shifts"]]) for d in table[first:last])
+    return result
+
+
+def shifts(start: date, end: date) -> list:
+    """
+    기간(양 끝 포함) 근무 슬롯 목록 (일자순, 일자 안에서는 주간 → 야간)
+    각 행: duty_date, day_of_week, duty_type, day_category, hours_key, start_time, end_time, label
+    """
+    result = []
+    for year in range(start.year, end.year + 1):
+        table = _year_days(year)
+        first = start.timetuple().tm_yday - 1 if year == start.year else 0
+        last = end.timetuple().tm_yday if year == end.year else len(table)
+        for d in table[first:last]:
+            for s in d["shifts"]:
+                result.append({"duty_date": d["duty_date"], "day_of_week": d["day_of_week"],
+                               "day_category": d["day_category"], **s})
+    return result
+
+
+def frame(start: date, end: date) -> pd.DataFrame:
+    """기간(양 끝 포함) 일자 표 (DataFrame, 인덱스: 일자)"""
+    if end < start:
+        return _year_frame(start.year).iloc[0:0].copy()
+    parts = [_year_frame(y).loc[pd.Timestamp(max(start, date(y, 1, 1))):pd.Timestamp(min(end, date(y, 12, 31)))]
+             for y in range(start.year, end.year + 1)]
+    return pd.concat(parts).copy()
+
+
+def shift_frame(start: date, end: date) -> pd.DataFrame:
+    """기간(양 끝 포함) 근무 슬롯 표 (DataFrame) - 일자 표와 패턴별 근무 표의 병합"""
+    pattern_shifts = pd.DataFrame([
+        {"pattern": p, **_shift(t, k)} for p, (_, items) in PATTERN_SHIFTS.items() for t, k in items
+    ])
+    days_frame = frame(start, end).reset_index(drop=True)
+    return days_frame.merge(pattern_shifts, on="pattern", how="inner", sort=False).sort_values(
+        ["duty_date", "duty_type"], ascending=[True, False], kind="stable",
+    ).reset_index(drop=True)
+
+
+def month_bounds(year: int, month: int) -> tuple:
+    """월의 (첫날, 말일)"""
+    start = date(year, month, 1)
+    end = (date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)) - timedelta(days=1)
+    return start, end
+
+
+def describe_month(year: int, month: int) -> str:
+    """월 달력 요약 (알림 본문용)"""
+    month_days = days(*month_bounds(year, month))
+    holidays = [f"{d['duty_date'][5:]} {d['holiday_name']}" for d in month_days if d["holiday_name"]]
+    off = sum(1 for d in month_days if d["day_category"] == "휴무일")
+    slots = sum(len(d["shifts"]) for d in month_days)
+    text = f"휴무일 {off}일 / 평일 {len(month_days) - off}일, 근무 슬롯 {slots}개"
+    if holidays:
+        text += f"\n공휴일: {', '.join(holidays)}"
+    return text
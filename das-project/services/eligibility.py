@@ -0,0 +1,168 @@
+"""
+발령 대상자 풀 (메모리 인덱스)
+- (역할, 구분)별 대상 직원을 employee_no 정렬 배열로 보관 (DUTY_RULES 직급 기준, 재직자만)
+- LAST 사번 다음 순번: bisect 후속자 조회 O(log n)
+  → LAST 사번 직원이 퇴직/직급 변경으로 빠져도 사번순 다음 직원부터 순환 유지
+- 직원 추가/퇴직/직급 변경 시 증분 갱신 (services.db 쓰기 리스너)
+- 프로세스 공용 풀은 조회 캐시와 같은 TTL로 재구성 (다른 프로세스의 변경 반영)
+"""
+import threading
+import time
+from bisect import bisect_right, insort
+
+from services import db
+from config import DUTY_RULES, DB_CACHE_TTL
+
+DUTY_ROLES = ("총당직", "부당직")
+DAY_CATEGORIES = ("휴무일", "평일")
+
+# 풀에 보관하는 직원 필드 (자동배정 결과로 반환 가능한 필드)
+POOL_COLUMNS = "id, employee_no, name, department, position, grade, is_active"
+_POOL_FIELDS = [c.strip() for c in POOL_COLUMNS.split(",")]
+
+
+def rule_key(duty_type: str, day_category: str) -> str | None:
+    """DUTY_RULES 키 변환 (예: '총당직' + '휴무일' -> 'holiday_main')"""
+    prefix = {"휴무일": "holiday", "평일": "weekday"}.get(day_category)
+    if prefix is None or duty_type not in DUTY_ROLES:
+        return None
+    return f"{prefix}_{'main' if duty_type == '총당직' else 'sub'}"
+
+
+class EligibilityPool:
+    """한 (역할, 구분)의 대상자: employee_no 정렬 배열 + 사번 → 직원"""
+
+    def __init__(self, grades, employees=()):
+        self.grades = set(grades)
+        self.keys = []       # 정렬된 employee_no
+        self.members = {}    # employee_no -> 직원
+        for emp in sorted(employees, key=lambda e: e["employee_no"]):
+            if self.accepts(emp) and emp["employee_no"] not in self.members:
+                self.keys.append(emp["employee_no"])
+                self.members[emp["employee_no"]] = emp
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, employee_no: str) -> bool:
+        return employee_no in self.members
+
+    def accepts(self, employee: dict) -> bool:
+        return employee.get("is_active", True) is not False and employee.get("grade") in self.grades
+
+    def apply(self, employee: dict):
+        """직원 추가/변경 반영 (대상 조건을 벗어나면 제외)"""
+        emp_no = employee["employee_no"]
+        if not self.accepts(employee):
+            self.remove(emp_no)
+        elif emp_no in self.members:
+            self.members[emp_no] = employee
+        else:
+            insort(self.keys, emp_no)
+            self.members[emp_no] = employee
+
+    def remove(self, employee_no: str):
+        if self.members.pop(employee_no, None) is not None:
+            self.keys.pop(bisect_right(self.keys, employee_no) - 1)
+
+    def index_after(self, employee_no: str | None) -> int:
+        """employee_no 다음 순번의 위치 (None이면 처음, 마지막 다음은 처음으로 순환)"""
+        if employee_no is None or not self.keys:
+            return 0
+        return bisect_right(self.keys, employee_no) % len(self.keys)
+
+    def at(self, index: int) -> dict:
+        return self.members[self.keys[index % len(self.keys)]]
+
+    def successor(self, employee_no: str | None) -> dict | None:
+        """LAST 사번 다음 순번 직원 (풀이 비어 있으면 None)"""
+        if not self.keys:
+            return None
+        return self.at(self.index_after(employee_no))
+
+
+class EligibilityPools:
+    """모든 (역할, 구분)의 대상자 풀"""
+
+    def __init__(self, employees=(), rules: dict = DUTY_RULES):
+        employees = list(employees)
+        self.pools = {
+            (role, category): EligibilityPool(rules[rule_key(role, category)]["grades"], employees)
+            for role in DUTY_ROLES for category in DAY_CATEGORIES
+        }
+        self.built_at = time.monotonic()
+
+    def pool(self, role: str, category: str) -> EligibilityPool | None:
+        return self.pools.get((role, category))
+
+    def items(self):
+        return self.pools.items()
+
+    def find(self, employee_no: str) -> dict | None:
+        """사번으로 직원 조회 (어느 풀에도 없으면 None)"""
+        for pool in self.pools.values():
+            if employee_no in pool:
+                return pool.members[employee_no]
+        return None
+
+    def apply(self, employee: dict):
+        for pool in self.pools.values():
+            pool.apply(employee)
+
+    def remove(self, employee_no: str):
+        for pool in self.pools.values():
+            pool.remove(employee_no)
+
+
+# ── 프로세스 공용 풀 ──
+_lock = threading.Lock()
+_pools: EligibilityPools | None = None
+
+
+def load_pools() -> EligibilityPools:
+    """대상 직급의 재직 직원을 한 번에 조회해 풀 구성"""
+    grades = sorted({g for rule in DUTY_RULES.values() for g in rule["grades"]})
+    employees = db.select(
+        "employees",
+        columns=POOL_COLUMNS,
+        filters=[("eq", "is_active", True), ("in_", "grade", grades)],
+    )
+    return EligibilityPools(employees)
+
+
+def get_pools(refresh: bool = False) -> EligibilityPools:
+    """공용 풀 반환 (최초/TTL 경과/refresh 시 재구성)"""
+    global _pools
+    with _lock:
+        if refresh or _pools is None or time.monotonic() - _pools.built_at > DB_CACHE_TTL:
+            _pools = load_pools()
+        return _pools
+
+
+def reset():
+    """공용 풀 폐기 (다음 get_pools에서 재구성)"""
+    global _pools
+    with _lock:
+        _pools = None
+
+
+def _on_employee_write(operation: str, rows: list):
+    """employees 쓰기 결과를 공용 풀에 증분 반영"""
+    global _pools
+    with _lock:
+        if _pools is None:
+            return
+        if operation == "reset":
+            _pools = None
+            return
+        for row in rows or []:
+            if "employee_no" not in row:
+                _pools = None  # 식별 불가한 응답 → 다음 조회 시 재구성
+                return
+            if operation == "delete":
+                _pools.remove(row["employee_no"])
+            else:
+                _pools.apply({k: row.get(k) for k in _POOL_FIELDS})
+
+
+db.add_write_listener("employees", _on_employee_write)
@@ -0,0 +1,354 @@
+"""
+내보내기 서비스
+- Layer 2: 비즈니스 로직
+- 당직비 Excel: openpyxl write-only 워크북에 행을 바로 기록 (DataFrame/셀 객체를 메모리에 쌓지 않음)
+  · 월별 시트(사업부 소계 + 월 합계) + 요약 시트(월별/사업부별 합계)
+  · 한 번에 한 달 명세만 메모리에 보관 → 기간이 길어져도 메모리 사용량 일정
+  · 임시 파일로 저장 → 화면은 파일을 st.download_button에 전달 (Streamlit이 전송 시 전체를 읽으므로 청크 분할 없음)
+- CSV(gzip)/Parquet: 당직비 명세, 발령(직원 이름 포함), 근무일지(JSON 컬럼 펼침)
+  · 키셋 스트리밍 조회 → EXPORT_BATCH_SIZE 행씩 파일에 기록 (Parquet: 배치마다 row group 1개)
+  · Parquet은 pyarrow가 설치된 경우에만 사용 (선택 의존성, 사용할 때 import)
+"""
+import csv
+import gzip
+import json
+import os
+import tempfile
+from itertools import groupby, islice
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill
+
+from services import assignment_service, db, payment_service
+from config import EXPORT_BATCH_SIZE, EXPORT_PARQUET_COMPRESSION
+
+PAYMENT_HEADERS = ["사번", "성명", "소속", "직위", "사업부", "공장", "당직 횟수", "당직비", "계좌번호"]
+
+_BOLD = Font(bold=True)
+_SUBTOTAL_FILL = PatternFill("solid", fgColor="FFF3E0")
+_TOTAL_FILL = PatternFill("solid", fgColor="FFE0B2")
+
+
+def _styled(ws, values: list, fill: PatternFill = None) -> list:
+    """굵은 글씨(+배경) 행 (소계/합계/헤더)"""
+    cells = []
+    for value in values:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.font = _BOLD
+        if fill is not None:
+            cell.fill = fill
+        cells.append(cell)
+    return cells
+
+
+def _payment_row(payment: dict) -> list:
+    emp = payment.get("employee") or {}
+    return [
+        emp.get("employee_no", "-"), emp.get("name", "-"), emp.get("department", "-"), emp.get("position", "-"),
+        emp.get("business_unit", "-"), emp.get("factory", "-"), payment["duty_count"], payment["amount"],
+        emp.get("bank_account", "-"),
+    ]
+
+
+def _business_unit(payment: dict) -> str:
+    return (payment.get("employee") or {}).get("business_unit") or "미분류"
+
+
+def _write_month(ws, payments: list) -> dict:
+    """월 시트: 사업부별 명세 + 소계, 마지막에 월 합계 → {사업부: [인원, 횟수, 금액]}"""
+    ws.append(_styled(ws, PAYMENT_HEADERS))
+    totals = {}
+    ordered = sorted(payments, key=lambda p: (_business_unit(p), (p.get("employee") or {}).get("employee_no") or ""))
+    for bu, group in groupby(ordered, key=_business_unit):
+        subtotal = totals.setdefault(bu, [0, 0, 0])
+        for payment in group:
+            ws.append(_payment_row(payment))
+            subtotal[0] += 1
+            subtotal[1] += payment["duty_count"]
+            subtotal[2] += payment["amount"]
+        ws.append(_styled(ws, ["", f"{bu} 소계 ({subtotal[0]}명)", "", "", bu, "", subtotal[1], subtotal[2], ""],
+                          _SUBTOTAL_FILL))
+    people, count, amount = (sum(t[i] for t in totals.values()) for i in range(3))
+    ws.append(_styled(ws, ["", f"합계 ({people}명)", "", "", "", "", count, amount, ""], _TOTAL_FILL))
+    return totals
+
+
+def write_payment_workbook(target, months) -> dict:
+    """
+    당직비 워크북 기록
+    - target: 파일 경로 또는 바이너리 파일 객체
+    - months: (payment_month 'YYYY-MM', 명세 행 목록) 반복자 - 한 달씩 소비
+    반환: {"months": {월: [인원, 횟수, 금액]}, "business_units": {사업부: [인원(연인원), 횟수, 금액]}}
+    """
+    wb = Workbook(write_only=True)
+    summary = wb.create_sheet("요약")
+    month_totals, bu_totals = {}, {}
+    for payment_month, payments in months:
+        totals = _write_month(wb.create_sheet(f"{payment_month} 당직비"), payments)
+        month_totals[payment_month] = [sum(t[i] for t in totals.values()) for i in range(3)]
+        for bu, values in totals.items():
+            acc = bu_totals.setdefault(bu, [0, 0, 0])
+            for i in range(3):
+                acc[i] += values[i]
+
+    summary.append(_styled(summary, ["월", "인원", "당직 횟수", "당직비"]))
+    for payment_month, values in month_totals.items():
+        summary.append([payment_month, *values])
+    summary.append(_styled(summary, ["합계", *(sum(v[i] for v in month_totals.values()) for i in range(3))],
+                           _TOTAL_FILL))
+    summary.append([])
+    summary.append(_styled(summary, ["사업부", "연인원", "당직 횟수", "당직비"]))
+    for bu in sorted(bu_totals):
+        summary.append([bu, *bu_totals[bu]])
+    wb.save(target)
+    return {"months": month_totals, "business_units": bu_totals}
+
+
+def iter_payment_months(year: int, start_month: int = 1, end_month: int = 12):
+    """(payment_month, 명세) 한 달씩 생성 (저장된 스냅샷 조회)"""
+    for month in range(start_month, end_month + 1):
+        yield f"{year}-{month:02d}", payment_service.get_monthly_payments(year, month)
+
+
+def export_payments_xlsx(year: int, start_month: int = 1, end_month: int = 12, path: str = None) -> str:
+    """
+    기간 당직비 워크북을 파일로 저장하고 경로 반환 (path 미지정 시 임시 파일 - 사용 후 삭제는 호출 측)
+    """
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix=f"das_payments_{year}_", suffix=".xlsx")
+        os.close(fd)
+    write_payment_workbook(path, iter_payment_months(year, start_month, end_month))
+    return path
+
+
+# ── CSV(gzip) / Parquet ──
+
+EXPORT_FORMATS = {"csv": ".csv.gz", "parquet": ".parquet"}  # 형식 → 파일 확장자
+
+# 컬럼 스펙: (이름, 타입) - 타입은 pyarrow 타입 이름 (string/int64/float64/bool)
+PAYMENT_EXPORT_COLUMNS = [
+    ("payment_month", "string"), ("employee_id", "string"), ("employee_no", "string"), ("name", "string"),
+    ("department", "string"), ("position", "string"), ("business_unit", "string"), ("factory", "string"),
+    ("bank_account", "string"), ("duty_count", "int64"), ("amount", "int64"), ("payment_status", "string"),
+]
+_DUTY_EMPLOYEE_FIELDS = ("employee_no", "name", "department", "position")
+ASSIGNMENT_EXPORT_COLUMNS = [
+    ("id", "string"), ("duty_date", "string"), ("day_of_week", "string"), ("duty_type", "string"),
+    ("day_category", "string"), ("status", "string"),
+    *[(f"{alias}_{field}", "string") for alias in ("main_duty", "sub_duty") for field in ("id", *_DUTY_EMPLOYEE_FIELDS)],
+    ("change_count", "int64"), ("changes", "string"),
+]
+LOG_EXPORT_COLUMNS = [
+    ("id", "string"), ("log_date", "string"), ("factory", "string"), ("duty_type", "string"),
+    ("approval_status", "string"),
+    *[(f"{alias}_{field}", "string") for alias in ("main_duty", "sub_duty") for field in ("id", "employee_no", "name")],
+    ("issues", "string"), ("special_notes", "string"), ("rejection_reason", "string"),
+    ("approved_at", "string"), ("created_at", "string"), ("updated_at", "string"),
+]
+LOG_JSON_COLUMNS = ("workforce_status", "construction_status")
+
+_LOG_EMBEDS = ", ".join(
+    f"{alias}:employees!duty_logs_{alias}_id_fkey(employee_no, name)" for alias in ("main_duty", "sub_duty")
+)
+
+
+def _require_pyarrow():
+    """pyarrow 지연 import (Parquet 내보내기 전용 선택 의존성)"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet 내보내기에는 pyarrow가 필요합니다 (pip install pyarrow).") from e
+    return pyarrow, pyarrow.parquet
+
+
+def _check_format(fmt: str):
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt} (가능: {', '.join(EXPORT_FORMATS)})")
+    if fmt == "parquet":
+        _require_pyarrow()
+
+
+def _batches(records, size: int):
+    """행 반복자 → size행 목록 반복자"""
+    records = iter(records)
+    while batch := list(islice(records, size)):
+        yield batch
+
+
+def _write_csv(path: str, columns: list, batches) -> int:
+    names = [name for name, _ in columns]
+    written = 0
+    with gzip.open(path, "wt", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        for batch in batches:
+            writer.writerows([row.get(name) for name in names] for row in batch)
+            written += len(batch)
+    return written
+
+
+def _write_parquet(path: str, columns: list, batches) -> int:
+    pa, pq = _require_pyarrow()
+    schema = pa.schema([(name, pa.type_for_alias(kind)) for name, kind in columns])
+    text_columns = [name for name, kind in columns if kind == "string"]
+    compression = None if EXPORT_PARQUET_COMPRESSION == "none" else EXPORT_PARQUET_COMPRESSION
+    written = 0
+    with pq.ParquetWriter(path, schema, compression=compression) as writer:
+        for batch in batches:
+            for row in batch:
+                for name in text_columns:
+                    value = row.get(name)
+                    if value is not None and not isinstance(value, str):
+                        row[name] = str(value)
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            written += len(batch)
+    return written
+
+
+def write_records(path: str, fmt: str, columns: list, records, batch_size: int = None) -> int:
+    """
+    행 반복자를 CSV(gzip)/Parquet 파일로 기록 (batch_size행씩, 한 배치만 메모리에 보관)
+    - columns: (이름, 타입) 스펙, 행에 없는 컬럼은 빈 값
+    반환: 기록한 행 수
+    """
+    _check_format(fmt)
+    batches = _batches(records, batch_size or EXPORT_BATCH_SIZE)
+    if fmt == "parquet":
+        return _write_parquet(path, columns, batches)
+    return _write_csv(path, columns, batches)
+
+
+def _export(fmt: str, name: str, columns: list, records, path: str = None) -> str:
+    _check_format(fmt)  # 조회 전에 확인
+    temporary = path is None
+    if temporary:
+        fd, path = tempfile.mkstemp(prefix=f"das_{name}_", suffix=EXPORT_FORMATS[fmt])
+        os.close(fd)
+    try:
+        write_records(path, fmt, columns, records)
+    except Exception:
+        if temporary:
+            os.remove(path)
+        raise
+    return path
+
+
+def _payment_records(year: int, start_month: int, end_month: int):
+    for payment_month, payments in iter_payment_months(year, start_month, end_month):
+        for payment in payments:
+            emp = payment.get("employee") or {}
+            yield {
+                "payment_month": payment_month, "employee_id": payment["employee_id"],
+                **{name: emp.get(name) for name, _ in PAYMENT_EXPORT_COLUMNS[2:9]},
+                "duty_count": payment["duty_count"], "amount": payment["amount"],
+                "payment_status": payment.get("payment_status"),
+            }
+
+
+def export_payments(fmt: str, year: int, start_month: int = 1, end_month: int = 12, path: str = None) -> str:
+    """기간 당직비 명세 (직원별 x 월) 파일 저장 → 경로 (path 미지정 시 임시 파일)"""
+    return _export(fmt, "payments", PAYMENT_EXPORT_COLUMNS, _payment_records(year, start_month, end_month), path)
+
+
+def _assignment_records(start_date: str, end_date: str):
+    columns = (f"*, {assignment_service.duty_embed('main_duty')}, {assignment_service.duty_embed('sub_duty')}, "
+               f"{assignment_service.change_embed('duty_role, new_employee:employees!duty_changes_new_employee_id_fkey(name)')}")
+    filters = [("gte", "duty_date", start_date), ("lt", "duty_date", end_date)]
+    for asmt in db.iter_select("duty_assignments", columns, filters, key=("duty_date", "duty_type", "id")):
+        record = {name: asmt.get(name) for name, _ in ASSIGNMENT_EXPORT_COLUMNS[:6]}
+        for alias in ("main_duty", "sub_duty"):
+            emp = asmt.get(alias) or {}
+            record[f"{alias}_id"] = asmt.get(f"{alias}_id")
+            record.update({f"{alias}_{field}": emp.get(field) for field in _DUTY_EMPLOYEE_FIELDS})
+        changes = asmt.get("changes") or []
+        record["change_count"] = len(changes)
+        record["changes"] = "; ".join(
+            f"{c['duty_role']}→{(c.get('new_employee') or {}).get('name', '-')}" for c in changes
+        ) or None
+        yield record
+
+
+def export_assignments(fmt: str, start_date: str, end_date: str, path: str = None) -> str:
+    """기간 발령 (start_date 포함, end_date 미포함) + 총당직/부당직 직원 + 변경 요약 파일 저장 → 경로"""
+    return _export(fmt, "assignments", ASSIGNMENT_EXPORT_COLUMNS, _assignment_records(start_date, end_date), path)
+
+
+def _parse_json(value):
+    """JSON 컬럼 값 (문자열로 저장된 경우 파싱)"""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+def flatten_json(prefix: str, value, out: dict = None) -> dict:
+    """중첩 dict → {"prefix.키.하위키": 값} (목록은 JSON 문자열)"""
+    out = {} if out is None else out
+    value = _parse_json(value)
+    if isinstance(value, dict):
+        for key, child in value.items():
+            flatten_json(f"{prefix}.{key}", child, out)
+    elif isinstance(value, list):
+        out[prefix] = json.dumps(value, ensure_ascii=False)
+    elif value is not None:
+        out[prefix] = value
+    return out
+
+
+def _kind(value) -> str:
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int64"
+    if isinstance(value, float):
+        return "float64"
+    return "string"
+
+
+def _merge_kind(current: str | None, new: str) -> str:
+    if current is None or current == new:
+        return new
+    if {current, new} == {"int64", "float64"}:
+        return "float64"
+    return "string"
+
+
+def _log_json_columns(filters: list) -> list:
+    """
+    기간 일지의 JSON 펼침 컬럼 스펙 (JSON 컬럼별, 첫 등장 순서)
+    - 파일 헤더/스키마를 먼저 정해야 하므로 JSON 컬럼만 한 번 더 스트리밍 조회 (키 목록만 보관)
+    """
+    kinds = {column: {} for column in LOG_JSON_COLUMNS}
+    for row in db.iter_select("duty_logs", f"id, log_date, {', '.join(LOG_JSON_COLUMNS)}", filters,
+                              key=("log_date", "id")):
+        for column, found in kinds.items():
+            for key, value in flatten_json(column, row.get(column)).items():
+                found[key] = _merge_kind(found.get(key), _kind(value))
+    return [item for found in kinds.values() for item in found.items()]
+
+
+def _log_records(filters: list):
+    for log in db.iter_select("duty_logs", f"*, {_LOG_EMBEDS}", filters, key=("log_date", "id")):
+        record = {name: log.get(name) for name, _ in LOG_EXPORT_COLUMNS}
+        for alias in ("main_duty", "sub_duty"):
+            emp = log.get(alias) or {}
+            record[f"{alias}_employee_no"] = emp.get("employee_no")
+            record[f"{alias}_name"] = emp.get("name")
+        for column in LOG_JSON_COLUMNS:
+            flatten_json(column, log.get(column), record)
+        yield record
+
+
+def export_logs(fmt: str, start_date: str, end_date: str, path: str = None) -> str:
+    """
+    기간 근무일지 (start_date 포함, end_date 미포함) 파일 저장 → 경로
+    - workforce_status/construction_status는 "컬럼.키.하위키" 컬럼으로 펼침
+    """
+    _check_format(fmt)
+    filters = [("gte", "log_date", start_date), ("lt", "log_date", end_date)]
+    columns = LOG_EXPORT_COLUMNS + _log_json_columns(filters)
+    return _export(fmt, "logs", columns, _log_records(filters), path)
@@ -0,0 +1,163 @@
+"""
+쿼리 계측
+- services.db를 거치는 모든 호출의 테이블/연산/필터/소요시간/행 수/응답 크기 기록
+  · 응답 크기: HTTP Content-Length (캐시 적중은 0, 헤더가 없으면 DB_QUERY_LOG_BYTES일 때만 직렬화해 계산)
+- 프로세스 내 링 버퍼 + 백분위(p50/p95/p99) 요약
+- 페이지 렌더 단위 호출 수 집계 (N+1 패턴 탐지용)
+- 선택: JSONL 파일 싱크 (DB_QUERY_LOG_PATH)
+"""
+import contextvars
+import json
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import DB_QUERY_LOG_SIZE, DB_QUERY_LOG_PATH, DB_QUERY_LOG_BYTES
+
+_lock = threading.Lock()
+_records = deque(maxlen=DB_QUERY_LOG_SIZE)
+_renders = deque(maxlen=200)
+_current_render = contextvars.ContextVar("das_current_render", default=None)
+_response_bytes = contextvars.ContextVar("das_response_bytes", default=None)
+
+
+def begin_render(page: str):
+    """페이지 렌더 시작 표시 (common_ui.page_header에서 호출)"""
+    render = {"page": page, "started_at": datetime.now().isoformat(timespec="seconds"), "calls": 0}
+    _current_render.set(render)
+    with _lock:
+        _renders.append(render)
+
+
+def note_response(headers):
+    """HTTP 응답 크기 기록 (services.db 트랜스포트 / services.async_db 응답 훅에서 호출)"""
+    length = headers.get("content-length")
+    _response_bytes.set(int(length) if length and length.isdigit() else None)
+
+
+def _payload_bytes(data, cached: bool):
+    """응답 크기: Content-Length → (DB_QUERY_LOG_BYTES) 직렬화 크기 → 알 수 없음(None)"""
+    if cached:
+        return 0
+    size = _response_bytes.get()
+    if size is None and DB_QUERY_LOG_BYTES and data is not None:
+        size = len(json.dumps(data, ensure_ascii=False, default=str).encode("utf-8"))
+    return size
+
+
+def _row_count(data) -> int:
+    if data is None:
+        return 0
+    return len(data) if isinstance(data, list) else 1
+
+
+@contextmanager
+def track(table: str, operation: str, filters=None, cached: bool = False):
+    """
+    호출 1건 계측
+    - 블록 안에서 record["data"] = 응답 데이터 (행 수/크기 계산용)
+    - 행 수가 데이터와 다르면 record["rows"] 직접 지정 (예: count)
+    """
+    render = _current_render.get()
+    record = {
+        "ts": datetime.now().isoformat(timespec="milliseconds"),
+        "page": render["page"] if render else None,
+        "table": table,
+        "operation": operation,
+        "filters": filters,
+        "cached": cached,
+        "error": None,
+    }
+    _response_bytes.set(None)
+    start = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record["error"] = str(e)[:200]
+        raise
+    finally:
+        record["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        data = record.pop("data", None)
+        record.setdefault("rows", _row_count(data))
+        record["bytes"] = _payload_bytes(data, cached)
+        if render:
+            render["calls"] += 1
+        _store(record)
+
+
+def _store(record: dict):
+    with _lock:
+        _records.append(record)
+        if DB_QUERY_LOG_PATH:
+            with open(DB_QUERY_LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+
+def get_records() -> list:
+    """링 버퍼의 모든 기록 (오래된 순)"""
+    with _lock:
+        return list(_records)
+
+
+def reset():
+    with _lock:
+        _records.clear()
+        _renders.clear()
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    """nearest-rank 백분위"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def slowest(limit: int = 10) -> list:
+    """소요시간 상위 호출 (캐시 적중 제외)"""
+    records = [r for r in get_records() if not r["cached"]]
+    return sorted(records, key=lambda r: r["duration_ms"], reverse=True)[:limit]
+
+
+def summary() -> list:
+    """(테이블, 연산)별 호출 수/캐시 적중/백분위 소요시간/평균 행 수/총 바이트"""
+    groups = {}
+    for r in get_records():
+        groups.setdefault((r["table"], r["operation"]), []).append(r)
+
+    result = []
+    for (table, operation), records in groups.items():
+        durations = sorted(r["duration_ms"] for r in records if not r["cached"])
+        result.append({
+            "table": table,
+            "operation": operation,
+            "calls": len(records),
+            "cached": sum(1 for r in records if r["cached"]),
+            "errors": sum(1 for r in records if r["error"]),
+            "p50_ms": _percentile(durations, 50),
+            "p95_ms": _percentile(durations, 95),
+            "p99_ms": _percentile(durations, 99),
+            "max_ms": durations[-1] if durations else 0.0,
+            "avg_rows": round(sum(r["rows"] for r in records) / len(records), 1),
+            "bytes": sum(r["bytes"] or 0 for r in records),
+        })
+    return sorted(result, key=lambda s: s["p95_ms"], reverse=True)
+
+
+def render_summary() -> list:
+    """페이지별 렌더 수와 렌더당 호출 수 (최근/최대/평균)"""
+    with _lock:
+        renders = list(_renders)
+    pages = {}
+    for r in renders:
+        pages.setdefault(r["page"], []).append(r["calls"])
+    return [{
+        "page": page,
+        "renders": len(calls),
+        "last_calls": calls[-1],
+        "max_calls": max(calls),
+        "avg_calls": round(sum(calls) / len(calls), 1),
+    } for page, calls in pages.items()]
@@ -0,0 +1,934 @@
+"""
+로컬 임베디드 DB 백엔드 (SQLite)
+- data/schema.sql 테이블을 SQLite에 그대로 생성
+- Supabase(PostgREST) 쿼리 빌더 중 DAS에서 쓰는 부분을 같은 인터페이스로 제공
+  (select/insert/upsert/update/delete, eq/neq/in_/gt/gte/lt/lte/like/ilike/is_/or_,
+   order/limit/range/single, FK 임베딩 `alias:table!fkey(cols)`)
+- client.rpc(): data/schema.sql의 PostgreSQL 함수를 Python으로 구현해 등록 (register_rpc)
+- 트리거: data/schema.sql의 PostgreSQL 트리거를 SQLite 문법으로 재정의 (_TRIGGERS)
+  (순번 포인터 duty_rotation_pointers, 유효 명단 duty_roster_effective)
+- Supabase 없이 벤치마크/통합 테스트를 오프라인으로 실행하기 위한 용도
+
+사용법:
+    DB_BACKEND=local LOCAL_DB_PATH=das_local.db python data/seed_data.py
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+
+from postgrest.exceptions import APIError
+from config import DAS_TABLES
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "schema.sql")
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# SQLite 오류 메시지 → PostgreSQL 오류 코드
+_INTEGRITY_CODES = [
+    ("UNIQUE", "23505"),
+    ("FOREIGN KEY", "23503"),
+    ("CHECK", "23514"),
+    ("NOT NULL", "23502"),
+]
+
+# 필터 연산자 → SQL 연산자
+_OPERATORS = {
+    "eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=",
+}
+
+
+def _api_error(message: str, code: str, hint: str = None) -> APIError:
+    return APIError({"message": message, "code": code, "hint": hint, "details": None})
+
+
+def _split_top_level(text: str) -> list:
+    """괄호/따옴표 밖의 쉼표 기준으로 분리"""
+    parts, buf, depth, quoted = [], [], 0, False
+    for ch in text:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0 and not quoted:
+            parts.append("".join(buf).strip())
+            buf = []
+        else:
+            buf.append(ch)
+    parts.append("".join(buf).strip())
+    return [p for p in parts if p]
+
+
+def parse_select(text: str) -> list:
+    """
+    PostgREST select 문자열 파싱
+    - 컬럼: {"alias", "column"}
+    - 임베딩: {"alias", "table", "hint", "inner", "children"}
+    """
+    items = []
+    for part in _split_top_level(text or "*"):
+        if "(" in part:
+            head, inner = part.split("(", 1)
+            inner = inner[:inner.rindex(")")]
+            alias, _, target = head.strip().rpartition(":")
+            table, *modifiers = target.split("!")
+            hints = [m for m in modifiers if m not in ("inner", "left")]
+            items.append({
+                "alias": alias.strip() or table.strip(),
+                "table": table.strip(),
+                "hint": hints[0] if hints else None,
+                "inner": "inner" in modifiers,
+                "children": parse_select(inner),
+            })
+        else:
+            part = part.split("::")[0].strip()
+            alias, _, column = part.rpartition(":")
+            items.append({"alias": alias.strip() or column.strip(), "column": column.strip()})
+    return items
+
+
+class LocalResponse:
+    """postgrest APIResponse와 같은 data/count 속성을 가진 응답"""
+
+    def __init__(self, data, count: int = None):
+        self.data = data
+        self.count = count
+
+    def __repr__(self) -> str:
+        return f"LocalResponse(data={self.data!r}, count={self.count!r})"
+
+
+# ── 트리거 ──
+
+def _refresh_rotation_sql(category: str) -> str:
+    """das_refresh_rotation_pointers()의 SQLite 버전 (category: SQL 식, 예: NEW.day_category / ?)"""
+    return f"""
+        INSERT OR REPLACE INTO duty_rotation_pointers
+            (duty_role, day_category, employee_id, assignment_id, duty_date, duty_type, updated_at)
+        SELECT r.role, {category},
+               CASE r.role WHEN '총당직' THEN a.main_duty_id ELSE a.sub_duty_id END,
+               a.id, a.duty_date, a.duty_type, now()
+        FROM (SELECT '총당직' AS role UNION ALL SELECT '부당직') r
+        LEFT JOIN (
+            SELECT id, main_duty_id, sub_duty_id, duty_date, duty_type
+            FROM duty_assignments
+            WHERE day_category = {category} AND status IN ('완료', '확정')
+            ORDER BY duty_date DESC, duty_type ASC
+            LIMIT 1
+        ) a ON 1 = 1
+    """
+
+
+def _latest_change_sql(assignment: str, role: str, column: str) -> str:
+    """(발령, 역할)의 마지막 변경 컬럼 서브쿼리 (변경이 없으면 NULL)"""
+    return (f"(SELECT {column} FROM duty_changes WHERE assignment_id = {assignment} AND duty_role = {role} "
+            f"ORDER BY seq DESC LIMIT 1)")
+
+
+def _refresh_effective_sql(row: str) -> str:
+    """das_refresh_roster_effective()의 SQLite 버전 (row: OLD/NEW - 변경 행)"""
+    key = (f"{row}.assignment_id", f"{row}.duty_role")
+    return f"""
+        UPDATE duty_roster_effective SET
+            change_id = {_latest_change_sql(*key, "id")},
+            employee_id = COALESCE({_latest_change_sql(*key, "new_employee_id")}, rostered_employee_id),
+            updated_at = now()
+        WHERE assignment_id = {row}.assignment_id AND duty_role = {row}.duty_role
+    """
+
+
+_ROLE_ROWS = "(SELECT '총당직' AS role UNION ALL SELECT '부당직')"
+
+# 유효 명단 전체 재계산 - das_rebuild_roster_effective() 참고
+_REBUILD_EFFECTIVE_SQL = f"""
+    INSERT OR REPLACE INTO duty_roster_effective
+        (assignment_id, duty_role, duty_date, duty_type, day_category, status,
+         employee_id, rostered_employee_id, change_id, updated_at)
+    SELECT a.id, r.role, a.duty_date, a.duty_type, a.day_category, a.status,
+           COALESCE({_latest_change_sql("a.id", "r.role", "new_employee_id")},
+                    CASE r.role WHEN '총당직' THEN a.main_duty_id ELSE a.sub_duty_id END),
+           CASE r.role WHEN '총당직' THEN a.main_duty_id ELSE a.sub_duty_id END,
+           {_latest_change_sql("a.id", "r.role", "id")}, now()
+    FROM duty_assignments a CROSS JOIN {_ROLE_ROWS} r
+"""
+
+_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS trg_rotation_insert AFTER INSERT ON duty_assignments
+        WHEN NEW.status IN ('완료', '확정')
+        BEGIN {_refresh_rotation_sql("NEW.day_category")}; END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_rotation_update
+        AFTER UPDATE OF duty_date, duty_type, day_category, status, main_duty_id, sub_duty_id ON duty_assignments
+        WHEN OLD.status IN ('완료', '확정') OR NEW.status IN ('완료', '확정')
+        BEGIN
+            {_refresh_rotation_sql("OLD.day_category")};
+            {_refresh_rotation_sql("NEW.day_category")};
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_rotation_delete AFTER DELETE ON duty_assignments
+        WHEN OLD.status IN ('완료', '확정')
+        BEGIN {_refresh_rotation_sql("OLD.day_category")}; END""",
+    # 유효 명단 (das_roster_effective_assignment_trigger / das_roster_effective_change_trigger)
+    f"""CREATE TRIGGER IF NOT EXISTS trg_effective_assignment_insert AFTER INSERT ON duty_assignments
+        BEGIN
+            INSERT OR IGNORE INTO duty_roster_effective
+                (assignment_id, duty_role, duty_date, duty_type, day_category, status,
+                 employee_id, rostered_employee_id, updated_at)
+            SELECT NEW.id, r.role, NEW.duty_date, NEW.duty_type, NEW.day_category, NEW.status,
+                   CASE r.role WHEN '총당직' THEN NEW.main_duty_id ELSE NEW.sub_duty_id END,
+                   CASE r.role WHEN '총당직' THEN NEW.main_duty_id ELSE NEW.sub_duty_id END, now()
+            FROM {_ROLE_ROWS} r;
+        END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_effective_assignment_update
+        AFTER UPDATE OF duty_date, duty_type, day_category, status, main_duty_id, sub_duty_id ON duty_assignments
+        BEGIN
+            UPDATE duty_roster_effective SET
+                duty_date = NEW.duty_date,
+                duty_type = NEW.duty_type,
+                day_category = NEW.day_category,
+                status = NEW.status,
+                rostered_employee_id = CASE duty_role WHEN '총당직' THEN NEW.main_duty_id ELSE NEW.sub_duty_id END,
+                employee_id = CASE WHEN change_id IS NOT NULL THEN employee_id
+                                   WHEN duty_role = '총당직' THEN NEW.main_duty_id ELSE NEW.sub_duty_id END,
+                updated_at = now()
+            WHERE assignment_id = NEW.id;
+        END""",
+    # duty_changes.seq (BIGSERIAL): SQLite는 rowid로 채움
+    """CREATE TRIGGER IF NOT EXISTS trg_change_seq AFTER INSERT ON duty_changes WHEN NEW.seq IS NULL
+        BEGIN UPDATE duty_changes SET seq = NEW.rowid WHERE rowid = NEW.rowid; END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_effective_change_insert AFTER INSERT ON duty_changes
+        BEGIN
+            UPDATE duty_roster_effective SET employee_id = NEW.new_employee_id, change_id = NEW.id, updated_at = now()
+            WHERE assignment_id = NEW.assignment_id AND duty_role = NEW.duty_role;
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_effective_change_update
+        AFTER UPDATE OF assignment_id, duty_role, new_employee_id ON duty_changes
+        BEGIN {_refresh_effective_sql("OLD")}; {_refresh_effective_sql("NEW")}; END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_effective_change_delete AFTER DELETE ON duty_changes
+        BEGIN {_refresh_effective_sql("OLD")}; END""",
+]
+
+
+class LocalClient:
+    """Supabase Client의 table()/from_() 인터페이스를 제공하는 SQLite 클라이언트"""
+
+    def __init__(self, path: str = ":memory:", schema_path: str = SCHEMA_PATH):
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.create_function("gen_random_uuid", 0, lambda: str(uuid.uuid4()))
+        self.conn.create_function("now", 0, lambda: datetime.now(timezone.utc).isoformat())
+        self.conn.create_function("pg_like", 2, _like, deterministic=True)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode = WAL")
+        self.load_schema(schema_path)
+
+    # ── 스키마 ──
+
+    def load_schema(self, schema_path: str):
+        """PostgreSQL DDL 중 테이블/인덱스만 SQLite 문법으로 변환해 실행"""
+        with open(schema_path, encoding="utf-8") as f:
+            sql = re.sub(r"--[^\n]*", "", f.read())
+        sql = re.sub(r"\$\$.*?\$\$", "", sql, flags=re.DOTALL)  # 함수 본문 (; 포함) 제외
+
+        with self.lock:
+            for statement in sql.split(";"):
+                statement = statement.strip()
+                if not re.match(r"CREATE (TABLE|INDEX|UNIQUE INDEX)", statement, re.IGNORECASE):
+                    continue  # RLS/POLICY 등 PostgreSQL 전용 구문 제외
+                statement = re.sub(r"DEFAULT (gen_random_uuid\(\)|now\(\))", r"DEFAULT (\1)", statement)
+                statement = re.sub(r"\bBIGSERIAL\b", "INTEGER", statement)  # 값은 트리거가 채움 (trg_change_seq)
+                self.conn.execute(statement)
+            self._add_columns()
+            self._load_metadata()
+            for statement in _TRIGGERS:
+                self.conn.execute(statement)
+            self._backfill()
+
+    def _add_columns(self):
+        """CREATE TABLE IF NOT EXISTS로 추가되지 않는 새 컬럼 (기존 DB 파일, schema.sql의 ALTER TABLE 참고)"""
+        if "seq" not in {r["name"] for r in self.conn.execute("PRAGMA table_info(duty_changes)")}:
+            self.conn.execute("ALTER TABLE duty_changes ADD COLUMN seq INTEGER")
+            self.conn.execute("UPDATE duty_changes SET seq = rowid")
+
+    def _backfill(self):
+        """트리거 도입 전에 만든 DB 파일: 비어 있는 파생 테이블을 이력에서 재계산"""
+        if not self.conn.execute("SELECT 1 FROM duty_assignments LIMIT 1").fetchone():
+            return
+        if not self.conn.execute("SELECT 1 FROM duty_rotation_pointers LIMIT 1").fetchone():
+            for category in ("휴무일", "평일"):
+                self.conn.execute(_refresh_rotation_sql("?1"), (category,))
+        if not self.conn.execute("SELECT 1 FROM duty_roster_effective LIMIT 1").fetchone():
+            self.conn.execute(_REBUILD_EFFECTIVE_SQL)
+
+    def _load_metadata(self):
+        """컬럼 타입 / FK / 단일 UNIQUE 컬럼 정보 수집"""
+        self.columns = {}
+        self.foreign_keys = []
+        self.unique_columns = set()
+        tables = [r["name"] for r in self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        )]
+        for table in tables:
+            self.columns[table] = {
+                r["name"]: (r["type"] or "").upper()
+                for r in self.conn.execute(f"PRAGMA table_info({table})")
+            }
+            for r in self.conn.execute(f"PRAGMA foreign_key_list({table})"):
+                self.foreign_keys.append({
+                    "name": f"{table}_{r['from']}_fkey",
+                    "table": table, "column": r["from"],
+                    "ref_table": r["table"], "ref_column": r["to"] or "id",
+                })
+            for idx in self.conn.execute(f"PRAGMA index_list({table})"):
+                if not idx["unique"]:
+                    continue
+                cols = [r["name"] for r in self.conn.execute(f"PRAGMA index_info({idx['name']})")]
+                if len(cols) == 1:
+                    self.unique_columns.add((table, cols[0]))
+
+    # ── Client 인터페이스 ──
+
+    def table(self, table_name: str) -> "LocalQueryBuilder":
+        return LocalQueryBuilder(self, table_name)
+
+    def from_(self, table_name: str) -> "LocalQueryBuilder":
+        return self.table(table_name)
+
+    def rpc(self, func: str, params: dict = None, count: str = None, head: bool = False,
+            get: bool = False) -> "LocalRPCBuilder":
+        return LocalRPCBuilder(self, func, params or {})
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    # ── 내부 유틸 ──
+
+    def require_table(self, table: str):
+        if table not in self.columns:
+            raise _api_error(f'relation "public.{table}" does not exist', "42P01")
+
+    def column(self, table: str, column: str) -> str:
+        """식별자 검증 (SQL 인젝션 방지 + 존재하지 않는 컬럼 오류)"""
+        self.require_table(table)
+        if not _IDENTIFIER.match(column) or column not in self.columns[table]:
+            raise _api_error(f"column {table}.{column} does not exist", "42703")
+        return column
+
+    def encode(self, table: str, column: str, value):
+        """Python 값 → SQLite 저장 값"""
+        col_type = self.columns.get(table, {}).get(column, "")
+        if value is None:
+            return None
+        if col_type == "BOOLEAN" and isinstance(value, str):
+            return {"true": 1, "false": 0}.get(value.lower(), value)
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, ensure_ascii=False)
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        return value
+
+    def decode(self, table: str, row: sqlite3.Row) -> dict:
+        """SQLite 행 → PostgREST JSON과 같은 형태의 dict"""
+        result = dict(row)
+        for column, col_type in self.columns[table].items():
+            value = result.get(column)
+            if value is None:
+                continue
+            if col_type == "BOOLEAN":
+                result[column] = bool(value)
+            elif col_type in ("JSON", "JSONB") and isinstance(value, str):
+                try:
+                    result[column] = json.loads(value)
+                except ValueError:
+                    pass
+        return result
+
+    def execute(self, sql: str, params=()) -> list:
+        try:
+            with self.lock:
+                return self.conn.execute(sql, params).fetchall()
+        except sqlite3.IntegrityError as e:
+            code = next((c for key, c in _INTEGRITY_CODES if key in str(e)), "23000")
+            raise _api_error(str(e), code) from e
+        except sqlite3.OperationalError as e:
+            raise _api_error(str(e), "42P01" if "no such table" in str(e) else "42601") from e
+
+    def execute_many(self, statements: list) -> list:
+        """여러 문장을 하나의 트랜잭션으로 실행 (PostgREST 요청 단위 원자성)"""
+        results = []
+        with self.transaction() as conn:
+            for sql, params in statements:
+                results.extend(conn.execute(sql, params).fetchall())
+        return results
+
+    @contextmanager
+    def transaction(self):
+        """
+        BEGIN IMMEDIATE ~ COMMIT 구간의 연결 (예외 시 ROLLBACK)
+        - 조회 결과에 따라 쓰기가 달라지는 RPC 구현용 (PostgreSQL 함수 = 한 트랜잭션)
+        """
+        try:
+            with self.lock:
+                self.conn.execute("BEGIN IMMEDIATE")
+                try:
+                    yield self.conn
+                except BaseException:
+                    self.conn.execute("ROLLBACK")
+                    raise
+                self.conn.execute("COMMIT")
+        except sqlite3.IntegrityError as e:
+            code = next((c for key, c in _INTEGRITY_CODES if key in str(e)), "23000")
+            raise _api_error(str(e), code) from e
+        except sqlite3.OperationalError as e:
+            raise _api_error(str(e), "42P01" if "no such table" in str(e) else "42601") from e
+
+    def relation(self, base: str, target: str, hint: str = None) -> dict:
+        """임베딩 관계 결정 (정방향: base가 FK 보유 / 역방향: target이 FK 보유)"""
+        candidates = [
+            dict(fk, direction="forward") for fk in self.foreign_keys
+            if fk["table"] == base and fk["ref_table"] == target
+        ] + [
+            dict(fk, direction="reverse") for fk in self.foreign_keys
+            if fk["table"] == target and fk["ref_table"] == base
+        ]
+        if hint:
+            candidates = [fk for fk in candidates if hint in (fk["name"], fk["column"])]
+        if not candidates:
+            raise _api_error(
+                f"Could not find a relationship between '{base}' and '{target}'", "PGRST200"
+            )
+        if len(candidates) > 1:
+            raise _api_error(
+                f"Could not embed because more than one relationship was found for '{base}' and '{target}'",
+                "PGRST201",
+                hint="'table!fkey_name(*)' 형식으로 관계를 지정하세요.",
+            )
+        return candidates[0]
+
+
+def _like(value, pattern) -> bool:
+    """대소문자 구분 LIKE (SQLite 기본 LIKE는 ASCII 대소문자 무시)"""
+    if value is None or pattern is None:
+        return None
+    regex = "".join(
+        ".*" if ch == "%" else "." if ch == "_" else re.escape(ch)
+        for ch in str(pattern)
+    )
+    return re.fullmatch(regex, str(value), re.DOTALL) is not None
+
+
+class LocalQueryBuilder:
+    """client.table(name) 이후 체이닝되는 PostgREST 요청 빌더"""
+
+    def __init__(self, client: LocalClient, table: str):
+        self.client = client
+        self.table = table
+        self.method = "select"
+        self.select_items = parse_select("*")
+        self.payload = None
+        self.on_conflict = None
+        self.ignore_duplicates = False
+        self.count_method = None
+        self.head = False
+        self.conditions = []      # [(sql, params)]
+        self.orders = []          # [sql]
+        self.limit_value = None
+        self.offset_value = None
+        self.single_mode = None   # "single" | "maybe"
+        self.negate_next = False
+        self.returning = "representation"
+
+    # ── 요청 종류 ──
+
+    def select(self, *columns: str, count: str = None, head: bool = False):
+        if self.method == "select":
+            self.count_method = count
+            self.head = bool(head)
+        self.select_items = parse_select(",".join(columns) if columns else "*")
+        return self
+
+    def insert(self, json, *, count: str = None, returning: str = "representation",
+               upsert: bool = False, default_to_null: bool = True):
+        self.method = "upsert" if upsert else "insert"
+        self.payload = json if isinstance(json, list) else [json]
+        self.count_method = count
+        self.returning = returning
+        return self
+
+    def upsert(self, json, *, count: str = None, returning: str = "representation",
+               ignore_duplicates: bool = False, on_conflict: str = "", default_to_null: bool = True):
+        self.insert(json, count=count, returning=returning, upsert=True)
+        self.ignore_duplicates = ignore_duplicates
+        self.on_conflict = on_conflict or None
+        return self
+
+    def update(self, json, *, count: str = None, returning: str = "representation"):
+        self.method = "update"
+        self.payload = json
+        self.count_method = count
+        self.returning = returning
+        return self
+
+    def delete(self, *, count: str = None, returning: str = "representation"):
+        self.method = "delete"
+        self.count_method = count
+        self.returning = returning
+        return self
+
+    # ── 필터 ──
+
+    @property
+    def not_(self):
+        self.negate_next = True
+        return self
+
+    def _condition(self, column: str, operator: str, value) -> tuple:
+        col = self.client.column(self.table, column)
+        if operator in _OPERATORS:
+            return f"{col} {_OPERATORS[operator]} ?", [self.client.encode(self.table, col, value)]
+        if operator == "in":
+            values = [self.client.encode(self.table, col, v) for v in value]
+            if not values:
+                return "0", []
+            return f"{col} IN ({', '.join('?' * len(values))})", values
+        if operator == "like":
+            return f"pg_like({col}, ?)", [str(value).replace("*", "%")]
+        if operator == "ilike":
+            return f"{col} LIKE ?", [str(value).replace("*", "%")]
+        if operator == "is":
+            literal = {None: "NULL", "null": "NULL", True: "TRUE", "true": "TRUE",
+                       False: "FALSE", "false": "FALSE"}.get(value if not isinstance(value, str) else value.lower())
+            if literal is None:
+                raise _api_error(f"invalid IS value: {value}", "22P02")
+            return f"{col} IS {literal}", []
+        raise _api_error(f"unsupported operator: {operator}", "PGRST100")
+
+    def _add(self, column: str, operator: str, value):
+        sql, params = self._condition(column, operator, value)
+        if self.negate_next:
+            sql, self.negate_next = f"NOT ({sql})", False
+        self.conditions.append((sql, params))
+        return self
+
+    def eq(self, column, value):
+        return self._add(column, "eq", value)
+
+    def neq(self, column, value):
+        return self._add(column, "neq", value)
+
+    def gt(self, column, value):
+        return self._add(column, "gt", value)
+
+    def gte(self, column, value):
+        return self._add(column, "gte", value)
+
+    def lt(self, column, value):
+        return self._add(column, "lt", value)
+
+    def lte(self, column, value):
+        return self._add(column, "lte", value)
+
+    def like(self, column, pattern):
+        return self._add(column, "like", pattern)
+
+    def ilike(self, column, pattern):
+        return self._add(column, "ilike", pattern)
+
+    def is_(self, column, value):
+        return self._add(column, "is", value)
+
+    def in_(self, column, values):
+        return self._add(column, "in", list(values))
+
+    def match(self, query: dict):
+        for column, value in query.items():
+            self.eq(column, value)
+        return self
+
+    def filter(self, column: str, operator: str, criteria):
+        negate = operator.startswith("not.")
+        if negate:
+            self.negate_next, operator = True, operator[4:]
+        return self._add(column, operator, self._parse_value(operator, criteria))
+
+    def or_(self, filters: str, reference_table: str = None):
+        sql, params = self._logic("OR", filters)
+        if self.negate_next:
+            sql, self.negate_next = f"NOT ({sql})", False
+        self.conditions.append((sql, params))
+        return self
+
+    def _logic(self, joiner: str, text: str) -> tuple:
+        """PostgREST 논리식 `a.eq.1,and(b.gt.2,c.lt.3)` → SQL"""
+        clauses, params = [], []
+        for part in _split_top_level(text):
+            negate = part.startswith("not.")
+            if negate:
+                part = part[4:]
+            if part.startswith(("and(", "or(")):
+                op, inner = part.split("(", 1)
+                sql, sub_params = self._logic(op.upper(), inner[:inner.rindex(")")])
+            else:
+                column, operator, value = part.split(".", 2)
+                if operator == "not":
+                    negate = not negate
+                    operator, value = value.split(".", 1)
+                sql, sub_params = self._condition(column, operator, self._parse_value(operator, value))
+            clauses.append(f"NOT ({sql})" if negate else f"({sql})")
+            params.extend(sub_params)
+        return f" {joiner} ".join(clauses) or "1", params
+
+    @staticmethod
+    def _parse_value(operator: str, value):
+        if not isinstance(value, str):
+            return value
+        if operator == "in":
+            return [v.strip('"') for v in _split_top_level(value.strip("()"))]
+        return value.strip('"')
+
+    # ── 정렬/페이징 ──
+
+    def order(self, column: str, *, desc: bool = False, nullsfirst: bool = None, foreign_table: str = None):
+        col = self.client.column(self.table, column)
+        sql = f"{col} {'DESC' if desc else 'ASC'}"
+        if nullsfirst is not None:
+            sql += " NULLS FIRST" if nullsfirst else " NULLS LAST"
+        self.orders.append(sql)
+        return self
+
+    def limit(self, size: int, *, foreign_table: str = None):
+        self.limit_value = int(size)
+        return self
+
+    def offset(self, size: int):
+        self.offset_value = int(size)
+        return self
+
+    def range(self, start: int, end: int, foreign_table: str = None):
+        self.offset_value = int(start)
+        self.limit_value = int(end) - int(start) + 1
+        return self
+
+    def single(self):
+        self.single_mode = "single"
+        return self
+
+    def maybe_single(self):
+        self.single_mode = "maybe"
+        return self
+
+    # ── 실행 ──
+
+    def _where(self) -> tuple:
+        if not self.conditions:
+            return "", []
+        sql = " WHERE " + " AND ".join(f"({c})" for c, _ in self.conditions)
+        return sql, [p for _, params in self.conditions for p in params]
+
+    def execute(self) -> LocalResponse:
+        if self.method == "select":
+            response = self._execute_select()
+        elif self.method in ("insert", "upsert"):
+            response = self._execute_insert()
+        elif self.method == "update":
+            response = self._execute_update()
+        else:
+            response = self._execute_delete()
+
+        if self.returning == "minimal" and self.method != "select":
+            response.data = []
+        if self.single_mode:
+            rows = response.data
+            if len(rows) == 1:
+                response.data = rows[0]
+            elif self.single_mode == "maybe" and not rows:
+                return None
+            else:
+                raise _api_error(
+                    "JSON object requested, multiple (or no) rows returned", "PGRST116",
+                )
+        return response
+
+    def _count(self) -> int:
+        where, params = self._where()
+        return self.client.execute(f"SELECT COUNT(*) FROM {self.table}{where}", params)[0][0]
+
+    def _execute_select(self) -> LocalResponse:
+        self.client.require_table(self.table)
+        where, params = self._where()
+        sql = f"SELECT * FROM {self.table}{where}"
+        if self.orders:
+            sql += " ORDER BY " + ", ".join(self.orders)
+        if self.limit_value is not None or self.offset_value is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params = params + [
+                self.limit_value if self.limit_value is not None else -1,
+                self.offset_value or 0,
+            ]
+        count = self._count() if self.count_method else None
+        if self.head:
+            return LocalResponse([], count)
+
+        rows = [self.client.decode(self.table, r) for r in self.client.execute(sql, params)]
+        rows = _embed(self.client, self.table, rows, self.select_items)
+        return LocalResponse([_project(self.client, self.table, r, self.select_items) for r in rows], count)
+
+    def _returned(self, rows: list) -> list:
+        decoded = [self.client.decode(self.table, r) for r in rows]
+        decoded = _embed(self.client, self.table, decoded, self.select_items)
+        return [_project(self.client, self.table, r, self.select_items) for r in decoded]
+
+    def _execute_insert(self) -> LocalResponse:
+        statements = []
+        conflict_cols = [
+            self.client.column(self.table, c.strip())
+            for c in (self.on_conflict or "id").split(",")
+        ]
+        for row in self.payload:
+            columns = [self.client.column(self.table, c) for c in row]
+            values = [self.client.encode(self.table, c, row[c]) for c in columns]
+            if columns:
+                sql = (
+                    f"INSERT INTO {self.table} ({', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' * len(columns))})"
+                )
+            else:
+                sql = f"INSERT INTO {self.table} DEFAULT VALUES"
+            if self.method == "upsert":
+                updates = [c for c in columns if c not in conflict_cols]
+                if self.ignore_duplicates or not updates:
+                    sql += f" ON CONFLICT ({', '.join(conflict_cols)}) DO NOTHING"
+                else:
+                    sql += (
+                        f" ON CONFLICT ({', '.join(conflict_cols)}) DO UPDATE SET "
+                        + ", ".join(f"{c} = excluded.{c}" for c in updates)
+                    )
+            statements.append((sql + " RETURNING *", values))
+
+        rows = self.client.execute_many(statements)
+        return LocalResponse(self._returned(rows), len(rows) if self.count_method else None)
+
+    def _execute_update(self) -> LocalResponse:
+        columns = [self.client.column(self.table, c) for c in self.payload]
+        values = [self.client.encode(self.table, c, self.payload[c]) for c in columns]
+        where, params = self._where()
+        sql = f"UPDATE {self.table} SET {', '.join(f'{c} = ?' for c in columns)}{where} RETURNING *"
+        rows = self.client.execute_many([(sql, values + params)])
+        return LocalResponse(self._returned(rows), len(rows) if self.count_method else None)
+
+    def _execute_delete(self) -> LocalResponse:
+        where, params = self._where()
+        rows = self.client.execute_many([(f"DELETE FROM {self.table}{where} RETURNING *", params)])
+        return LocalResponse(self._returned(rows), len(rows) if self.count_method else None)
+
+
+# ── FK 임베딩 / 컬럼 선택 ──
+
+_EMBED_KEY = "__embed__"
+
+
+def _fetch_in(client: LocalClient, table: str, column: str, keys: set) -> list:
+    """column IN keys 조회 (SQLite 변수 개수 제한 고려해 분할)"""
+    keys = list(keys)
+    rows = []
+    for i in range(0, len(keys), 500):
+        chunk = keys[i:i + 500]
+        sql = f"SELECT * FROM {table} WHERE {column} IN ({', '.join('?' * len(chunk))})"
+        rows.extend(client.decode(table, r) for r in client.execute(sql, chunk))
+    return rows
+
+
+def _embed(client: LocalClient, table: str, rows: list, items: list) -> list:
+    """select 트리의 임베딩 항목을 일괄 조회해 각 행에 부착 (N+1 없이 관계별 1회 조회)"""
+    for item in items:
+        if "table" not in item:
+            continue
+        rel = client.relation(table, item["table"], item["hint"])
+        if not rows:
+            continue
+        target = item["table"]
+
+        if rel["direction"] == "forward":
+            keys = {r[rel["column"]] for r in rows if r.get(rel["column"]) is not None}
+            children = _embed(client, target, _fetch_in(client, target, rel["ref_column"], keys), item["children"])
+            by_key = {c[rel["ref_column"]]: _project(client, target, c, item["children"]) for c in children}
+            for r in rows:
+                r.setdefault(_EMBED_KEY, {})[item["alias"]] = by_key.get(r.get(rel["column"]))
+        else:
+            keys = {r[rel["ref_column"]] for r in rows if r.get(rel["ref_column"]) is not None}
+            children = _embed(client, target, _fetch_in(client, target, rel["column"], keys), item["children"])
+            grouped = {}
+            for c in children:
+                grouped.setdefault(c[rel["column"]], []).append(_project(client, target, c, item["children"]))
+            one_to_one = (target, rel["column"]) in client.unique_columns
+            for r in rows:
+                matched = grouped.get(r.get(rel["ref_column"]), [])
+                r.setdefault(_EMBED_KEY, {})[item["alias"]] = (matched[0] if matched else None) if one_to_one else matched
+
+        if item["inner"]:
+            rows = [r for r in rows if r[_EMBED_KEY][item["alias"]]]
+    return rows
+
+
+def _project(client: LocalClient, table: str, row: dict, items: list) -> dict:
+    """select 트리에 따라 컬럼 선택/별칭 적용"""
+    result = {}
+    embedded = row.get(_EMBED_KEY, {})
+    for item in items:
+        if "table" in item:
+            result[item["alias"]] = embedded.get(item["alias"])
+        elif item["column"] == "*":
+            result.update({c: row.get(c) for c in client.columns[table]})
+        else:
+            result[item["alias"]] = row.get(client.column(table, item["column"]))
+    return result
+
+
+# ── RPC ──
+# 함수 이름 → 구현 (client, **params) → 응답 data
+_RPC_FUNCTIONS = {}
+
+
+def register_rpc(name: str):
+    """data/schema.sql의 PostgreSQL 함수와 같은 이름/인자/결과의 로컬 구현 등록 (데코레이터)"""
+    def decorator(func):
+        _RPC_FUNCTIONS[name] = func
+        return func
+    return decorator
+
+
+class LocalRPCBuilder:
+    """client.rpc(name, params) 요청 빌더"""
+
+    def __init__(self, client: LocalClient, func: str, params: dict):
+        self.client = client
+        self.func = func
+        self.params = params
+
+    def execute(self) -> LocalResponse:
+        impl = _RPC_FUNCTIONS.get(self.func)
+        if impl is None:
+            raise _api_error(f"Could not find the function public.{self.func}", "PGRST202")
+        try:
+            return LocalResponse(impl(self.client, **self.params))
+        except TypeError as e:
+            raise _api_error(f"{self.func}: {e}", "PGRST202") from e
+
+
+@register_rpc("das_table_stats")
+def _das_table_stats(client: LocalClient, p_month: str = None, p_estimated: bool = False) -> dict:
+    """테이블별 건수 + 대시보드 지표 (SQLite는 통계 추정치가 없으므로 p_estimated와 무관하게 정확한 건수)"""
+    def scalar(sql, params=()):
+        return client.execute(sql, params)[0][0] or 0
+
+    stats = {table: scalar(f"SELECT count(*) FROM {table}") for table in DAS_TABLES}
+    stats["active_employees"] = scalar("SELECT count(*) FROM employees WHERE is_active")
+    stats["pending_logs"] = scalar("SELECT count(*) FROM duty_logs WHERE approval_status <> '승인'")
+    if p_month:
+        year, month = map(int, p_month.split("-"))
+        start = f"{year}-{month:02d}-01"
+        end = f"{year + 1}-01-01" if month == 12 else f"{year}-{month + 1:02d}-01"
+        stats["month"] = {
+            "duty_assignments": scalar(
+                "SELECT count(*) FROM duty_assignments WHERE duty_date >= ? AND duty_date < ?", (start, end)),
+            "duty_changes": scalar(
+                "SELECT count(*) FROM duty_changes WHERE change_date >= ? AND change_date < ?", (start, end)),
+            "payment_amount": scalar(
+                "SELECT sum(amount) FROM duty_payments WHERE payment_month = ?", (p_month,)),
+        }
+    return stats
+
+
+@register_rpc("das_rebuild_rotation_pointers")
+def _das_rebuild_rotation_pointers(client: LocalClient) -> list:
+    """순번 포인터 전체 재계산"""
+    client.execute_many([(_refresh_rotation_sql("?1"), (category,)) for category in ("휴무일", "평일")])
+    rows = client.execute("SELECT * FROM duty_rotation_pointers ORDER BY day_category, duty_role")
+    return [client.decode("duty_rotation_pointers", r) for r in rows]
+
+
+@register_rpc("das_rebuild_roster_effective")
+def _das_rebuild_roster_effective(client: LocalClient) -> int:
+    """유효 명단 전체 재계산 → 행 수"""
+    client.execute_many([("DELETE FROM duty_roster_effective", ()), (_REBUILD_EFFECTIVE_SQL, ())])
+    return client.execute("SELECT count(*) FROM duty_roster_effective")[0][0]
+
+
+def _register_change(client: LocalClient, conn: sqlite3.Connection, p_assignment_id: str, p_duty_role: str,
+                     p_change_reason: str, p_new_employee_no: str = None, p_new_employee_id: str = None,
+                     p_original_employee_id: str = None, p_change_date: str = None) -> dict:
+    """변경 1건 등록 (호출 측 트랜잭션 안에서 실행)"""
+    if p_duty_role not in ("총당직", "부당직"):
+        raise _api_error(f"변경 구분이 올바르지 않습니다: {p_duty_role}", "22023")
+    assignment = conn.execute("SELECT * FROM duty_assignments WHERE id = ?", (p_assignment_id,)).fetchone()
+    if assignment is None:
+        raise _api_error(f"발령을 찾을 수 없습니다: {p_assignment_id}", "P0002")
+    if p_new_employee_id is not None:
+        new = conn.execute("SELECT * FROM employees WHERE id = ?", (p_new_employee_id,)).fetchone()
+    else:
+        new = conn.execute("SELECT * FROM employees WHERE employee_no = ?", (p_new_employee_no,)).fetchone()
+    if new is None:
+        raise _api_error(f"직원을 찾을 수 없습니다: {p_new_employee_no or p_new_employee_id}", "P0002")
+    if not new["is_active"]:
+        raise _api_error(f"재직 중인 직원이 아닙니다: {new['employee_no']}", "P0001")
+
+    # 현재 당직자: 유효 명단의 실제 당직자 (같은 역할의 마지막 변경 반영)
+    current = conn.execute(
+        "SELECT employee_id FROM duty_roster_effective WHERE assignment_id = ? AND duty_role = ?",
+        (p_assignment_id, p_duty_role),
+    ).fetchone()
+    original_id = current[0] if current else None
+    if original_id is None:
+        raise _api_error(f"{assignment['duty_date']} {p_duty_role} 당직자가 배정되지 않았습니다.", "P0001")
+    if p_original_employee_id is not None and p_original_employee_id != original_id:
+        raise _api_error("다른 변경이 먼저 등록되었습니다. 현재 당직자를 다시 확인하세요.", "40001")
+    if original_id == new["id"]:
+        raise _api_error("변경 전/후 당직자가 같습니다.", "P0001")
+
+    change_id = str(uuid.uuid4())
+    conn.execute(
+        "INSERT INTO duty_changes (id, assignment_id, original_employee_id, new_employee_id, duty_role, "
+        "change_reason, change_date) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (change_id, p_assignment_id, original_id, new["id"], p_duty_role, p_change_reason,
+         p_change_date or assignment["duty_date"]),
+    )
+    conn.execute("UPDATE duty_assignments SET status = '변경', updated_at = now() WHERE id = ?", (p_assignment_id,))
+    change = conn.execute("SELECT * FROM duty_changes WHERE id = ?", (change_id,)).fetchone()
+    assignment = conn.execute("SELECT * FROM duty_assignments WHERE id = ?", (p_assignment_id,)).fetchone()
+    original = conn.execute("SELECT * FROM employees WHERE id = ?", (original_id,)).fetchone()
+    return dict(
+        client.decode("duty_changes", change),
+        assignment=client.decode("duty_assignments", assignment),
+        original=client.decode("employees", original) if original else None,
+        new=client.decode("employees", new),
+    )
+
+
+@register_rpc("das_register_change")
+def _das_register_change(client: LocalClient, **params) -> dict:
+    """당직 변경 등록 (한 트랜잭션) - data/schema.sql das_register_change 참고"""
+    with client.transaction() as conn:
+        return _register_change(client, conn, **params)
+
+
+@register_rpc("das_register_changes")
+def _das_register_changes(client: LocalClient, p_changes: list) -> list:
+    """당직 변경 일괄 등록 (전체가 한 트랜잭션, 실패 시 몇 번째 항목인지 포함해 전체 취소)"""
+    results = []
+    with client.transaction() as conn:
+        for i, item in enumerate(p_changes, start=1):
+            try:
+                results.append(_register_change(client, conn, **{f"p_{k}": v for k, v in item.items()}))
+            except APIError as e:
+                raise _api_error(f"{i}번째 변경: {e.message}", e.code) from e
+    return results
@@ -1,44 +1,53 @@
 """
 당직근무일지 서비스
-- 일지 CRUD
+- 일지 CRUD (저장은 유니크 키 upsert 1회)
 - 승인 프로세스 (저장 → 승인요청 → 승인/부결)
+- 일지 근무의 총당직/부당직: 유효 명단(변경 반영된 실제 당직자) 기준
 """
+from datetime import datetime
+
 from services import db
 from config import APPROVAL_STATUS
 
+# 일지 유니크 키 (공장별 일자/근무 1건)
+LOG_KEY = "log_date,factory,duty_type"
 
-def get_log_by_date(duty_date: str, factory: str, duty_type: str = None) -> dict | None:
-    """날짜+공장으로 일지 조회"""
-    client = db.get_client()
-    query = (
-        client.table("duty_logs")
-        .select("*")
-        .eq("log_date", duty_date)
-        .eq("factory", factory)
-    )
 
+def get_log_by_date(duty_date: str, factory: str, duty_type: str = None, columns: str = "*") -> dict | None:
+    """날짜+공장으로 일지 조회"""
+    filters = [("eq", "log_date", duty_date), ("eq", "factory", factory)]
     if duty_type:
-        query = query.eq("duty_type", duty_type)
+        filters.append(("eq", "duty_type", duty_type))
 
-    response = query.execute()
-    if response.data:
-        return response.data[0]
+    rows = db.select("duty_logs", columns=columns, filters=filters)
+    if rows:
+        return rows[0]
     return None
 
 
-def save_log(data: dict) -> dict:
-    """일지 저장 (작성중 상태)"""
-    # 기존 일지 확인
-    existing_log = get_log_by_date(data["log_date"], data["factory"], data.get("duty_type"))
+def get_duty_holders(log_date: str, duty_type: str) -> dict:
+    """일지 근무의 실제 당직자 → {역할: 유효 명단 행 (employee: 직원 요약 포함)}"""
+    from services import assignment_service
 
-    if existing_log:
-        # 수정
-        log_id = existing_log["id"]
-        return db.update("duty_logs", log_id, data)
-    else:
-        # 신규 저장
-        data["approval_status"] = "작성중"
-        return db.insert("duty_logs", data)
+    return {row["duty_role"]: row for row in assignment_service.get_duty_holders(log_date, duty_type)}
+
+
+def save_log(data: dict) -> dict:
+    """
+    일지 저장 - (log_date, factory, duty_type) upsert 1회 → 저장된 행
+    - 승인 상태는 저장으로 바꾸지 않음 (신규: 기본값 작성중, 기존: 승인/승인요청 등 유지)
+    - 총당직/부당직 키가 없으면 유효 명단의 실제 당직자로 기록
+    """
+    data = {k: v for k, v in data.items() if k not in ("id", "approval_status")}
+    missing = [f for f in ("main_duty_id", "sub_duty_id") if f not in data]
+    if data.get("duty_type") and missing:
+        holders = get_duty_holders(data["log_date"], data["duty_type"])
+        for role, field in (("총당직", "main_duty_id"), ("부당직", "sub_duty_id")):
+            if field in missing and role in holders:
+                data[field] = holders[role]["employee_id"]
+    data["updated_at"] = datetime.now().isoformat()
+    rows = db.upsert("duty_logs", data, on_conflict=LOG_KEY)
+    return rows[0] if rows else None
 
 
 def request_approval(log_id: str) -> dict:
@@ -48,7 +57,6 @@ def request_approval(log_id: str) -> dict:
 
 def approve_log(log_id: str) -> dict:
     """승인 (승인요청 → 승인)"""
-    from datetime import datetime
     return db.update("duty_logs", log_id, {
         "approval_status": "승인",
         "approved_at": datetime.now().isoformat(),
@@ -4,8 +4,9 @@
 - 운영 환경: n8n Webhook 호출로 메일 발송
 """
 import logging
-from datetime import datetime
+from datetime import date, datetime
 from config import APP_ENV, N8N_WEBHOOK_URL
+from services import duty_calendar
 
 logger = logging.getLogger(__name__)
 
@@ -37,13 +38,49 @@ def send_notification(recipients: list, subject: str, body: str) -> dict:
 def send_assignment_notification(month: str, notification_type: str) -> dict:
     """
     당직 발령 메일 발송
+    - month: 'YYYY-MM' (본문에 당직 달력 요약 포함)
     - notification_type: '예정자' (20일) | '확정자' (25일) | '리마인더' (D-5)
     """
     # TODO: Phase 6에서 구현
+    body = f"{month} 당직발령 {notification_type} 안내 메일입니다."
+    try:
+        year, mon = (int(part) for part in month.split("-")[:2])
+        body += "\n" + duty_calendar.describe_month(year, mon)
+    except ValueError:
+        pass  # 형식이 다른 month는 요약 생략
     return send_notification(
         recipients=["test@example.com"],
         subject=f"{month} 당직발령 {notification_type} 안내",
-        body=f"{month} 당직발령 {notification_type} 안내 메일입니다.",
+        body=body,
+    )
+
+
+def send_duty_reminder(duty_date: date, recipients: list = None) -> dict:
+    """
+    당직 리마인더 (D-5) - 해당 일자 근무와 근무 시간, 실제 당직자 안내
+    - recipients 미지정: 유효 명단(변경 반영)의 해당 일자 당직자 사번
+    """
+    from services import assignment_service
+
+    info = duty_calendar.day_info(duty_date)
+    shifts = ", ".join(f"{s['label']} {s['start_time']}~{s['end_time']}" for s in info["shifts"])
+    title = f"{info['duty_date']}({info['day_of_week']}) {info['day_category']}"
+    if info["holiday_name"]:
+        title += f" · {info['holiday_name']}"
+    holders = assignment_service.get_duty_holders(
+        info["duty_date"], columns=f"duty_type, duty_role, {assignment_service.effective_employee_embed('employee_no, name')}"
+    )
+    body = f"{title}\n근무: {shifts}"
+    if holders:
+        body += "\n당직자: " + ", ".join(
+            f"{h['duty_type']} {h['duty_role']} {(h.get('employee') or {}).get('name', '-')}" for h in holders
+        )
+    if recipients is None:
+        recipients = sorted({(h.get("employee") or {}).get("employee_no") for h in holders} - {None})
+    return send_notification(
+        recipients=recipients,
+        subject=f"{info['duty_date']} 당직 리마인더",
+        body=body,
     )
 
 
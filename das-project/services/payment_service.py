@@ -2,131 +2,480 @@
 당직비 지급 서비스
 - 당직비 계산/집계
 - 사업부별 소계/합계
+- 실제 당직자 기준 계산: 유효 명단(duty_roster_effective)에서 변경이 반영된 당직자 조회
+- 월별 직원 당직비 스냅샷(duty_payments) 저장: (payment_month, employee_id) upsert
+  · 발령/변경 쓰기 시 대상 월/직원만 대기 등록 (services.db 쓰기 리스너, register_listeners())
+  · 화면/Excel 조회 시 대기분을 재계산한 뒤 저장된 스냅샷을 조회
+- 월 보고서(PaymentReport): 명세/사업부별 소계/공장별 집계/Excel을 (연, 월, 데이터 버전)별 1회 계산해 공유
 - Excel 다운로드 데이터 생성
 """
-from services import db
-from config import DUTY_PAYMENT_RATES
+import logging
+import threading
+import time
+from datetime import date, datetime, timedelta
 
+import pandas as pd
 
-def calculate_monthly_payments(year: int, month: int) -> list:
-    """월별 당직비 계산"""
+from services import db, duty_calendar
+from config import DUTY_PAYMENT_RATES, WORK_HOURS, PAYMENT_AUTO_REFRESH, DB_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+# 당직비 명세/Excel에 표시되는 직원 필드
+PAYMENT_EMPLOYEE_COLUMNS = "employee_no, name, department, position, business_unit, factory, bank_account"
+
+
+# 지급 대상 발령 상태 (예정은 제외, 변경은 유효 명단의 대체 근무자에게 지급)
+PAID_STATUSES = ("확정", "변경", "완료")
+DEFAULT_RATE = 40000
+
+
+def _fallback_rate_key(day_category: str, duty_type: str) -> str:
+    return f"{'holiday' if day_category == '휴무일' else 'weekday'}_{'day' if duty_type == '주간' else 'night'}"
+
+
+# (구분, 근무) → 당직비: 달력에 없는 근무(과거 데이터 등)에 적용
+FALLBACK_RATES = {
+    (category, duty_type): DUTY_PAYMENT_RATES.get(_fallback_rate_key(category, duty_type), DEFAULT_RATE)
+    for category in ("휴무일", "평일") for duty_type in ("주간", "야간")
+}
+# WORK_HOURS 키 → 당직비 (당직 달력 근무 기준)
+HOURS_RATES = {key: DUTY_PAYMENT_RATES.get(h["payment"], DEFAULT_RATE) for key, h in WORK_HOURS.items()}
+
+
+def duty_rate(duty_date: str, duty_type: str, day_category: str) -> int:
+    """
+    발령 1건의 당직비
+    - 당직 달력의 근무(토요일 패턴 포함) → WORK_HOURS의 payment 기준
+    - 달력에 없는 근무(과거 데이터 등)는 저장된 구분/근무로 판정
+    """
+    shift = duty_calendar.shift(date.fromisoformat(duty_date), duty_type)
+    if shift is not None:
+        return HOURS_RATES[shift["hours_key"]]
+    return FALLBACK_RATES.get((day_category, duty_type), DEFAULT_RATE)
+
+
+# ── 컬럼 기반 계산 엔진 ──
+
+def _rate_table(start: date, end: date) -> dict:
+    """기간(end 미포함)의 duty_date+duty_type → 당직비 조회표 (당직 달력 기준)"""
+    return {
+        s["duty_date"] + s["duty_type"]: HOURS_RATES[s["hours_key"]]
+        for s in duty_calendar.shifts(start, end - timedelta(days=1))
+    }
+
+
+def _employee_frame(roster: list) -> pd.DataFrame:
+    """유효 명단 행에 임베딩된 직원 정보 → 직원 id 인덱스 DataFrame (중복 제거)"""
+    employees = {}
+    for row in roster:
+        emp_id = row.get("employee_id")
+        if emp_id and emp_id not in employees:
+            employees[emp_id] = row.get("employee") or {}
+    frame = pd.DataFrame.from_dict(employees, orient="index")
+    for column in ("business_unit", "factory"):
+        if column not in frame:
+            frame[column] = None
+    frame[["business_unit", "factory"]] = frame[["business_unit", "factory"]].fillna("미분류")
+    frame.index.name = "employee_id"
+    return frame
+
+
+def payment_frame(roster: list, start: date, end: date) -> pd.DataFrame:
+    """
+    유효 명단 행(발령 x 역할 1행, 실제 당직자) → 지급 행 DataFrame
+    컬럼: payment_month, duty_date, duty_type, day_category, duty_role, employee_id, rate
+    """
+    columns = ["duty_date", "duty_type", "day_category", "status", "duty_role", "employee_id"]
+    frame = pd.DataFrame(roster, columns=columns)
+    long = frame[frame["status"].isin(PAID_STATUSES) & frame["employee_id"].notna()].drop(columns="status")
+
+    # 달력 조회표로 당직비 매핑, 달력에 없는 근무는 (구분, 근무) 조회표
+    fallback = {category + duty_type: rate for (category, duty_type), rate in FALLBACK_RATES.items()}
+    rates = (long["duty_date"] + long["duty_type"]).map(_rate_table(start, end))
+    rates = rates.fillna((long["day_category"] + long["duty_type"]).map(fallback))
+    long["rate"] = rates.fillna(DEFAULT_RATE).astype("int64")
+    long["payment_month"] = long["duty_date"].str.slice(0, 7)
+    return long.reset_index(drop=True)
+
+
+def aggregate_payments(frame: pd.DataFrame, employees: pd.DataFrame) -> dict:
+    """
+    지급 행 → 집계 (직원x월 그룹 집계 1회 후 상위 단위로 합산)
+    반환 DataFrame: employee_month, employee, business_unit, factory, month
+    - duty_count: 당직 횟수, amount: 금액, employees: 인원
+    """
+    employee_month = (
+        frame.groupby(["payment_month", "employee_id"], sort=True)["rate"]
+        .agg(duty_count="size", amount="sum").reset_index()
+    )
+    employee = employee_month.groupby("employee_id")[["duty_count", "amount"]].sum()
+    employee = employee.join(employees, how="left")
+    employee[["business_unit", "factory"]] = employee[["business_unit", "factory"]].fillna("미분류")
+
+    def rollup(by: str) -> pd.DataFrame:
+        grouped = employee.groupby(by, sort=True)
+        return grouped[["duty_count", "amount"]].sum().assign(employees=grouped.size())
+
+    month = employee_month.groupby("payment_month")
+    return {
+        "employee_month": employee_month,
+        "employee": employee.reset_index(),
+        "business_unit": rollup("business_unit"),
+        "factory": rollup("factory"),
+        "month": month[["duty_count", "amount"]].sum().assign(employees=month["employee_id"].nunique()),
+    }
+
+
+def _load_roster(start: date, end: date, employee_ids=None) -> list:
+    """기간 유효 명단 조회 (지급 대상 상태, 계산 필드 + 직원 정보만, employee_ids: 해당 직원이 실제 당직자인 행만)"""
     from services import assignment_service
 
-    # 해당 월의 모든 발령 조회
-    assignments = assignment_service.get_assignments_by_month(year, month)
-
-    # 직원별 당직 횟수 및 금액 계산
-    employee_payments = {}
-
-    for asmt in assignments:
-        if asmt["status"] not in ["확정", "완료"]:
-            continue  # 예정/변경 상태는 제외
-
-        # 당직비 기준 결정
-        key = f"{asmt['day_category'].replace('무일', '')}_{asmt['duty_type'].replace('간', '')}"
-        # "휴무일_주" 또는 "평일_야"
-        if asmt['day_category'] == "휴무일" and asmt['duty_type'] == "주간":
-            rate = DUTY_PAYMENT_RATES.get("holiday_day", 50000)
-        elif asmt['day_category'] == "휴무일" and asmt['duty_type'] == "야간":
-            rate = DUTY_PAYMENT_RATES.get("holiday_night", 60000)
-        elif asmt['day_category'] == "평일" and asmt['duty_type'] == "야간":
-            rate = DUTY_PAYMENT_RATES.get("weekday_night", 40000)
-        else:
-            rate = 40000  # 기본값
-
-        # 총당직자 카운트
-        main_id = asmt.get("main_duty_id")
-        if main_id:
-            if main_id not in employee_payments:
-                employee_payments[main_id] = {"count": 0, "amount": 0, "employee": asmt.get("main_duty")}
-            employee_payments[main_id]["count"] += 1
-            employee_payments[main_id]["amount"] += rate
-
-        # 부당직자 카운트
-        sub_id = asmt.get("sub_duty_id")
-        if sub_id:
-            if sub_id not in employee_payments:
-                employee_payments[sub_id] = {"count": 0, "amount": 0, "employee": asmt.get("sub_duty")}
-            employee_payments[sub_id]["count"] += 1
-            employee_payments[sub_id]["amount"] += rate
-
-    # 리스트로 변환
-    result = []
-    for emp_id, data in employee_payments.items():
-        result.append({
-            "employee_id": emp_id,
-            "employee": data["employee"],
-            "duty_count": data["count"],
-            "amount": data["amount"],
+    return assignment_service.get_effective_roster(
+        start.isoformat(), end.isoformat(), employee_ids=employee_ids, statuses=PAID_STATUSES, columns=(
+            "duty_date, duty_type, day_category, status, duty_role, employee_id, "
+            f"{assignment_service.effective_employee_embed(PAYMENT_EMPLOYEE_COLUMNS)}"
+        ))
+
+
+def calculate_payments(start: date, end: date, employee_ids=None) -> dict:
+    """
+    기간(start 포함, end 미포함) 당직비 계산 - 분기/연간 정산도 조회 1회 + 집계 1회
+    - employee_ids: 지정 시 해당 직원이 실제 당직자인 행만 조회
+    반환: aggregate_payments() 결과
+    """
+    roster = _load_roster(start, end, employee_ids)
+    return aggregate_payments(payment_frame(roster, start, end), _employee_frame(roster))
+
+
+def _as_payment_rows(employee: pd.DataFrame) -> list:
+    """직원별 집계 → 명세 행 [{employee_id, employee, duty_count, amount}]"""
+    fields = [c.strip() for c in PAYMENT_EMPLOYEE_COLUMNS.split(",")]
+    rows = []
+    for rec in employee.sort_values("employee_no" if "employee_no" in employee else "employee_id").to_dict("records"):
+        rows.append({
+            "employee_id": rec["employee_id"],
+            "employee": {f: rec.get(f) for f in fields if f in rec},
+            "duty_count": int(rec["duty_count"]),
+            "amount": int(rec["amount"]),
         })
+    return rows
 
-    return result
+
+def calculate_monthly_payments(year: int, month: int) -> list:
+    """월별 당직비 계산 → 직원별 명세 행"""
+    start, end = duty_calendar.month_bounds(year, month)
+    return _as_payment_rows(calculate_payments(start, end + timedelta(days=1))["employee"])
 
 
-def get_payments_by_month(year: int, month: int) -> list:
+def get_payments_by_month(year: int, month: int, columns: str = "*") -> list:
     """월별 당직비 조회"""
     payment_month = f"{year}-{month:02d}"
-    return db.select_where("duty_payments", "payment_month", payment_month, order_by="employee_id")
+    return db.select_where("duty_payments", "payment_month", payment_month, order_by="employee_id", columns=columns)
+
+
+# ── 스냅샷 (duty_payments) ──
+
+# 스냅샷 명세 projection (calculate_monthly_payments와 같은 행 형태로 변환)
+SNAPSHOT_COLUMNS = f"employee_id, duty_count, amount, payment_status, employee:employees({PAYMENT_EMPLOYEE_COLUMNS})"
+# 직원 id 필터를 쓸 최대 인원 (초과 시 월 전체 조회 후 메모리에서 선택)
+_MAX_FILTER_IDS = 100
+
+
+def _month_bounds(payment_month: str) -> tuple:
+    """'YYYY-MM' → (첫날, 다음달 1일)"""
+    year, month = (int(part) for part in payment_month.split("-"))
+    start, last = duty_calendar.month_bounds(year, month)
+    return start, last + timedelta(days=1)
+
+
+def refresh_payments(payment_month: str, employee_ids=None) -> dict:
+    """
+    월 당직비 스냅샷 재계산 + 저장
+    - employee_ids: 지정 시 해당 직원 행만 재계산 (미지정: 월 전체)
+    - 계산 결과: (payment_month, employee_id) upsert (지급 상태는 유지)
+    - 더 이상 당직비가 없는 미지급 행은 삭제 (지급완료 행은 유지)
+    반환: {"written": upsert 건수, "deleted": 삭제 건수}
+    """
+    start, end = _month_bounds(payment_month)
+    targets = None if employee_ids is None else {e for e in employee_ids if e}
+    if targets is not None and not targets:
+        return {"written": 0, "deleted": 0}
+    filter_ids = targets if targets is not None and len(targets) <= _MAX_FILTER_IDS else None
 
+    employee = calculate_payments(start, end, filter_ids)["employee"]
+    if targets is not None:
+        employee = employee[employee["employee_id"].isin(targets)]
+    now = datetime.now().isoformat()
+    rows = [
+        {"payment_month": payment_month, "employee_id": r["employee_id"], "duty_count": int(r["duty_count"]),
+         "amount": int(r["amount"]), "updated_at": now}
+        for r in employee[["employee_id", "duty_count", "amount"]].to_dict("records")
+    ]
+    if rows:
+        results = db.bulk_upsert("duty_payments", rows, on_conflict="payment_month,employee_id")
+        if not all(r["ok"] for r in results):
+            raise db.BulkWriteError("duty_payments", results)
 
-def get_summary_by_business_unit(year: int, month: int) -> dict:
-    """사업부별 집계"""
-    payments = calculate_monthly_payments(year, month)
+    # 더 이상 당직비가 없는 미지급 행: 대상 직원이면 계산 결과로 판단, 월 전체면 조회 후 id로 조건 삭제
+    filters = [("eq", "payment_month", payment_month), ("eq", "payment_status", "미지급")]
+    computed = {r["employee_id"] for r in rows}
+    if targets is not None:
+        column, stale = "employee_id", sorted(targets - computed)
+    else:
+        column, stale = "id", [
+            r["id"] for r in db.select("duty_payments", columns="id, employee_id", filters=filters, use_cache=False)
+            if r["employee_id"] not in computed
+        ]
+    deleted = 0
+    for i in range(0, len(stale), _MAX_FILTER_IDS):
+        deleted += len(db.delete_matching("duty_payments", filters + [("in_", column, stale[i:i + _MAX_FILTER_IDS])]))
+    return {"written": len(rows), "deleted": deleted}
 
+
+def materialize_month(year: int, month: int) -> dict:
+    """월 전체 당직비 스냅샷 재계산 (관리자 재계산/초기 적재)"""
+    return refresh_payments(f"{year}-{month:02d}")
+
+
+def get_monthly_payments(year: int, month: int, refresh: bool = False) -> list:
+    """
+    월별 당직비 명세 (저장된 스냅샷 조회, 행 형태는 calculate_monthly_payments와 동일)
+    - 갱신 대기 중인 직원은 먼저 재계산, 스냅샷이 없거나 refresh=True이면 월 전체 재계산 후 조회
+    """
+    if refresh:
+        discard_pending(f"{year}-{month:02d}")
+    else:
+        flush_pending(f"{year}-{month:02d}")
+    rows = [] if refresh else get_payments_by_month(year, month, columns=SNAPSHOT_COLUMNS)
+    if not rows:
+        materialize_month(year, month)
+        rows = get_payments_by_month(year, month, columns=SNAPSHOT_COLUMNS)
+    rows.sort(key=lambda r: ((r.get("employee") or {}).get("employee_no") or "", r["employee_id"]))
+    return [
+        {"employee_id": r["employee_id"], "employee": r.get("employee") or {}, "duty_count": r["duty_count"],
+         "amount": r["amount"], "payment_status": r.get("payment_status")}
+        for r in rows
+    ]
+
+
+# ── 스냅샷 갱신 대기 (쓰기 시에는 대상 월/직원만 기록, 조회 시 갱신) ──
+# 대기 목록은 프로세스 메모리: 다른 프로세스의 쓰기/재시작 전 미반영분은 당직비 화면의 재계산으로 반영
+_pending_lock = threading.Lock()
+_pending = {}          # payment_month -> {직원 id} 또는 None(월 전체)
+_pending_changes = {}  # 월을 모르는 변경의 assignment_id -> {직원 id} (flush 시 발령 조회로 월 확인)
+_refresh_errors = {}   # payment_month -> 마지막 갱신 실패 메시지
+_listeners_registered = False
+
+
+def _mark(payment_month: str, employee_ids=None):
+    """월 갱신 대기 등록 (employee_ids=None: 월 전체)"""
+    with _pending_lock:
+        if employee_ids is None or _pending.get(payment_month, set()) is None:
+            _pending[payment_month] = None
+        else:
+            _pending.setdefault(payment_month, set()).update(e for e in employee_ids if e)
+
+
+def _resolve_pending_changes():
+    """월을 모르는 변경 → 발령 조회(_MAX_FILTER_IDS씩)로 월 확인 후 대기 등록"""
+    with _pending_lock:
+        changes = dict(_pending_changes)
+        _pending_changes.clear()
+    ids = sorted(changes)
+    try:
+        assignments = [
+            a for i in range(0, len(ids), _MAX_FILTER_IDS)
+            for a in db.select("duty_assignments", columns="id, duty_date, main_duty_id, sub_duty_id",
+                               filters=[("in_", "id", ids[i:i + _MAX_FILTER_IDS])], use_cache=False)
+        ]
+    except Exception:
+        with _pending_lock:
+            for assignment_id, employee_ids in changes.items():
+                _pending_changes.setdefault(assignment_id, set()).update(employee_ids)
+        raise
+    for a in assignments:
+        _mark(a["duty_date"][:7], {*changes[a["id"]], a.get("main_duty_id"), a.get("sub_duty_id")})
+
+
+def flush_pending(payment_month: str = None) -> dict:
+    """
+    대기 중인 스냅샷 갱신 실행 (payment_month 미지정: 전체 월)
+    - 실패한 월은 다시 대기 + refresh_errors()에 기록 (다음 조회 시 재시도)
+    반환: {payment_month: refresh_payments 결과}
+    """
+    if _pending_changes:
+        try:
+            _resolve_pending_changes()
+            _refresh_errors.pop("*", None)
+        except Exception as e:
+            logger.warning(f"[당직비 스냅샷] 변경 발령 조회 실패: {e}")
+            _refresh_errors["*"] = str(e)
+    with _pending_lock:
+        months = [m for m in _pending if payment_month is None or m == payment_month]
+        pending = {m: _pending.pop(m) for m in months}
+    results = {}
+    for month, employee_ids in pending.items():
+        try:
+            results[month] = refresh_payments(month, employee_ids)
+            _refresh_errors.pop(month, None)
+        except Exception as e:
+            logger.warning(f"[당직비 스냅샷] {month} 갱신 실패: {e}")
+            _refresh_errors[month] = str(e)
+            _mark(month, employee_ids)
+    return results
+
+
+def discard_pending(payment_month: str):
+    """월 전체 재계산 전 대기 목록 비우기"""
+    with _pending_lock:
+        _pending.pop(payment_month, None)
+    _refresh_errors.pop(payment_month, None)
+
+
+def refresh_errors() -> dict:
+    """스냅샷 갱신 실패 {payment_month 또는 "*": 오류 메시지} (당직비 화면 경고 표시용)"""
+    return dict(_refresh_errors)
+
+
+def _reset_pending():
+    with _pending_lock:
+        _pending.clear()
+        _pending_changes.clear()
+    _refresh_errors.clear()
+
+
+def _on_assignment_write(operation: str, rows: list):
+    """
+    발령 쓰기 → 해당 월 갱신 대기 (요청 없음)
+    - 신규 발령은 편성 원본만 대상, 수정/삭제는 변경 반영된 당직자를 모르므로 월 전체
+    - 변경 RPC의 상태 갱신(change)은 _on_change_write에서 함께 처리
+    """
+    if operation == "reset":
+        _reset_pending()
+        return
+    if operation == "change":
+        return
+    for row in rows or []:
+        if row.get("duty_date"):
+            employee_ids = {row.get("main_duty_id"), row.get("sub_duty_id")} if operation == "insert" else None
+            _mark(row["duty_date"][:7], employee_ids)
+
+
+def _on_change_write(operation: str, rows: list):
+    """
+    변경 등록/삭제 → 해당 월 갱신 대기 (요청 없음)
+    - 대상: 변경 전/후 직원 + 편성 원본 (발령 상태 예정 → 변경으로 지급 대상이 바뀜)
+    - 월은 변경 행의 assignment 임베딩 사용 (없으면 flush 시 조회)
+    """
+    if operation == "reset" or not rows:
+        return
+    for row in rows:
+        employee_ids = {row.get("original_employee_id"), row.get("new_employee_id")}
+        asmt = row.get("assignment")
+        if asmt and asmt.get("duty_date"):
+            _mark(asmt["duty_date"][:7], {*employee_ids, asmt.get("main_duty_id"), asmt.get("sub_duty_id")})
+        elif row.get("assignment_id"):
+            with _pending_lock:
+                _pending_changes.setdefault(row["assignment_id"], set()).update(e for e in employee_ids if e)
+
+
+def register_listeners():
+    """발령/변경 쓰기 리스너 등록 (PAYMENT_AUTO_REFRESH, 중복 호출 무시) - 앱/페이지 시작 시 호출"""
+    global _listeners_registered
+    if not PAYMENT_AUTO_REFRESH or _listeners_registered:
+        return
+    db.add_write_listener("duty_assignments", _on_assignment_write)
+    db.add_write_listener("duty_changes", _on_change_write)
+    _listeners_registered = True
+
+
+# ── 월 보고서 (명세/사업부별 소계/공장별 집계 공유) ──
+
+def _summarize(payments: list, field: str) -> dict:
+    """명세 행 → {그룹: {count, amount, employees}} + "전체" (직원 정보 없는 행은 제외)"""
     summary = {}
     total = {"count": 0, "amount": 0, "employees": 0}
-
     for payment in payments:
-        emp = payment.get("employee", {})
+        emp = payment.get("employee") or {}
         if not emp:
             continue
+        group = summary.setdefault(emp.get(field) or "미분류", {"count": 0, "amount": 0, "employees": 0})
+        for bucket in (group, total):
+            bucket["count"] += payment["duty_count"]
+            bucket["amount"] += payment["amount"]
+            bucket["employees"] += 1
+    summary["전체"] = total
+    return summary
 
-        bu = emp.get("business_unit", "미분류")
 
-        if bu not in summary:
-            summary[bu] = {"count": 0, "amount": 0, "employees": 0}
+class PaymentReport:
+    """
+    월 당직비 보고서 - 화면 명세/사업부별 소계/공장별(창원1/2) 집계/Excel이 같은 계산 결과를 공유
+    (get_report()로 (연, 월, 데이터 버전)별 1회 생성)
+    """
 
-        summary[bu]["count"] += payment["duty_count"]
-        summary[bu]["amount"] += payment["amount"]
-        summary[bu]["employees"] += 1
+    def __init__(self, year: int, month: int, payments: list):
+        self.year = year
+        self.month = month
+        self.payments = payments
+        self.business_units = _summarize(payments, "business_unit")
+        self.factories = _summarize(payments, "factory")
+        self._excel = None
 
-        total["count"] += payment["duty_count"]
-        total["amount"] += payment["amount"]
-        total["employees"] += 1
+    @property
+    def total(self) -> dict:
+        return self.business_units["전체"]
 
-    summary["전체"] = total
-    return summary
+    def to_excel(self) -> bytes:
+        """Excel 파일 (요약 + 월 시트, 최초 1회 생성 후 재사용)"""
+        if self._excel is None:
+            from io import BytesIO
+            from services import export_service
 
+            output = BytesIO()
+            export_service.write_payment_workbook(output, [(f"{self.year}-{self.month:02d}", self.payments)])
+            self._excel = output.getvalue()
+        return self._excel
 
-def generate_excel_data(year: int, month: int) -> bytes:
-    """Excel 다운로드용 데이터 생성"""
-    import pandas as pd
-    from io import BytesIO
 
-    payments = calculate_monthly_payments(year, month)
+# 보고서가 의존하는 테이블 (발령 변경은 스냅샷 갱신으로 duty_payments 버전에 반영됨)
+REPORT_TABLES = ("duty_payments", "employees")
+_REPORT_MAX_ENTRIES = 24
+_report_lock = threading.Lock()
+_reports = {}  # (year, month) -> (데이터 버전, 생성 시각, PaymentReport)
 
-    # DataFrame 생성
-    data = []
-    for payment in payments:
-        emp = payment.get("employee", {})
-        data.append({
-            "사번": emp.get("employee_no", "-"),
-            "성명": emp.get("name", "-"),
-            "소속": emp.get("department", "-"),
-            "직위": emp.get("position", "-"),
-            "사업부": emp.get("business_unit", "-"),
-            "공장": emp.get("factory", "-"),
-            "당직 횟수": payment["duty_count"],
-            "당직비": payment["amount"],
-            "계좌번호": emp.get("bank_account", "-"),
-        })
 
-    df = pd.DataFrame(data)
+def get_report(year: int, month: int, refresh: bool = False) -> PaymentReport:
+    """
+    월 당직비 보고서 (같은 데이터 버전이면 재사용, 다른 프로세스 변경 대비 DB_CACHE_TTL 경과 시 재생성)
+    - refresh=True: 스냅샷 재계산 후 생성
+    """
+    key = (year, month)
+    if not refresh:
+        flush_pending(f"{year}-{month:02d}")  # 갱신되면 duty_payments 버전이 바뀌어 새로 생성
+    with _report_lock:
+        entry = _reports.get(key)
+    if (not refresh and entry is not None and entry[0] == db.data_version(*REPORT_TABLES)
+            and time.monotonic() - entry[1] <= DB_CACHE_TTL):
+        return entry[2]
 
-    # Excel로 변환
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, sheet_name=f"{year}-{month:02d} 당직비", index=False)
+    report = PaymentReport(year, month, get_monthly_payments(year, month, refresh=refresh))
+    with _report_lock:
+        _reports.pop(key, None)
+        _reports[key] = (db.data_version(*REPORT_TABLES), time.monotonic(), report)
+        while len(_reports) > _REPORT_MAX_ENTRIES:
+            _reports.pop(next(iter(_reports)))
+    return report
 
-    output.seek(0)
-    return output.getvalue()
+
+def get_summary_by_business_unit(year: int, month: int, payments: list = None) -> dict:
+    """사업부별 집계 (payments: 이미 계산한 결과가 있으면 재사용, 없으면 월 보고서 공유)"""
+    if payments is None:
+        return get_report(year, month).business_units
+    return _summarize(payments, "business_unit")
+
+
+def generate_excel_data(year: int, month: int) -> bytes:
+    """Excel 다운로드용 데이터 생성 (월 보고서 공유)"""
+    return get_report(year, month).to_excel()
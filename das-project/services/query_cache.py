@@ -0,0 +1,94 @@
+"""
+조회 결과 캐시 (read-through)
+- 키: (연산, 테이블, 컬럼 projection, 필터, 정렬, limit)
+- TTL 만료 + LRU 크기 제한
+- 테이블 단위 무효화: 쓰기 발생 시 해당 테이블(임베딩 포함)을 참조하는 항목 삭제
+"""
+import copy
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# select 문자열에서 임베딩 테이블 추출: "alias:table!hint(...)" / "table(...)"
+_EMBED_PATTERN = re.compile(r"(?:^|[,(])\s*(?:\w+\s*:\s*)?(\w+)(?:![\w!]+)?\s*\(")
+
+
+def tables_in_select(table: str, columns: str) -> set:
+    """기준 테이블 + select 문자열에 임베딩된 테이블 목록"""
+    return {table, *_EMBED_PATTERN.findall(columns or "")}
+
+
+class QueryCache:
+    """TTL/LRU 조회 캐시 (스레드 안전, 프로세스 공용)"""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (만료시각, 테이블 집합, 값)
+        self._by_table = {}             # table -> {key}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key) -> tuple:
+        """(적중 여부, 값) 반환. 반환 값은 복사본이므로 호출 측에서 수정해도 안전"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self._stats["misses"] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            value = entry[2]
+        return True, copy.deepcopy(value)
+
+    def set(self, key, tables: set, value):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, tables, copy.deepcopy(value))
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, table: str) -> int:
+        """테이블을 참조하는 모든 항목 삭제, 삭제 건수 반환"""
+        with self._lock:
+            keys = self._by_table.pop(table, set())
+            for key in list(keys):
+                self._remove(key)
+            self._stats["invalidations"] += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+            for key in self._stats:
+                self._stats[key] = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self._stats["hits"] + self._stats["misses"]
+            return dict(
+                self._stats,
+                entries=len(self._entries),
+                hit_rate=round(self._stats["hits"] / total, 3) if total else 0.0,
+            )
+
+    def _remove(self, key):
+        """항목 삭제 (호출 측에서 _lock 보유)"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for table in entry[1]:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
@@ -0,0 +1,166 @@
+"""
+당직 명단 일괄 생성 서비스
+- Layer 2: 비즈니스 로직
+- 월/기간 단위로 모든 총당직/부당직 슬롯을 메모리에서 한 번에 배정 (슬롯: services/duty_calendar.py)
+- auto_assign_next와 같은 LAST 사번 순번 규칙 (대상자 풀에서 사번순 순환)
+- 조회: 대상자 풀(공용, services/eligibility.py) + 순번 포인터 1회 → 쓰기: bulk_upsert 1회
+- mode="fair": 순번 대신 공정 배정 (services/roster_solver.py, 최근 이력 1회 조회)
+- 중복/휴식 부족 검사: 기존 발령 + 이번 배정을 중복 검사 인덱스(services/conflict_index.py)로 확인
+"""
+from datetime import date, timedelta
+
+from config import ROSTER_FAIRNESS_WINDOW_DAYS
+from services import assignment_service, conflict_index, db, duty_calendar, eligibility
+from services.roster_solver import RosterSolver
+
+ROSTER_MODES = ("rotation", "fair")
+
+
+def load_pointers() -> dict:
+    """(역할, 구분)별 LAST 사번 (이력이 없으면 None) - 순번 포인터 1회 조회"""
+    return {
+        key: employee["employee_no"] if employee else None
+        for key, employee in assignment_service.get_rotation_pointers().items()
+    }
+
+
+def build_slots(start: date, end: date, status: str = "예정") -> list:
+    """기간(양 끝 포함)의 빈 슬롯 행 (배정자 없음, 공휴일/토요일 패턴은 당직 달력 기준)"""
+    return [
+        {
+            "duty_date": s["duty_date"],
+            "day_of_week": s["day_of_week"],
+            "duty_type": s["duty_type"],
+            "day_category": s["day_category"],
+            "status": status,
+        }
+        for s in duty_calendar.shifts(start, end)
+    ]
+
+
+def load_history(start: date, end: date) -> list:
+    """공정 배정 부하 계산용 발령 이력 (start 이전 ROSTER_FAIRNESS_WINDOW_DAYS일 ~ end) 1회 조회"""
+    return db.select(
+        "duty_assignments",
+        columns="duty_date, duty_type, day_category, main_duty_id, sub_duty_id",
+        filters=[
+            ("gte", "duty_date", (start - timedelta(days=ROSTER_FAIRNESS_WINDOW_DAYS)).isoformat()),
+            ("lte", "duty_date", end.isoformat()),
+        ],
+    )
+
+
+def plan_roster(start: date, end: date, pools: eligibility.EligibilityPools, pointers: dict,
+                status: str = "예정", conflicts: conflict_index.ConflictIndex = None, existing=None) -> list:
+    """
+    기간(양 끝 포함)의 발령 행 계산 (DB 접근 없음)
+    - pools: 대상자 풀, pointers: load_pointers() 결과
+    - conflicts: 중복 검사 인덱스 (scratch 권장) - 지정 시 겹치거나 휴식이 부족한 순번은 건너뛰고
+      다음 순번 직원 배정, 배정 결과를 인덱스에 기록
+    - existing: 유지할 기존 발령 (일자, 근무) - 순번을 넘기지 않고 건너뜀 (plan_fair_roster와 동일)
+      미지정 시 conflicts에 발령이 있는 슬롯 (덮어쓰기는 빈 집합 지정)
+    - 반환 행은 실제로 저장할 슬롯만, duty_assignments에 바로 쓸 수 있는 형태 (main_duty_id/sub_duty_id 포함)
+    """
+    cursors = {}
+    for key, pool in pools.items():
+        if not pool:
+            raise ValueError(f"{key[1]} {key[0]} 대상 직원이 없습니다.")
+        cursors[key] = pool.index_after(pointers.get(key))
+
+    def take(role: str, slot: dict) -> dict:
+        pool, i = pools.pool(role, slot["day_category"]), cursors[(role, slot["day_category"])]
+        if conflicts is not None:
+            key = (slot["duty_date"], slot["duty_type"], role)
+            for offset in range(len(pool)):
+                if conflicts.is_free(pool.at(i + offset)["id"], slot["duty_date"], slot["duty_type"], ignore=[key]):
+                    break
+            else:
+                raise ValueError(f"{slot['duty_date']} {slot['duty_type']} {slot['day_category']} {role}: "
+                                 f"중복/휴식 부족 없이 배정 가능한 대상 직원이 없습니다.")
+            i += offset
+            conflicts.assign(key, pool.at(i)["id"])
+        cursors[(role, slot["day_category"])] = i + 1
+        return pool.at(i)
+
+    if existing is None:
+        existing = set() if conflicts is None else existing_slots(start, end, conflicts)
+    rows = []
+    for slot in build_slots(start, end, status):
+        if (slot["duty_date"], slot["duty_type"]) in existing:
+            continue
+        slot["main_duty_id"] = take("총당직", slot)["id"]
+        slot["sub_duty_id"] = take("부당직", slot)["id"]
+        rows.append(slot)
+    return rows
+
+
+def plan_fair_roster(start: date, end: date, pools: eligibility.EligibilityPools, history: list,
+                     status: str = "예정", overwrite: bool = False, **solver_options) -> list:
+    """
+    공정 배정으로 기간(양 끝 포함)의 발령 행 계산 (DB 접근 없음)
+    - history: load_history() 결과 (기간 이전 이력은 부하/간격에 반영)
+    - overwrite=False: 기간 안의 기존 발령은 그대로 두고 부하에 포함, 빈 슬롯만 배정
+    - solver_options: RosterSolver 인자 (min_rest_days, holiday_weight, conflicts)
+    """
+    first = start.isoformat()
+    if overwrite:
+        history = [h for h in history if h["duty_date"] < first]
+    existing = {(h["duty_date"], h["duty_type"]) for h in history if h["duty_date"] >= first}
+    slots = [s for s in build_slots(start, end, status) if (s["duty_date"], s["duty_type"]) not in existing]
+    return RosterSolver(pools, history=history, **solver_options).solve(slots)
+
+
+def existing_slots(start: date, end: date, conflicts: conflict_index.ConflictIndex) -> set:
+    """기간(양 끝 포함) 중 이미 발령이 있는 (일자, 근무) - 중복 검사 인덱스 기준 (추가 조회 없음)"""
+    return {
+        (s["duty_date"], s["duty_type"]) for s in duty_calendar.shifts(start, end)
+        if conflicts.assignment(s["duty_date"], s["duty_type"]) is not None
+    }
+
+
+def roster_conflicts(start: date, end: date, overwrite: bool = False) -> conflict_index.ConflictIndex:
+    """명단 생성용 작업 인덱스 (기존 발령 반영, overwrite=True면 기간 안의 기존 배정은 비움)"""
+    work = conflict_index.get_index(start, end).scratch()
+    if overwrite:
+        for shift in duty_calendar.shifts(start, end):
+            for role in eligibility.DUTY_ROLES:
+                work.assign((shift["duty_date"], shift["duty_type"], role), None)
+    return work
+
+
+def generate_roster(start: date, end: date, status: str = "예정", overwrite: bool = False,
+                    dry_run: bool = False, mode: str = "rotation") -> dict:
+    """
+    기간(양 끝 포함) 당직 명단 생성 + 일괄 저장
+    - overwrite=False: 이미 발령이 있는 (일자, 근무) 슬롯은 유지 (계산/미리보기에서도 제외, 순번을 넘기지 않음)
+    - dry_run=True: 저장하지 않고 계산 결과만 반환
+    - mode: "rotation"(LAST 사번 순번) | "fair"(공정 배정)
+    반환: {"rows": [...], "written": 저장 건수}
+    """
+    if end < start:
+        raise ValueError("종료일이 시작일보다 빠릅니다.")
+    if mode not in ROSTER_MODES:
+        raise ValueError(f"지원하지 않는 배정 방식입니다: {mode}")
+    conflicts = roster_conflicts(start, end, overwrite)
+    if mode == "fair":
+        rows = plan_fair_roster(start, end, eligibility.get_pools(), load_history(start, end),
+                                status=status, overwrite=overwrite, conflicts=conflicts)
+    else:
+        existing = set() if overwrite else existing_slots(start, end, conflicts)
+        rows = plan_roster(start, end, eligibility.get_pools(), load_pointers(), status=status, conflicts=conflicts,
+                           existing=existing)
+    if dry_run or not rows:
+        return {"rows": rows, "written": 0}
+
+    results = db.bulk_upsert(
+        "duty_assignments", rows, on_conflict="duty_date,duty_type", ignore_duplicates=not overwrite,
+    )
+    failed = [r for r in results if not r["ok"]]
+    if failed:
+        raise db.BulkWriteError("duty_assignments", results)
+    return {"rows": rows, "written": len(db.bulk_data(results))}
+
+
+def generate_month(year: int, month: int, **kwargs) -> dict:
+    """월 단위 당직 명단 생성 (인자는 generate_roster와 동일)"""
+    return generate_roster(*duty_calendar.month_bounds(year, month), **kwargs)
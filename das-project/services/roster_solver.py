@@ -0,0 +1,160 @@
+"""
+당직 명단 공정 배정 (선택 모드)
+- Layer 2: 비즈니스 로직 (DB 접근 없음, roster_service에서 사용)
+- 직원별 부하 = 평일 당직 1 + 휴무일 당직 ROSTER_HOLIDAY_WEIGHT (최근 ROSTER_FAIRNESS_WINDOW_DAYS 이력 포함)
+- 슬롯마다 대상자 풀(DUTY_RULES 직급)에서 부하가 가장 낮은 직원 선택
+  (동률: 마지막 당직이 오래된 순 → 사번순)
+- 최소 간격: 같은 직원의 당직 사이 ROSTER_MIN_REST_DAYS일 이상 (같은 날 두 번 배정 불가)
+- 부하를 직원 단위로 맞추므로 공장/사업부별 부담은 대상 인원 비율을 따른다
+- 풀별 힙(지연 무효화)으로 슬롯당 O(log n) → 1년 x 수천 명도 1초 내외
+- conflicts(선택): 중복 검사 인덱스 - 근무 시간 기준 겹침/휴식 부족 직원도 제외하고 배정 결과를 기록
+"""
+import heapq
+from bisect import bisect_left, insort
+from datetime import date
+
+from config import ROSTER_MIN_REST_DAYS, ROSTER_HOLIDAY_WEIGHT
+from services.conflict_index import ConflictIndex
+from services.eligibility import DUTY_ROLES, EligibilityPools
+
+_ROLE_FIELDS = {"총당직": "main_duty_id", "부당직": "sub_duty_id"}
+_NEVER = -(10 ** 9)  # 이력 없는 직원의 마지막 당직일 (가장 오래된 것으로 취급)
+
+
+def duty_weight(day_category: str, holiday_weight: float = ROSTER_HOLIDAY_WEIGHT) -> float:
+    """당직 1건의 부하 (휴무일은 가중치 적용)"""
+    return holiday_weight if day_category == "휴무일" else 1.0
+
+
+class RosterSolver:
+    """
+    대상자 풀 기반 공정 배정기
+
+    사용 예:
+        solver = RosterSolver(pools, history=recent_rows)
+        rows = solver.solve(slots)          # slots: duty_date/duty_type/day_category/... 행
+    """
+
+    def __init__(self, pools: EligibilityPools, history=(), min_rest_days: int = ROSTER_MIN_REST_DAYS,
+                 holiday_weight: float = ROSTER_HOLIDAY_WEIGHT, conflicts: ConflictIndex = None):
+        self.pools = pools
+        self.conflicts = conflicts
+        self.min_rest = max(1, min_rest_days)
+        self.holiday_weight = holiday_weight
+        self.load = {}      # employee_no -> 부하
+        self.dates = {}     # employee_no -> 정렬된 당직일(ordinal) 목록
+        self.version = {}   # employee_no -> 힙 항목 버전
+        self.by_id = {}     # id -> employee_no
+        for _, pool in pools.items():
+            for emp_no, emp in pool.members.items():
+                self.by_id[emp["id"]] = emp_no
+                self.load.setdefault(emp_no, 0.0)
+                self.dates.setdefault(emp_no, [])
+                self.version.setdefault(emp_no, 0)
+        for row in history:
+            self._add_history(row)
+        self.heaps = {}
+        self._membership = {}  # employee_no -> 소속 풀 키 목록
+        for key, pool in pools.items():
+            self.heaps[key] = [self._entry(emp_no) for emp_no in pool.keys]
+            heapq.heapify(self.heaps[key])
+            for emp_no in pool.keys:
+                self._membership.setdefault(emp_no, []).append(key)
+
+    # ── 상태 ──
+
+    def _add_history(self, row: dict):
+        """기존 발령 1건을 부하/간격 상태에 반영 (풀 밖 직원은 무시)"""
+        day = date.fromisoformat(row["duty_date"]).toordinal()
+        for field in _ROLE_FIELDS.values():
+            emp_no = self.by_id.get(row.get(field))
+            if emp_no is not None:
+                self.load[emp_no] += duty_weight(row["day_category"], self.holiday_weight)
+                insort(self.dates[emp_no], day)
+
+    def _entry(self, emp_no: str) -> tuple:
+        dates = self.dates[emp_no]
+        return (self.load[emp_no], dates[-1] if dates else _NEVER, emp_no, self.version[emp_no])
+
+    def _rested(self, emp_no: str, day: int, shift: tuple = None) -> bool:
+        """
+        day 앞뒤 당직과 최소 간격 이상 떨어져 있는지
+        - shift: 슬롯 키 (duty_date, duty_type, 역할) - 중복 검사 인덱스가 있으면 근무 시간 기준으로도 확인
+        """
+        dates = self.dates[emp_no]
+        i = bisect_left(dates, day)
+        if i < len(dates) and dates[i] - day < self.min_rest:
+            return False
+        if i > 0 and day - dates[i - 1] < self.min_rest:
+            return False
+        if self.conflicts is None or shift is None:
+            return True
+        emp_id = self.pools.find(emp_no)["id"]
+        return self.conflicts.is_free(emp_id, shift[0], shift[1], ignore=[shift])
+
+    def _assign(self, emp_no: str, day: int, weight: float):
+        self.load[emp_no] += weight
+        insort(self.dates[emp_no], day)
+        self._touch(emp_no)
+
+    def _touch(self, emp_no: str):
+        """부하/마지막 당직일 변경 → 소속 풀 힙에 새 항목 추가 (기존 항목은 버전으로 무효화)"""
+        self.version[emp_no] += 1
+        entry = self._entry(emp_no)
+        for key in self._membership.get(emp_no, ()):
+            heapq.heappush(self.heaps[key], entry)
+
+    # ── 배정 ──
+
+    def _pick(self, key: tuple, day: int, shift: tuple = None) -> str:
+        """풀 힙에서 간격 조건을 만족하는 최저 부하 직원 (shift: _rested 참고)"""
+        heap = self.heaps[key]
+        skipped = []
+        chosen = None
+        while heap:
+            entry = heapq.heappop(heap)
+            emp_no = entry[2]
+            if entry[3] != self.version[emp_no]:
+                continue  # 지난 항목
+            if self._rested(emp_no, day, shift):
+                chosen = emp_no
+                break
+            skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        if chosen is None:
+            raise ValueError(
+                f"{date.fromordinal(day).isoformat()} {key[1]} {key[0]}: "
+                f"최소 간격({self.min_rest}일)을 만족하는 대상 직원이 없습니다."
+            )
+        return chosen
+
+    def solve(self, slots: list) -> list:
+        """
+        슬롯 목록(일자순)에 총당직/부당직 배정
+        반환: 각 슬롯에 main_duty_id/sub_duty_id를 채운 새 행 목록
+        """
+        for key, pool in self.pools.items():
+            if not pool:
+                raise ValueError(f"{key[1]} {key[0]} 대상 직원이 없습니다.")
+        rows = []
+        for slot in sorted(slots, key=lambda s: s["duty_date"]):
+            day = date.fromisoformat(slot["duty_date"]).toordinal()
+            weight = duty_weight(slot["day_category"], self.holiday_weight)
+            row = dict(slot)
+            for role in DUTY_ROLES:
+                shift = (slot["duty_date"], slot["duty_type"], role)
+                emp_no = self._pick((role, slot["day_category"]), day, shift)
+                self._assign(emp_no, day, weight)
+                row[_ROLE_FIELDS[role]] = self.pools.pool(role, slot["day_category"]).members[emp_no]["id"]
+                if self.conflicts is not None:
+                    self.conflicts.assign(shift, row[_ROLE_FIELDS[role]])
+            rows.append(row)
+        return rows
+
+    def loads(self) -> dict:
+        """직원 id별 부하 (이력 + 배정)"""
+        return {
+            pool.members[emp_no]["id"]: self.load[emp_no]
+            for _, pool in self.pools.items() for emp_no in pool.keys
+        }
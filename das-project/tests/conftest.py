@@ -2,6 +2,11 @@
 pytest 공통 fixture
 - 테스트 DB 세팅, 공통 데이터 준비
 """
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
 import sys
 import os
@@ -37,6 +42,71 @@ def pytest_collection_modifyitems(config, items):
                 item.add_marker(skip_e2e)
 
 
+@pytest.fixture
+def local_db(monkeypatch):
+    """services.db를 인메모리 SQLite(local 백엔드)로 전환"""
+    from services import db
+
+    monkeypatch.setattr(db, "DB_BACKEND", "local")
+    monkeypatch.setattr(db, "LOCAL_DB_PATH", ":memory:")
+    db.close_client()
+    yield db
+    db.close_client()
+
+
+class _FakePostgrestHandler(BaseHTTPRequestHandler):
+    """PostgREST 응답을 흉내내는 최소 HTTP 핸들러"""
+    protocol_version = "HTTP/1.1"
+    delay = 0.0    # 응답 지연 (초) - 동시 실행 테스트용
+
+    requests = []  # (method, path, body) - 테스트에서 요청 형태 확인용
+
+    def do_GET(self):
+        self._respond([{"id": "1", "employee_no": "E1001"}])
+
+    def do_HEAD(self):
+        self._respond(None)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._respond({"params": json.loads(body or b"{}")}, body)
+
+    def _respond(self, data, request_body=b""):
+        time.sleep(self.delay)
+        self.requests.append((self.command, self.path, request_body))
+        body = json.dumps(data).encode() if data is not None else b""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Content-Range", "0-0/1" if body else "*/1")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_supabase(monkeypatch):
+    """로컬 HTTP 서버를 Supabase URL로 사용 (handler.delay로 응답 지연 조절)"""
+    from services import async_db, db
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakePostgrestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(db, "SUPABASE_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(db, "SUPABASE_KEY", "test-key")
+    monkeypatch.setattr(db, "DB_BACKEND", "supabase")
+    monkeypatch.setattr(_FakePostgrestHandler, "delay", 0.0)
+    monkeypatch.setattr(_FakePostgrestHandler, "requests", [])
+    db.close_client()
+    async_db.close()
+    yield server
+    db.close_client()
+    async_db.close()
+    server.shutdown()
+
+
 @pytest.fixture
 def sample_employee():
     """테스트용 직원 데이터"""
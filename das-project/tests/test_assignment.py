@@ -5,7 +5,7 @@
 - 직급별 자동 분류
 """
 import pytest
-from services import assignment_service
+from services import assignment_service, instrumentation
 from config import DUTY_RULES
 
 
@@ -88,3 +88,107 @@ class TestAssignmentServiceIntegrity:
         assert callable(assignment_service.get_last_duty_person)
         assert callable(assignment_service.get_eligible_employees)
         assert callable(assignment_service.auto_assign_next)
+
+
+@pytest.fixture
+def seeded_assignments(local_db, sample_employee, sample_assignment):
+    """총당직/부당직 직원 + 확정 발령 1건"""
+    main = local_db.insert("employees", dict(sample_employee, position="부장", grade=1))[0]
+    sub = local_db.insert("employees", dict(sample_employee, employee_no="E9998", name="부당직자", position="사원", grade=4))[0]
+    assignment = local_db.insert("duty_assignments", dict(
+        sample_assignment, main_duty_id=main["id"], sub_duty_id=sub["id"], status="확정",
+    ))[0]
+    return {"main": main, "sub": sub, "assignment": assignment}
+
+
+class TestColumnProjection:
+    """컬럼 projection 테스트 (로컬 백엔드)"""
+
+    def test_month_view_projection(self, seeded_assignments):
+        columns = f"duty_date, {assignment_service.duty_embed('main_duty', 'name')}"
+        rows = assignment_service.get_assignments_by_month(2025, 3, columns=columns)
+        assert rows == [{"duty_date": "2025-03-15", "main_duty": {"name": "테스트직원"}}]
+
+    def test_month_view_embeds_employees_and_changes(self, seeded_assignments, local_db):
+        local_db.insert("duty_changes", {
+            "assignment_id": seeded_assignments["assignment"]["id"],
+            "original_employee_id": seeded_assignments["sub"]["id"],
+            "new_employee_id": seeded_assignments["main"]["id"],
+            "duty_role": "부당직", "change_reason": "출장",
+        })
+        instrumentation.reset()
+        rows = assignment_service.get_assignments_by_month(2025, 3)
+        assert len(instrumentation.get_records()) == 1
+        assert rows[0]["main_duty"]["employee_no"] == seeded_assignments["main"]["employee_no"]
+        assert rows[0]["sub_duty"]["name"] == "부당직자"
+        assert [(c["duty_role"], c["new_employee"]["name"]) for c in rows[0]["changes"]] == [("부당직", "테스트직원")]
+
+    def test_month_range_is_half_open(self, seeded_assignments, sample_assignment, local_db):
+        local_db.insert("duty_assignments", dict(sample_assignment, duty_date="2025-04-01", day_of_week="화"))
+        march = assignment_service.get_assignments_by_month(2025, 3, columns="duty_date")
+        assert march == [{"duty_date": "2025-03-15"}]
+
+    def test_last_duty_person_embeds_only_requested_role(self, seeded_assignments):
+        person = assignment_service.get_last_duty_person("부당직", "휴무일", columns="employee_no, name")
+        assert person == {"employee_no": "E9998", "name": "부당직자"}
+
+    def test_auto_assign_next_rotates(self, seeded_assignments, sample_employee, local_db):
+        local_db.insert("employees", dict(sample_employee, employee_no="E9997", position="수석", grade=1))
+        nxt = assignment_service.auto_assign_next("총당직", "휴무일", columns="employee_no")
+        assert nxt == {"employee_no": "E9997"}
+
+
+class TestRotationPointers:
+    """순번 포인터 (트리거 유지) 테스트"""
+
+    @pytest.fixture
+    def staff(self, local_db, sample_employee):
+        rows = [dict(sample_employee, employee_no=f"E{i}", name=f"직원{i}", grade=1 if i < 3 else 4) for i in range(6)]
+        return {e["employee_no"]: e["id"] for e in local_db.bulk_upsert("employees", rows)[0]["data"]}
+
+    def _assign(self, db, staff, duty_date, duty_type="주간", status="확정", main="E0", sub="E3"):
+        return db.insert("duty_assignments", {
+            "duty_date": duty_date, "day_of_week": "토", "duty_type": duty_type, "day_category": "휴무일",
+            "main_duty_id": staff[main], "sub_duty_id": staff[sub], "status": status,
+        })[0]
+
+    def _last(self, duty_type="총당직"):
+        person = assignment_service.get_last_duty_person(duty_type, "휴무일", columns="employee_no")
+        return person["employee_no"] if person else None
+
+    def test_pointer_follows_writes(self, local_db, staff):
+        assert self._last() is None
+        first = self._assign(local_db, staff, "2025-03-01", main="E0")
+        later = self._assign(local_db, staff, "2025-03-08", main="E1", sub="E4")
+        assert (self._last(), self._last("부당직")) == ("E1", "E4")
+        self._assign(local_db, staff, "2025-03-15", main="E2", status="예정")
+        assert self._last() == "E1"
+
+        assignment_service.update_assignment(later["id"], {"status": "변경"})
+        assert self._last() == "E0"
+        assignment_service.delete_assignment(first["id"])
+        assert self._last() is None
+
+    def test_night_is_later_than_day(self, local_db, staff):
+        self._assign(local_db, staff, "2025-03-01", duty_type="야간", main="E1")
+        self._assign(local_db, staff, "2025-03-01", duty_type="주간", main="E0")
+        assert self._last() == "E1"
+
+    def test_lookup_is_single_keyed_read(self, local_db, staff):
+
+        self._assign(local_db, staff, "2025-03-01")
+        instrumentation.reset()
+        self._last()
+        assert [(r["table"], r["filters"]) for r in instrumentation.get_records()] == [
+            ("duty_rotation_pointers", [("eq", "duty_role", "총당직"), ("eq", "day_category", "휴무일")]),
+        ]
+
+    def test_rebuild(self, local_db, staff):
+        self._assign(local_db, staff, "2025-03-01", main="E2")
+        local_db.get_client().execute("DELETE FROM duty_rotation_pointers")
+        local_db.invalidate_cache("duty_rotation_pointers")
+        assert self._last() is None
+        rows = assignment_service.rebuild_rotation_pointers()
+        assert len(rows) == 4
+        assert self._last() == "E2"
+        assert assignment_service.get_rotation_pointers()[("부당직", "평일")] is None
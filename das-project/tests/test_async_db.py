@@ -0,0 +1,93 @@
+"""
+비동기 데이터 접근(services.async_db) 테스트
+- 동기 API와 같은 결과
+- 독립 조회 동시 실행 (실행 구간이 겹치는지 확인)
+"""
+import threading
+from datetime import datetime, timedelta
+
+from services import async_db, instrumentation
+
+
+class TestLocalBackend:
+    """local 백엔드: 동기 함수를 워커 스레드에서 실행"""
+
+    def test_matches_sync_api(self, local_db, sample_employee):
+        emp = local_db.insert("employees", sample_employee)[0]
+        results = async_db.run_all({
+            "count": async_db.count("employees"),
+            "rows": async_db.select("employees", columns="employee_no", filters=[("eq", "grade", 2)]),
+            "one": async_db.select_by_id("employees", emp["id"], columns="name"),
+        })
+        assert results == {"count": 1, "rows": [{"employee_no": "E9999"}], "one": {"name": "테스트직원"}}
+
+    def test_return_exceptions_keeps_other_results(self, local_db):
+        results = async_db.run_all({
+            "ok": async_db.count("employees"),
+            "bad": async_db.count("no_such_table"),
+        }, return_exceptions=True)
+        assert results["ok"] == 0
+        assert isinstance(results["bad"], Exception)
+
+    def test_fan_out_is_concurrent(self, local_db, monkeypatch):
+        # 4건이 모두 동시에 실행 중이어야 barrier 통과 (순차 실행이면 BrokenBarrierError)
+        real_count = local_db.count
+        barrier = threading.Barrier(4, timeout=5)
+
+        def overlapping_count(*args):
+            barrier.wait()
+            return real_count(*args)
+
+        monkeypatch.setattr(local_db, "count", overlapping_count)
+        tables = ("employees", "duty_logs", "duty_changes", "duty_payments")
+        results = async_db.run_all({t: async_db.count(t) for t in tables})
+        assert set(results.values()) == {0}
+
+    def test_call_runs_service_functions_concurrently(self, local_db):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def overlapping(value):
+            barrier.wait()
+            return value
+
+        results = async_db.run_all({i: async_db.call(overlapping, i) for i in range(3)})
+        assert results == {0: 0, 1: 1, 2: 2}
+
+
+class TestSupabaseBackend:
+    """supabase 백엔드: 공용 AsyncClient로 직접 요청"""
+
+    def test_select_and_cache(self, fake_supabase):
+        from services import db
+
+        assert async_db.run(async_db.select("employees")) == [{"id": "1", "employee_no": "E1001"}]
+        async_db.run(async_db.select("employees"))
+        assert db.get_cache_stats()["hits"] == 1
+        # 동기 API와 캐시 공유
+        db.select("employees")
+        assert db.get_cache_stats()["hits"] == 2
+
+    def test_bytes_from_content_length(self, fake_supabase):
+        instrumentation.reset()
+        async_db.run(async_db.select("employees", use_cache=False))
+        assert instrumentation.get_records()[-1]["bytes"] == len(b'[{"id": "1", "employee_no": "E1001"}]')
+
+    def test_fan_out_requests_overlap(self, fake_supabase, monkeypatch):
+        monkeypatch.setattr(fake_supabase.RequestHandlerClass, "delay", 0.3)
+        instrumentation.reset()
+        results = async_db.run_all({
+            i: async_db.select("employees", filters=[("eq", "grade", i)]) for i in range(5)
+        })
+        assert len(results) == 5
+        # 마지막 요청이 시작될 때 첫 응답이 아직 오지 않음 (모든 요청 구간이 겹침)
+        spans = [(datetime.fromisoformat(r["ts"]), timedelta(milliseconds=r["duration_ms"]))
+                 for r in instrumentation.get_records()]
+        assert max(start for start, _ in spans) < min(start + duration for start, duration in spans)
+
+    def test_render_context_is_propagated(self, fake_supabase):
+        instrumentation.reset()
+        instrumentation.begin_render("관리자")
+        async_db.run_all({t: async_db.count(t) for t in ("employees", "duty_logs")})
+        assert instrumentation.render_summary()[0]["last_calls"] == 2
+        assert {r["page"] for r in instrumentation.get_records()} == {"관리자"}
+        instrumentation.reset()
@@ -1,7 +1,12 @@
 """
 당직 변경 기능 테스트
 """
+from datetime import date
+
 import pytest
+from postgrest.exceptions import APIError
+
+from services import change_service, conflict_index, eligibility, instrumentation
 
 
 class TestChangeCRUD:
@@ -13,3 +18,178 @@ class TestChangeCRUD:
     def test_create_change_updates_assignment(self):
         """[통합] 변경 시 원본 발령 상태 업데이트"""
         pytest.skip("Phase 3에서 구현")
+
+
+class TestRegisterChange:
+    """변경 등록 RPC (로컬 백엔드)"""
+
+    @pytest.fixture
+    def duty(self, local_db, sample_employee, sample_assignment):
+        main = local_db.insert("employees", dict(sample_employee, grade=1))[0]
+        sub = local_db.insert("employees", dict(sample_employee, employee_no="E9998", grade=4))[0]
+        other = local_db.insert("employees", dict(sample_employee, employee_no="E9997", name="대체자", grade=4))[0]
+        asmt = local_db.insert("duty_assignments", dict(sample_assignment, main_duty_id=main["id"],
+                                                        sub_duty_id=sub["id"], status="확정"))[0]
+        return local_db, asmt, main, sub, other
+
+    def test_single_request(self, duty):
+        db, asmt, main, sub, other = duty
+        # 화면이 이미 적재한 대상자 풀/월 인덱스로 사전 검사 → RPC 1회
+        eligibility.get_pools()
+        conflict_index.get_index(date(2025, 3, 10))
+        instrumentation.reset()
+        change = change_service.register_change(asmt["id"], "부당직", "E9997", "출장", change_date="2025-03-10")
+        assert [(r["table"], r["operation"]) for r in instrumentation.get_records() if not r["cached"]] == [
+            ("das_register_change", "rpc")]  # 당직비 스냅샷은 대기만 (조회 시 갱신)
+        assert (change["original_employee_id"], change["new_employee_id"]) == (sub["id"], other["id"])
+        assert (change["original"]["employee_no"], change["new"]["name"]) == ("E9998", "대체자")
+        assert change["assignment"]["status"] == "변경"
+        assert change["change_date"] == "2025-03-10"
+        # 발령의 편성 원본은 유지
+        stored = db.select_where("duty_assignments", "id", asmt["id"])[0]
+        assert (stored["status"], stored["sub_duty_id"]) == ("변경", sub["id"])
+
+    def test_cold_process_loads_pre_check_data_once(self, duty):
+        db, asmt, main, sub, other = duty
+        eligibility.reset()
+        conflict_index.reset()
+        db.invalidate_cache()
+        instrumentation.reset()
+        change_service.register_change(asmt["id"], "부당직", "E9997", "출장", change_date="2025-03-10")
+        assert [(r["table"], r["operation"]) for r in instrumentation.get_records() if not r["cached"]] == [
+            ("employees", "select"), ("duty_assignments", "select"), ("duty_roster_effective", "select"),
+            ("das_register_change", "rpc"),
+        ]
+        # 이후 변경은 적재된 풀/인덱스로 검사 → RPC만
+        instrumentation.reset()
+        change_service.register_change(asmt["id"], "부당직", "E9998", "교육")
+        assert [r["table"] for r in instrumentation.get_records() if not r["cached"]] == ["das_register_change"]
+
+    def test_chained_change_uses_current_holder(self, duty):
+        db, asmt, main, sub, other = duty
+        change_service.register_change(asmt["id"], "부당직", "E9997", "출장")
+        change = change_service.register_change(asmt["id"], "부당직", "E9998", "교육")
+        assert (change["original_employee_id"], change["new_employee_id"]) == (other["id"], sub["id"])
+
+    def test_stale_original_rejected(self, duty):
+        db, asmt, main, sub, other = duty
+        change_service.register_change(asmt["id"], "부당직", "E9997", "출장")
+        with pytest.raises(APIError):
+            change_service.register_change(asmt["id"], "부당직", "E9999", "교육", original_employee_id=sub["id"])
+        assert len(db.select("duty_changes")) == 1
+
+    @pytest.mark.parametrize("employee_no", ["NOPE", "E9998"])
+    def test_invalid_change_is_rolled_back(self, duty, employee_no):
+        # 없는 사번 / 현재 당직자와 같은 직원 → 변경 이력/발령 상태 모두 그대로
+        db, asmt, main, sub, other = duty
+        with pytest.raises(APIError):
+            change_service.register_change(asmt["id"], "부당직", employee_no, "출장")
+        assert db.select("duty_changes") == []
+        assert db.select_where("duty_assignments", "id", asmt["id"])[0]["status"] == "확정"
+
+    def test_inactive_employee_rejected(self, duty):
+        db, asmt, main, sub, other = duty
+        db.update("employees", other["id"], {"is_active": False})
+        with pytest.raises(APIError):
+            change_service.register_change(asmt["id"], "부당직", "E9997", "출장")
+
+    def test_create_change_by_id_refreshes_cache(self, duty):
+        db, asmt, main, sub, other = duty
+        assert db.select_where("duty_assignments", "id", asmt["id"])[0]["status"] == "확정"  # 캐시 적재
+        change_service.create_change({
+            "assignment_id": asmt["id"], "original_employee_id": main["id"], "new_employee_id": other["id"],
+            "duty_role": "총당직", "change_reason": "기타",
+        })
+        assert db.select_where("duty_assignments", "id", asmt["id"])[0]["status"] == "변경"
+        assert [c["new_employee_id"] for c in change_service.get_changes_by_assignment(asmt["id"])] == [other["id"]]
+
+    def test_change_date_defaults_to_duty_date(self, duty):
+        # 단건/일괄 모두 RPC에서 당직일자 적용
+        db, asmt, main, sub, other = duty
+        single = change_service.register_change(asmt["id"], "부당직", "E9997", "출장")
+        bulk = change_service.apply_bulk_changes([{
+            "assignment_id": asmt["id"], "duty_role": "부당직", "change_reason": "교육",
+            "new_employee_id": sub["id"], "original_employee_id": other["id"], "change_date": None,
+        }])["written"][0]
+        assert single["change_date"] == bulk["change_date"] == asmt["duty_date"]
+
+
+class TestBulkChanges:
+    """일괄 변경 (로컬 백엔드)"""
+
+    @pytest.fixture
+    def month(self, local_db, sample_employee, sample_assignment):
+        staff = {no: local_db.insert("employees", dict(sample_employee, employee_no=no, name=no, grade=grade))[0]
+                 for no, grade in (("M1", 1), ("M2", 2), ("S1", 3), ("S2", 4), ("S3", 4))}
+        local_db.insert("employees", dict(sample_employee, employee_no="R1", grade=4, is_active=False))
+        for day in ("2025-03-15", "2025-03-16"):
+            local_db.insert("duty_assignments", dict(sample_assignment, duty_date=day, main_duty_id=staff["M1"]["id"],
+                                                     sub_duty_id=staff["S1"]["id"], status="확정"))
+        return local_db, staff
+
+    @staticmethod
+    def _row(day="2025-03-15", role="부당직", no="S2", reason="출장", duty_type="주간"):
+        return {"duty_date": day, "duty_type": duty_type, "duty_role": role, "new_employee_no": no,
+                "change_reason": reason, "change_date": None}
+
+    def test_validation_report(self, month):
+        db, staff = month
+        plan = change_service.plan_bulk_changes([
+            self._row(),                                  # 정상
+            self._row(no="M2"),                           # 부당직 대상 직급 아님
+            self._row(no="R1"),                           # 퇴직자
+            self._row(no="X9"),                           # 없는 사번
+            self._row(day="2025-03-17"),                  # 발령 없음
+            self._row(reason="휴가"),                      # 사유 목록 밖
+            self._row(day="2025.03.16", role="총당직", no="M2"),  # 정상 (일자 형식 허용)
+            self._row(day="2025-03-16", no="M1"),         # 총당직자 (부당직 대상 직급 아님)
+            self._row(no="S2"),                           # 앞 행 적용 후 변경 전/후 동일
+            self._row(no="S3"),                           # 앞 행 적용 후 이어서 변경
+        ])
+        assert [r["ok"] for r in plan["rows"]] == [True, False, False, False, False, False, True, False, False, True]
+        assert plan["rows"][1]["message"] == "휴무일 부당직 대상 직급이 아닙니다 (2급)."
+        assert [r["row"] for r in plan["rows"]][:2] == [2, 3]
+        assert (plan["valid"], plan["invalid"]) == (3, 7)
+        assert [c["original_employee_id"] for c in plan["changes"]] == [
+            staff["S1"]["id"], staff["M1"]["id"], staff["S2"]["id"],
+        ]
+
+    def test_two_reads_and_one_write(self, month):
+        db, staff = month
+        instrumentation.reset()
+        result = change_service.import_changes([self._row(), self._row(day="2025-03-16", no="S3")])
+        assert [r["operation"] for r in instrumentation.get_records() if not r["cached"]][:3] == [
+            "select", "select", "rpc",
+        ]
+        assert len(result["written"]) == 2 and result["failed"] == []
+        assert {a["status"] for a in db.select("duty_assignments")} == {"변경"}
+
+    def test_failed_chunk_is_rolled_back(self, month):
+        db, staff = month
+        plan = change_service.plan_bulk_changes([self._row(), self._row(day="2025-03-16")])
+        change_service.register_change(plan["changes"][1]["assignment_id"], "부당직", "S3", "교육")  # 그 사이 변경
+        result = change_service.apply_bulk_changes(plan["changes"], chunk_size=1)
+        assert len(result["written"]) == 1
+        assert result["failed"][0]["chunk"] == 1 and "1번째 변경" in result["failed"][0]["error"]
+        assert result["failed"][0]["rows"] == [3] and result["skipped"] == []
+        assert len(db.select("duty_changes")) == 2
+        report = change_service.mark_bulk_results(plan["rows"], result)
+        assert [r["ok"] for r in report] == [True, False] and "1번째 변경" in report[1]["message"]
+
+    def test_stops_after_failed_chunk(self, month):
+        # 이어진 변경: 앞 청크가 취소되면 뒤 청크는 기록하지 않음
+        db, staff = month
+        plan = change_service.plan_bulk_changes([self._row(), self._row(no="S3")])
+        change_service.register_change(plan["changes"][0]["assignment_id"], "부당직", "S3", "교육")  # 그 사이 변경
+        result = change_service.apply_bulk_changes(plan["changes"], chunk_size=1)
+        assert (result["written"], result["failed"][0]["rows"], result["skipped"]) == ([], [2], [3])
+        assert len(db.select("duty_changes")) == 1
+
+    def test_read_change_file(self, tmp_path):
+        path = tmp_path / "changes.csv"
+        path.write_bytes(change_service.bulk_change_template())
+        rows = change_service.read_change_file(str(path), path.name)
+        assert rows == [{"duty_date": "2025-03-15", "duty_type": "주간", "duty_role": "부당직",
+                         "new_employee_no": "E0001", "change_reason": "출장", "change_date": None}]
+        with pytest.raises(ValueError):
+            change_service.read_change_file(str(path), "changes.txt")
@@ -0,0 +1,190 @@
+"""
+당직 중복/휴식 부족 검사 테스트
+- 근무 구간 (야간은 다음날 종료), 겹침/휴식 부족 판정
+- scratch 인덱스 (공용 인덱스는 그대로)
+- 발령/변경 쓰기 증분 반영, 변경/발령/자동배정/명단 생성 연동 (로컬 백엔드)
+"""
+import time
+from datetime import date
+
+import pytest
+from services import assignment_service, change_service, conflict_index, instrumentation, roster_service
+from services.conflict_index import ConflictIndex, shift_interval
+from services.eligibility import EligibilityPools
+
+DAY = 24 * 60
+
+
+def _row(aid: str, day: str, duty_type: str, main: str, sub: str) -> dict:
+    return {"id": aid, "duty_date": day, "duty_type": duty_type, "day_category": "휴무일",
+            "main_duty_id": main, "sub_duty_id": sub}
+
+
+class TestConflictIndex:
+    """메모리 인덱스 테스트"""
+
+    def test_shift_interval(self):
+        # 2025-03-14(금) 평일 야간 19:30 ~ 다음날 08:00 / 03-15(3주 토요일) 휴무일 주간 08:00 ~ 20:00
+        start, end = shift_interval("2025-03-14", "야간")
+        assert (start % DAY, end - start) == (19 * 60 + 30, 12 * 60 + 30)
+        start, end = shift_interval("2025-03-15", "주간")
+        assert (start % DAY, end % DAY) == (8 * 60, 20 * 60)
+
+    def test_overlap_and_rest(self):
+        index = ConflictIndex(rest_hours=11)
+        index.set_assignment(_row("a1", "2025-03-14", "야간", "M1", "S1"))
+        # 야간 종료(08:00) 직후 주간 → 휴식 0시간
+        assert index.conflicts("S1", "2025-03-15", "주간") == [("2025-03-14", "야간", "부당직")]
+        # 03-17(월) 야간: 앞 근무와 충분히 떨어짐
+        assert index.is_free("S1", "2025-03-17", "야간")
+        # 같은 슬롯의 다른 역할 = 이중 배정, 자기 슬롯은 ignore
+        key = ("2025-03-14", "야간", "부당직")
+        assert index.conflicts("M1", "2025-03-14", "야간", ignore=[key]) == [("2025-03-14", "야간", "총당직")]
+        assert index.is_free("S1", "2025-03-14", "야간", ignore=[key])
+
+    def test_rest_hours_threshold(self):
+        # 평일 야간 연속: 08:00 종료 → 19:30 시작 = 휴식 11.5시간
+        index = ConflictIndex(rest_hours=11)
+        index.set_assignment(_row("a1", "2025-03-11", "야간", "M1", "S1"))
+        assert index.is_free("S1", "2025-03-12", "야간")
+        assert not index.is_free("S1", "2025-03-12", "야간", rest_hours=12)
+
+    def test_changes_move_shift_to_new_holder(self):
+        index = ConflictIndex()
+        index.set_assignment(_row("a1", "2025-03-15", "주간", "M1", "S1"),
+                             changes=[{"duty_role": "부당직", "new_employee_id": "S2", "seq": 1}])
+        assert index.holder(("2025-03-15", "주간", "부당직")) == "S2"
+        assert index.is_free("S1", "2025-03-15", "주간")
+        index.apply_change({"assignment_id": "a1", "duty_role": "부당직", "new_employee_id": "S3"})
+        assert index.shifts["S2"] == [] and index.assignment("2025-03-15", "주간")["holders"]["부당직"] == "S3"
+        # 편성 원본 수정 시에도 변경 반영 유지
+        index.set_assignment(_row("a1", "2025-03-15", "주간", "M2", "S1"))
+        assert index.assignment("2025-03-15", "주간")["holders"] == {"총당직": "M2", "부당직": "S3"}
+        index.remove_assignment("a1")
+        assert index.assignment("2025-03-15", "주간") is None and index.is_free("S3", "2025-03-15", "주간")
+
+    def test_scratch_keeps_parent(self):
+        index = ConflictIndex()
+        index.set_assignment(_row("a1", "2025-03-15", "주간", "M1", "S1"))
+        work = index.scratch()
+        work.assign(("2025-03-15", "주간", "부당직"), "S2")      # 기존 슬롯 교체
+        work.assign(("2025-03-16", "주간", "부당직"), "S1")
+        assert work.is_free("S1", "2025-03-15", "야간") is False  # 03-16 주간과 휴식 부족
+        assert work.holder(("2025-03-15", "주간", "부당직")) == "S2"
+        assert work.is_free("S1", "2025-03-15", "주간")
+        assert not work.scratch().is_free("S2", "2025-03-15", "야간")
+        assert index.holder(("2025-03-15", "주간", "부당직")) == "S1" and "S2" not in index.shifts
+
+    def test_violations(self):
+        index = ConflictIndex(rest_hours=11)
+        index.set_assignment(_row("a1", "2025-03-14", "야간", "M1", "S1"))
+        index.set_assignment(_row("a2", "2025-03-15", "주간", "M2", "S1"))
+        index.set_assignment(_row("a3", "2025-03-15", "야간", "M2", "S2"))
+        found = index.violations(date(2025, 3, 1), date(2025, 3, 31))
+        assert [(v["employee_id"], v["current"], v["rest_hours"]) for v in found] == [
+            ("S1", ("2025-03-15", "주간", "부당직"), 0.0), ("M2", ("2025-03-15", "야간", "총당직"), 0.0),
+        ]
+        assert index.violations(date(2025, 3, 16), date(2025, 3, 31)) == []
+
+    def test_month_check_is_fast(self):
+        index = ConflictIndex()
+        staff = [f"E{i}" for i in range(200)]
+        days = [date(2025, 3, d).isoformat() for d in range(1, 32)]
+        for i, day in enumerate(days):
+            index.set_assignment(_row(f"d{i}", day, "주간", staff[i % 200], staff[(i + 100) % 200]))
+            index.set_assignment(_row(f"n{i}", day, "야간", staff[(i + 50) % 200], staff[(i + 150) % 200]))
+        start = time.perf_counter()
+        free = sum(index.is_free(emp, day, "야간") for emp in staff for day in days)
+        index.violations(date(2025, 3, 1), date(2025, 3, 31))
+        assert time.perf_counter() - start < 0.5
+        assert 0 < free < len(staff) * len(days)
+
+
+class TestConflictIndexDB:
+    """공용 인덱스 + 서비스 연동 (로컬 백엔드)"""
+
+    @pytest.fixture
+    def staff(self, local_db, sample_employee):
+        rows = {no: local_db.insert("employees", dict(sample_employee, employee_no=no, name=no, grade=grade))[0]
+                for no, grade in (("M1", 1), ("M2", 1), ("M3", 2), ("M4", 2), ("S1", 3), ("S2", 4), ("S3", 4))}
+        # 03-14(금) 평일 야간: M3/S1
+        night = local_db.insert("duty_assignments", {
+            "duty_date": "2025-03-14", "day_of_week": "금", "duty_type": "야간", "day_category": "평일",
+            "main_duty_id": rows["M3"]["id"], "sub_duty_id": rows["S1"]["id"], "status": "확정",
+        })[0]
+        return local_db, rows, night
+
+    def test_loaded_once_then_incremental(self, staff, sample_assignment):
+        db, rows, night = staff
+        instrumentation.reset()
+        index = conflict_index.get_index(date(2025, 3, 15))
+        assert not index.is_free(rows["S1"]["id"], "2025-03-15", "주간")
+        db.insert("duty_assignments", dict(sample_assignment, main_duty_id=rows["M1"]["id"],
+                                           sub_duty_id=rows["S2"]["id"]))
+        assert not conflict_index.get_index(date(2025, 3, 15)).is_free(rows["S2"]["id"], "2025-03-15", "야간")
+        # 유효 명단 기간 조회 1회 (당직비 스냅샷 갱신용 조회는 제외)
+        loads = [r for r in instrumentation.get_records() if r["table"] == conflict_index.INDEX_TABLE
+                 and r["operation"] == "select" and not r["cached"] and len(r["filters"]) == 2]
+        assert len(loads) == 1
+
+    def test_create_assignment_rejects_double_booking(self, staff, sample_assignment):
+        db, rows, night = staff
+        with pytest.raises(ValueError):
+            assignment_service.create_assignment(dict(sample_assignment, main_duty_id=rows["M1"]["id"],
+                                                      sub_duty_id=rows["S1"]["id"]))
+        assert db.count("duty_assignments") == 1
+
+    def test_change_checked_and_reflected(self, staff, sample_assignment):
+        db, rows, night = staff
+        asmt = assignment_service.create_assignment(dict(sample_assignment, main_duty_id=rows["M1"]["id"],
+                                                         sub_duty_id=rows["S2"]["id"]))[0]
+        with pytest.raises(ValueError):
+            change_service.register_change(asmt["id"], "부당직", "S1", "출장")  # 전날 야간 근무자
+        assert db.select("duty_changes") == []
+        change_service.register_change(asmt["id"], "부당직", "S3", "출장")
+        index = conflict_index.get_index(date(2025, 3, 15))
+        assert index.holder(("2025-03-15", "주간", "부당직")) == rows["S3"]["id"]
+        assert index.is_free(rows["S2"]["id"], "2025-03-15", "야간")
+
+    def test_bulk_plan_reports_conflict(self, staff, sample_assignment):
+        db, rows, night = staff
+        db.insert("duty_assignments", dict(sample_assignment, main_duty_id=rows["M1"]["id"],
+                                           sub_duty_id=rows["S2"]["id"]))
+        plan = change_service.plan_bulk_changes([
+            {"duty_date": "2025-03-15", "duty_type": "주간", "duty_role": "부당직", "new_employee_no": "S1",
+             "change_reason": "출장", "change_date": None},
+            {"duty_date": "2025-03-14", "duty_type": "야간", "duty_role": "부당직", "new_employee_no": "S3",
+             "change_reason": "출장", "change_date": None},
+            {"duty_date": "2025-03-15", "duty_type": "주간", "duty_role": "부당직", "new_employee_no": "S1",
+             "change_reason": "출장", "change_date": None},  # 앞 행으로 전날 야간이 비워져 가능
+        ])
+        assert [r["ok"] for r in plan["rows"]] == [False, True, True]
+        assert "2025-03-14 야간 부당직" in plan["rows"][0]["message"]
+
+    def test_auto_assign_skips_busy(self, staff):
+        db, rows, night = staff
+        # LAST: 총당직 M2, 부당직 S3 → 다음 순번 M3, S1 (둘 다 전날 야간 근무) → M4, S2
+        db.insert("duty_assignments", {
+            "duty_date": "2025-03-01", "day_of_week": "토", "duty_type": "주간", "day_category": "휴무일",
+            "main_duty_id": rows["M2"]["id"], "sub_duty_id": rows["S3"]["id"], "status": "확정",
+        })
+        shift = {"duty_date": "2025-03-15", "shift_type": "주간"}
+        assert assignment_service.auto_assign_next("총당직", "휴무일", columns="employee_no") == {"employee_no": "M3"}
+        assert assignment_service.auto_assign_next("총당직", "휴무일", columns="employee_no", **shift) == {
+            "employee_no": "M4"}
+        assert assignment_service.auto_assign_next("부당직", "휴무일", columns="employee_no", **shift) == {
+            "employee_no": "S2"}
+
+    def test_generated_month_has_no_conflicts(self, staff):
+        db, rows, night = staff
+        result = roster_service.generate_month(2025, 3)
+        assert result["written"] == 39  # 03-14 야간은 기존 발령 유지
+        assert conflict_index.find_conflicts(date(2025, 3, 1), date(2025, 3, 31)) == []
+
+    def test_plan_roster_skips_busy_rotation(self):
+        pools = EligibilityPools([{"id": no, "employee_no": no, "grade": g, "is_active": True}
+                                  for no, g in (("M1", 1), ("M2", 2), ("S1", 3), ("S2", 3))])
+        work = ConflictIndex().scratch()
+        work.assign(("2025-03-08", "야간", "부당직"), "S1")  # 03-08(2주 토요일) 야간 → 03-09 08:00 종료
+        rows = roster_service.plan_roster(date(2025, 3, 9), date(2025, 3, 9), pools, {}, conflicts=work)
+        assert [r["sub_duty_id"] for r in rows] == ["S2", "S1"]
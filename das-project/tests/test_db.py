@@ -0,0 +1,376 @@
+"""
+데이터 접근 계층(services.db) 테스트
+- 공용 클라이언트 재사용
+- keep-alive 연결 풀 재사용 집계
+- 쿼리 계측
+"""
+import json
+import threading
+
+import httpx
+import pytest
+from services import db
+
+
+class TestClientPool:
+    """공용 클라이언트 / 연결 풀 테스트"""
+
+    def test_missing_credentials_raises(self, monkeypatch):
+        monkeypatch.setattr(db, "SUPABASE_URL", "")
+        with pytest.raises(ValueError):
+            db.get_client()
+
+    def test_client_is_singleton(self, fake_supabase):
+        assert db.get_client() is db.get_client()
+        stats = db.get_pool_stats()
+        assert stats["clients_created"] == 1
+        assert stats["clients_reused"] == 1
+
+    def test_connections_are_reused(self, fake_supabase):
+        for _ in range(5):
+            assert db.select("employees", use_cache=False)[0]["employee_no"] == "E1001"
+        stats = db.get_pool_stats()
+        assert stats["connections_opened"] == 1
+        assert stats["connections_reused"] == 4
+
+    def test_close_client_resets(self, fake_supabase):
+        first = db.get_client()
+        db.close_client()
+        assert db.get_client() is not first
+        assert db.get_pool_stats()["clients_created"] == 1
+
+
+class TestQueryCache:
+    """조회 캐시 테스트"""
+
+    def test_repeated_select_hits_cache(self, local_db, sample_employee):
+        local_db.insert("employees", sample_employee)
+        first = local_db.select_where("employees", "employee_no", "E9999")
+        second = local_db.select_where("employees", "employee_no", "E9999")
+        assert first == second
+        stats = local_db.get_cache_stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+
+    def test_write_invalidates_table(self, local_db, sample_employee):
+        assert local_db.count("employees") == 0
+        local_db.insert("employees", sample_employee)
+        assert local_db.count("employees") == 1
+
+    def test_write_invalidates_embedding_queries(self, local_db, sample_employee):
+        emp = local_db.insert("employees", sample_employee)[0]
+        columns = "*, contact:emergency_contacts(phone_mobile)"
+        assert local_db.select("employees", columns=columns)[0]["contact"] is None
+        local_db.insert("emergency_contacts", {"employee_id": emp["id"], "phone_mobile": "010-1111-2222"})
+        assert local_db.select("employees", columns=columns)[0]["contact"] == {"phone_mobile": "010-1111-2222"}
+
+    def test_cached_value_is_isolated(self, local_db, sample_employee):
+        local_db.insert("employees", sample_employee)
+        local_db.select_all("employees")[0]["name"] = "수정됨"
+        assert local_db.select_all("employees")[0]["name"] == "테스트직원"
+
+    def test_disabled_cache_bypasses(self, local_db, monkeypatch):
+        monkeypatch.setattr(local_db, "DB_CACHE_ENABLED", False)
+        local_db.count("employees")
+        local_db.count("employees")
+        assert local_db.get_cache_stats()["hits"] == 0
+
+
+class TestQueryCacheUnit:
+    def test_ttl_expiry(self, monkeypatch):
+        from services import query_cache
+
+        now = [100.0]
+        monkeypatch.setattr(query_cache.time, "monotonic", lambda: now[0])
+        cache = query_cache.QueryCache(ttl=10)
+        cache.set("k", {"employees"}, [1])
+        assert cache.get("k") == (True, [1])
+        now[0] += 11
+        assert cache.get("k") == (False, None)
+
+    def test_lru_bound(self):
+        from services.query_cache import QueryCache
+
+        cache = QueryCache(max_entries=2)
+        cache.set("a", {"t"}, 1)
+        cache.set("b", {"t"}, 2)
+        cache.get("a")
+        cache.set("c", {"t"}, 3)
+        assert cache.get("b") == (False, None)
+        assert cache.get("a") == (True, 1)
+        assert cache.stats()["evictions"] == 1
+
+    def test_tables_in_select(self):
+        from services.query_cache import tables_in_select
+
+        columns = "*, main_duty:employees!duty_assignments_main_duty_id_fkey(*), changes:duty_changes(id, new:employees!fk(name))"
+        assert tables_in_select("duty_assignments", columns) == {"duty_assignments", "employees", "duty_changes"}
+
+
+def _employees(count: int, start: int = 1000) -> list:
+    return [{
+        "employee_no": f"E{start + i}", "name": f"직원{i}", "department": "세탁기",
+        "position": "대리", "grade": 3, "factory": "창원1공장", "business_unit": "세탁기",
+    } for i in range(count)]
+
+
+class TestBulkUpsert:
+    """청크 단위 일괄 쓰기 테스트"""
+
+    def test_chunks_and_results(self, local_db):
+        results = local_db.bulk_upsert("employees", _employees(5), chunk_size=2, max_workers=3)
+        assert [r["rows"] for r in results] == [2, 2, 1]
+        assert all(r["ok"] for r in results)
+        assert len(local_db.bulk_data(results)) == 5
+        assert local_db.count("employees") == 5
+
+    def test_upsert_on_conflict_key(self, local_db):
+        local_db.bulk_upsert("employees", _employees(3), on_conflict="employee_no")
+        changed = [dict(e, name="변경") for e in _employees(3)]
+        local_db.bulk_upsert("employees", changed, on_conflict="employee_no", chunk_size=1)
+        rows = local_db.select_all("employees")
+        assert len(rows) == 3
+        assert {r["name"] for r in rows} == {"변경"}
+
+    def test_duplicate_keys_in_input_are_merged(self, local_db):
+        rows = _employees(2) + [dict(_employees(1)[0], name="마지막")]
+        data = local_db.bulk_data(local_db.bulk_upsert("employees", rows, on_conflict="employee_no"))
+        assert len(data) == 2
+        assert local_db.select_where("employees", "employee_no", "E1000")[0]["name"] == "마지막"
+
+    def test_failed_chunk_is_reported_without_retry(self, local_db):
+        rows = _employees(4)
+        rows[3]["grade"] = 9  # CHECK 제약 위반
+        results = local_db.bulk_upsert("employees", rows, chunk_size=2, retries=3, backoff=0)
+        assert [r["ok"] for r in results] == [True, False]
+        assert results[1]["attempts"] == 1
+        assert local_db.count("employees") == 2
+
+    def test_transient_error_is_retried(self, local_db, monkeypatch):
+        real_get_client = local_db.get_client
+        calls = {"n": 0}
+
+        def flaky_client():
+            calls["n"] += 1
+            if calls["n"] == 1:
+                raise ConnectionError("일시적 오류")
+            return real_get_client()
+
+        monkeypatch.setattr(local_db, "get_client", flaky_client)
+        results = local_db.bulk_upsert("employees", _employees(2), retries=2, backoff=0)
+        assert results[0]["ok"]
+        assert results[0]["attempts"] == 2
+
+    @pytest.mark.parametrize("on_conflict, attempts", [(None, 1), ("employee_no", 2)])
+    def test_ambiguous_error_retried_only_for_upsert(self, local_db, monkeypatch, on_conflict, attempts):
+        # 응답 타임아웃: 서버 반영 여부 불확실 → plain insert는 중복 방지를 위해 재시도하지 않음
+        real_execute = local_db._execute
+        calls = {"n": 0}
+
+        def flaky_execute(*args, **kwargs):
+            calls["n"] += 1
+            if calls["n"] == 1:
+                raise httpx.ReadTimeout("응답 없음")
+            return real_execute(*args, **kwargs)
+
+        monkeypatch.setattr(local_db, "_execute", flaky_execute)
+        results = local_db.bulk_upsert("employees", _employees(2), on_conflict=on_conflict, retries=2, backoff=0)
+        assert (results[0]["ok"], results[0]["attempts"]) == (attempts == 2, attempts)
+
+    def test_programming_error_is_not_retried(self, local_db, monkeypatch):
+        def broken_execute(*args, **kwargs):
+            raise TypeError("버그")
+
+        monkeypatch.setattr(local_db, "_execute", broken_execute)
+        results = local_db.bulk_upsert("employees", _employees(2), on_conflict="employee_no", retries=2, backoff=0)
+        assert (results[0]["ok"], results[0]["attempts"]) == (False, 1)
+
+    def test_insert_many_raises_on_failure(self, local_db):
+        rows = _employees(2)
+        rows[1]["grade"] = 0
+        with pytest.raises(local_db.BulkWriteError) as exc:
+            local_db.insert_many("employees", rows)
+        assert exc.value.results[0]["error"]
+
+
+class TestIterSelect:
+    """키셋 페이지네이션 스트리밍 조회 테스트"""
+
+    def _seed_assignments(self, db, days: int):
+        rows = []
+        for day in range(1, days + 1):
+            for duty_type in ("주간", "야간"):
+                rows.append({"duty_date": f"2025-01-{day:02d}", "day_of_week": "월", "duty_type": duty_type,
+                             "day_category": "휴무일", "status": "예정"})
+        db.bulk_upsert("duty_assignments", rows)
+        return rows
+
+    def test_streams_all_rows_in_key_order(self, local_db):
+        local_db.bulk_upsert("employees", _employees(25))
+        rows = list(local_db.iter_select("employees", key=("employee_no",), page_size=10))
+        assert [r["employee_no"] for r in rows] == [f"E{1000 + i}" for i in range(25)]
+
+    def test_composite_key_with_duplicate_dates(self, local_db):
+        self._seed_assignments(local_db, 7)
+        for prefetch in (True, False):
+            rows = list(local_db.iter_select("duty_assignments", key=("duty_date", "id"),
+                                             page_size=3, prefetch=prefetch))
+            assert len(rows) == 14
+            assert len({r["id"] for r in rows}) == 14
+            assert [r["duty_date"] for r in rows] == sorted(r["duty_date"] for r in rows)
+
+    def test_filters_and_projection_keep_key_columns(self, local_db):
+        self._seed_assignments(local_db, 5)
+        rows = list(local_db.iter_select(
+            "duty_assignments", columns="duty_type",
+            filters=[("eq", "duty_type", "야간")], key=("duty_date", "id"), page_size=2,
+        ))
+        assert len(rows) == 5
+        assert set(rows[0]) == {"duty_date", "id", "duty_type"}
+
+    def test_page_queries_are_bounded(self, local_db, monkeypatch):
+        local_db.bulk_upsert("employees", _employees(10))
+        calls = {"n": 0}
+        real_get_client = local_db.get_client
+
+        def counting_client():
+            calls["n"] += 1
+            return real_get_client()
+
+        monkeypatch.setattr(local_db, "get_client", counting_client)
+        assert len(list(local_db.iter_select("employees", page_size=4))) == 10
+        assert calls["n"] == 3
+
+
+class TestInstrumentation:
+    """쿼리 계측 테스트"""
+
+    @pytest.fixture(autouse=True)
+    def _reset(self):
+        from services import instrumentation
+        instrumentation.reset()
+        yield instrumentation
+        instrumentation.reset()
+
+    def test_records_every_call(self, local_db, sample_employee, _reset):
+        local_db.insert("employees", sample_employee)
+        local_db.select_where("employees", "employee_no", "E9999")
+        local_db.select_where("employees", "employee_no", "E9999")
+        records = _reset.get_records()
+        assert [(r["operation"], r["cached"]) for r in records] == [
+            ("insert", False), ("select", False), ("select", True),
+        ]
+        select = records[1]
+        assert select["table"] == "employees"
+        assert select["filters"] == [("eq", "employee_no", "E9999")]
+        assert select["rows"] == 1
+        assert select["bytes"] is None  # 로컬 백엔드: Content-Length 없음 (DB_QUERY_LOG_BYTES 미설정)
+        assert records[2]["bytes"] == 0  # 캐시 적중은 전송 없음
+        assert select["duration_ms"] >= 0
+
+    def test_bytes_from_content_length(self, fake_supabase, _reset):
+        db.select("employees", use_cache=False)
+        body = json.dumps([{"id": "1", "employee_no": "E1001"}]).encode()
+        assert _reset.get_records()[-1]["bytes"] == len(body)
+
+    def test_serialized_bytes_behind_flag(self, local_db, sample_employee, _reset, monkeypatch):
+        monkeypatch.setattr(_reset, "DB_QUERY_LOG_BYTES", True)
+        local_db.insert("employees", sample_employee)
+        assert _reset.get_records()[-1]["bytes"] > 0
+
+    def test_count_records_count_as_rows(self, local_db, _reset):
+        local_db.bulk_upsert("employees", _employees(3))
+        local_db.count("employees")
+        assert _reset.get_records()[-1]["rows"] == 3
+
+    def test_errors_are_recorded(self, local_db, _reset):
+        with pytest.raises(Exception):
+            local_db.insert("employees", {"name": "사번없음"})
+        assert _reset.get_records()[-1]["error"]
+
+    def test_summary_percentiles(self, local_db, _reset):
+        for _ in range(5):
+            local_db.select("employees", use_cache=False)
+        row = next(s for s in _reset.summary() if s["operation"] == "select")
+        assert row["calls"] == 5
+        assert row["p50_ms"] <= row["p95_ms"] <= row["p99_ms"] <= row["max_ms"]
+
+    def test_calls_per_render(self, local_db, _reset):
+        _reset.begin_render("당직 발령")
+        local_db.select("employees", use_cache=False)
+        local_db.count("duty_assignments")
+        assert _reset.render_summary() == [
+            {"page": "당직 발령", "renders": 1, "last_calls": 2, "max_calls": 2, "avg_calls": 2.0},
+        ]
+        assert _reset.get_records()[0]["page"] == "당직 발령"
+
+    def test_jsonl_sink(self, local_db, _reset, monkeypatch, tmp_path):
+        path = tmp_path / "queries.jsonl"
+        monkeypatch.setattr(_reset, "DB_QUERY_LOG_PATH", str(path))
+        local_db.select("employees", use_cache=False)
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert json.loads(lines[0])["operation"] == "select"
+
+
+class TestCount:
+    """건수 조회 / table_stats 테스트"""
+
+    def test_count_is_head_only(self, fake_supabase):
+        assert db.count("employees") == 1
+        method, path, _ = fake_supabase.RequestHandlerClass.requests[-1]
+        assert method == "HEAD"
+        assert "select=id" in path
+
+    def test_count_mode(self, fake_supabase, monkeypatch):
+        from postgrest import SyncRequestBuilder
+
+        calls = []
+        real_select = SyncRequestBuilder.select
+
+        def spy(self, *columns, **kwargs):
+            calls.append(kwargs)
+            return real_select(self, *columns, **kwargs)
+
+        monkeypatch.setattr(SyncRequestBuilder, "select", spy)
+        db.count("employees", mode="planned")
+        assert calls == [{"count": "planned", "head": True}]
+
+    def test_unknown_mode_raises(self, local_db):
+        with pytest.raises(ValueError):
+            local_db.count("employees", mode="guess")
+
+    def test_filtered_count(self, local_db):
+        local_db.bulk_upsert("employees", _employees(3))
+        local_db.update("employees", local_db.select_all("employees")[0]["id"], {"grade": 1})
+        assert local_db.count("employees", "grade", 1) == 1
+        assert local_db.count("employees", mode="estimated") == 3
+
+    def test_table_stats_rpc_request(self, fake_supabase):
+        result = db.table_stats(month="2025-03", estimated=True)
+        method, path, body = fake_supabase.RequestHandlerClass.requests[-1]
+        assert (method, path) == ("POST", "/rest/v1/rpc/das_table_stats")
+        assert result["params"] == {"p_month": "2025-03", "p_estimated": True}
+
+    def test_table_stats_local(self, local_db, sample_employee, sample_assignment):
+        local_db.insert("employees", sample_employee)
+        local_db.insert("duty_assignments", sample_assignment)
+        local_db.insert("duty_assignments", dict(sample_assignment, duty_date="2025-04-01"))
+        stats = local_db.table_stats(month="2025-03")
+        assert stats["employees"] == 1
+        assert stats["active_employees"] == 1
+        assert stats["duty_assignments"] == 2
+        assert stats["pending_logs"] == 0
+        assert stats["month"] == {"duty_assignments": 1, "duty_changes": 0, "payment_amount": 0}
+
+    def test_table_stats_invalidated_by_writes(self, local_db, sample_employee):
+        assert local_db.table_stats()["employees"] == 0
+        assert local_db.table_stats()["employees"] == 0
+        assert local_db.get_cache_stats()["hits"] == 1
+        local_db.insert("employees", sample_employee)
+        assert local_db.table_stats()["employees"] == 1
+
+    def test_unknown_rpc_raises(self, local_db):
+        from postgrest.exceptions import APIError
+
+        with pytest.raises(APIError):
+            local_db.rpc("no_such_function")
@@ -0,0 +1,93 @@
+"""
+당직 달력 테스트
+- 휴무일/평일 판정 (일요일, 공휴일, 토요일 주차 패턴)
+- 근무 시간 (WORK_HOURS)
+- 기간 조회 / DataFrame API
+"""
+from datetime import date
+
+import pytest
+from services import duty_calendar
+
+
+@pytest.fixture
+def holiday_file(tmp_path, monkeypatch):
+    """공휴일 파일 교체 (테스트 후 캐시 복구)"""
+    path = tmp_path / "holidays.csv"
+    path.write_text("date,name\n2025-03-12,창립기념일\n2025-03-22,임시휴무\n", encoding="utf-8")
+    monkeypatch.setattr(duty_calendar, "HOLIDAY_FILE", str(path))
+    duty_calendar.reload()
+    yield path
+    monkeypatch.undo()
+    duty_calendar.reload()
+
+
+class TestDayInfo:
+    """일자 판정"""
+
+    @pytest.mark.parametrize("day, week, category, shifts", [
+        (date(2025, 3, 1), 1, "휴무일", ["holiday_day", "holiday_night"]),
+        (date(2025, 3, 8), 2, "평일", ["sat_2_4"]),
+        (date(2025, 3, 15), 3, "휴무일", ["holiday_day", "holiday_night"]),
+        (date(2025, 3, 22), 4, "평일", ["sat_2_4"]),
+        (date(2025, 3, 29), 5, "휴무일", ["sat_5_day", "sat_5_night"]),
+    ])
+    def test_saturday_patterns(self, day, week, category, shifts):
+        info = duty_calendar.day_info(day)
+        assert info["saturday_week"] == week
+        assert info["day_category"] == category
+        assert [s["hours_key"] for s in info["shifts"]] == shifts
+
+    def test_weekday_and_sunday(self):
+        assert [s["hours_key"] for s in duty_calendar.day_info(date(2025, 3, 4))["shifts"]] == ["weekday_night"]
+        assert duty_calendar.day_category(date(2025, 3, 9)) == "휴무일"
+
+    def test_public_holiday_overrides_saturday_pattern(self):
+        # 2024-02-10: 2주 토요일이지만 설날
+        info = duty_calendar.day_info(date(2024, 2, 10))
+        assert info["holiday_name"] == "설날"
+        assert [s["hours_key"] for s in info["shifts"]] == ["holiday_day", "holiday_night"]
+
+    def test_shift_hours(self):
+        shift = duty_calendar.shift(date(2025, 3, 29), "주간")
+        assert (shift["start_time"], shift["end_time"]) == ("12:00", "22:00")
+        assert duty_calendar.shift(date(2025, 3, 8), "주간") is None
+
+    def test_custom_holiday_file(self, holiday_file):
+        assert duty_calendar.day_info(date(2025, 3, 12))["holiday_name"] == "창립기념일"
+        assert duty_calendar.day_category(date(2025, 3, 22)) == "휴무일"
+        assert duty_calendar.day_category(date(2025, 3, 3)) == "평일"  # 기본 파일의 대체공휴일 없음
+
+    def test_returned_rows_are_copies(self):
+        duty_calendar.day_info(date(2025, 3, 1))["shifts"].clear()
+        assert len(duty_calendar.day_info(date(2025, 3, 1))["shifts"]) == 2
+
+
+class TestRange:
+    """기간 조회"""
+
+    def test_shifts_span_years(self):
+        rows = duty_calendar.shifts(date(2024, 12, 31), date(2025, 1, 2))
+        assert [(r["duty_date"], r["duty_type"]) for r in rows] == [
+            ("2024-12-31", "야간"), ("2025-01-01", "주간"), ("2025-01-01", "야간"), ("2025-01-02", "야간"),
+        ]
+
+    def test_frame_matches_days(self):
+        start, end = date(2024, 11, 1), date(2025, 2, 28)
+        frame = duty_calendar.frame(start, end)
+        days = duty_calendar.days(start, end)
+        assert list(frame["duty_date"]) == [d["duty_date"] for d in days]
+        assert list(frame["day_category"]) == [d["day_category"] for d in days]
+
+    def test_shift_frame_matches_shifts(self):
+        start, end = duty_calendar.month_bounds(2025, 10)
+        frame = duty_calendar.shift_frame(start, end)
+        rows = duty_calendar.shifts(start, end)
+        assert list(zip(frame["duty_date"], frame["duty_type"], frame["hours_key"])) == [
+            (r["duty_date"], r["duty_type"], r["hours_key"]) for r in rows
+        ]
+
+    def test_describe_month(self):
+        text = duty_calendar.describe_month(2025, 10)
+        assert text.startswith("휴무일 11일 / 평일 20일")
+        assert "10-03 개천절" in text
@@ -0,0 +1,92 @@
+"""
+발령 대상자 풀 테스트
+- 사번순 후속자 조회 (순환, 퇴직자 이후 순번 유지)
+- 직원 추가/퇴직/직급 변경 증분 반영
+"""
+import time
+
+import pytest
+from services import assignment_service, eligibility
+from services.eligibility import EligibilityPool, EligibilityPools
+
+
+def _emp(emp_no: str, grade: int, is_active: bool = True) -> dict:
+    return {"id": f"id-{emp_no}", "employee_no": emp_no, "grade": grade, "is_active": is_active}
+
+
+class TestEligibilityPool:
+    """정렬 배열 + bisect 테스트"""
+
+    def test_successor_wraps(self):
+        pool = EligibilityPool([1, 2], [_emp("E3", 1), _emp("E1", 2), _emp("E2", 3)])
+        assert pool.keys == ["E1", "E3"]
+        assert pool.successor(None)["employee_no"] == "E1"
+        assert pool.successor("E1")["employee_no"] == "E3"
+        assert pool.successor("E3")["employee_no"] == "E1"
+
+    def test_missing_last_continues_in_order(self):
+        pool = EligibilityPool([1], [_emp("E1", 1), _emp("E5", 1), _emp("E9", 1)])
+        assert pool.successor("E6")["employee_no"] == "E9"
+        assert pool.successor("E99")["employee_no"] == "E1"
+
+    def test_incremental_updates(self):
+        pool = EligibilityPool([1], [_emp("E1", 1), _emp("E3", 1)])
+        pool.apply(_emp("E2", 1))
+        assert pool.keys == ["E1", "E2", "E3"]
+        pool.apply(_emp("E2", 1, is_active=False))
+        assert pool.keys == ["E1", "E3"]
+        pool.apply(_emp("E3", 2))
+        assert pool.keys == ["E1"]
+        pool.remove("E404")
+        assert len(pool) == 1
+
+    def test_empty_pool(self):
+        assert EligibilityPool([1]).successor("E1") is None
+
+    def test_grade_change_moves_between_pools(self):
+        pools = EligibilityPools([_emp("E1", 2)])
+        assert "E1" in pools.pool("총당직", "평일")
+        pools.apply(_emp("E1", 1))
+        assert "E1" not in pools.pool("총당직", "평일")
+        assert "E1" in pools.pool("총당직", "휴무일")
+
+    def test_lookups_are_fast(self):
+        pool = EligibilityPool([1], [_emp(f"E{i:05d}", 1) for i in range(5000)])
+        start = time.perf_counter()
+        emp_no = None
+        for _ in range(20000):
+            emp_no = pool.successor(emp_no)["employee_no"]
+        assert time.perf_counter() - start < 0.5
+
+
+class TestSharedPools:
+    """공용 풀 + services.db 쓰기 리스너 테스트 (로컬 백엔드)"""
+
+    @pytest.fixture
+    def staff(self, local_db, sample_employee):
+        rows = [dict(sample_employee, employee_no=f"E{i}", grade=1) for i in range(1, 4)]
+        return {e["employee_no"]: e for e in local_db.bulk_upsert("employees", rows)[0]["data"]}
+
+    def test_writes_update_pool_without_reload(self, local_db, staff, sample_employee, monkeypatch):
+        pools = eligibility.get_pools()
+        monkeypatch.setattr(eligibility, "load_pools", lambda: pytest.fail("재조회 발생"))
+
+        local_db.insert("employees", dict(sample_employee, employee_no="E25", grade=1))
+        local_db.update("employees", staff["E1"]["id"], {"is_active": False})
+        assert eligibility.get_pools() is pools
+        assert pools.pool("총당직", "휴무일").keys == ["E2", "E25", "E3"]
+
+    def test_close_client_discards_pools(self, local_db, staff):
+        pools = eligibility.get_pools()
+        local_db.close_client()
+        assert eligibility.get_pools() is not pools
+
+    def test_auto_assign_survives_deactivation(self, local_db, staff, sample_assignment):
+        local_db.insert("duty_assignments", dict(sample_assignment, main_duty_id=staff["E2"]["id"], status="완료"))
+        assert assignment_service.auto_assign_next("총당직", "휴무일", columns="employee_no") == {"employee_no": "E3"}
+        local_db.update("employees", staff["E2"]["id"], {"is_active": False})
+        assert assignment_service.auto_assign_next("총당직", "휴무일", columns="employee_no") == {"employee_no": "E3"}
+
+    def test_auto_assign_fetches_extra_columns(self, local_db, staff):
+        emp = assignment_service.auto_assign_next("총당직", "휴무일", columns="employee_no, bank_account")
+        assert emp == {"employee_no": "E1", "bank_account": "국민-123456789"}
@@ -0,0 +1,174 @@
+"""
+내보내기 테스트
+- 당직비 워크북: 요약/월별 시트, 사업부 소계/합계
+- 기간 파일 내보내기 (로컬 백엔드)
+- CSV(gzip)/Parquet 내보내기, JSON 컬럼 펼침
+"""
+import csv
+import gzip
+import json
+import os
+from io import BytesIO
+
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+from services import export_service, payment_service
+
+
+def _payment(no: str, bu: str, count: int, amount: int) -> dict:
+    return {"employee_id": no, "duty_count": count, "amount": amount,
+            "employee": {"employee_no": no, "name": f"직원{no}", "business_unit": bu, "factory": "창원1공장"}}
+
+
+def _rows(ws) -> list:
+    return [list(row) for row in ws.iter_rows(values_only=True)]
+
+
+@pytest.fixture
+def months():
+    return [
+        ("2025-01", [_payment("E2", "중전기", 2, 100), _payment("E1", "전력기기", 1, 50),
+                     _payment("E3", "중전기", 1, 50)]),
+        ("2025-02", [_payment("E1", "전력기기", 3, 150)]),
+    ]
+
+
+class TestPaymentWorkbook:
+    """당직비 워크북"""
+
+    def test_sheets(self, months):
+        output = BytesIO()
+        export_service.write_payment_workbook(output, months)
+        assert load_workbook(output, read_only=True).sheetnames == ["요약", "2025-01 당직비", "2025-02 당직비"]
+
+    def test_month_sheet_subtotals(self, months):
+        output = BytesIO()
+        export_service.write_payment_workbook(output, months)
+        rows = _rows(load_workbook(output)["2025-01 당직비"])
+        assert rows[0] == export_service.PAYMENT_HEADERS
+        # 사업부순 → 사번순, 사업부마다 소계, 마지막 합계
+        assert [r[0] for r in rows[1:]] == ["E1", None, "E2", "E3", None, None]
+        assert rows[2][1:8] == ["전력기기 소계 (1명)", None, None, "전력기기", None, 1, 50]
+        assert rows[5][6:8] == [3, 150]
+        assert rows[6][1:8] == ["합계 (3명)", None, None, None, None, 4, 200]
+
+    def test_summary_sheet(self, months):
+        output = BytesIO()
+        totals = export_service.write_payment_workbook(output, months)
+        assert totals["months"] == {"2025-01": [3, 4, 200], "2025-02": [1, 3, 150]}
+        rows = _rows(load_workbook(output)["요약"])
+        assert rows[1:4] == [["2025-01", 3, 4, 200], ["2025-02", 1, 3, 150], ["합계", 4, 7, 350]]
+        assert rows[-2:] == [["전력기기", 2, 4, 200], ["중전기", 2, 3, 150]]
+
+    def test_months_consumed_lazily(self, months, tmp_path):
+        # 반복자로 한 달씩 전달해도 동일 결과
+        path = tmp_path / "payments.xlsx"
+        export_service.write_payment_workbook(str(path), iter(months))
+        assert len(load_workbook(path)["2025-01 당직비"]["A"]) == 7
+
+    def test_large_month(self, tmp_path):
+        payments = [_payment(f"E{i:05d}", f"사업부{i % 7}", 1, 50) for i in range(20000)]
+        path = tmp_path / "large.xlsx"
+        totals = export_service.write_payment_workbook(str(path), [("2025-03", payments)])
+        assert totals["months"]["2025-03"] == [20000, 20000, 1000000]
+        ws = load_workbook(path, read_only=True)["2025-03 당직비"]
+        assert sum(1 for _ in ws.iter_rows(values_only=True)) == 1 + 20000 + 7 + 1
+
+
+class TestExportPayments:
+    """기간 파일 내보내기 (로컬 백엔드)"""
+
+    def test_export_period(self, local_db, sample_employee, sample_assignment, tmp_path):
+        main = local_db.insert("employees", dict(sample_employee, grade=1))[0]
+        sub = local_db.insert("employees", dict(sample_employee, employee_no="E9998", grade=4))[0]
+        local_db.insert("duty_assignments", dict(sample_assignment, main_duty_id=main["id"],
+                                                 sub_duty_id=sub["id"], status="확정"))
+        path = export_service.export_payments_xlsx(2025, 1, 3)
+        try:
+            wb = load_workbook(path)
+        finally:
+            os.remove(path)
+        assert wb.sheetnames == ["요약", "2025-01 당직비", "2025-02 당직비", "2025-03 당직비"]
+        total = payment_service.get_report(2025, 3).total
+        assert _rows(wb["요약"])[4] == ["합계", 2, total["count"], total["amount"]]
+
+    def test_report_excel_matches_workbook(self, local_db):
+        report = payment_service.PaymentReport(2025, 3, [_payment("E1", "중전기", 1, 50)])
+        assert load_workbook(BytesIO(report.to_excel())).sheetnames == ["요약", "2025-03 당직비"]
+
+
+def _log(local_db, day: str, factory: str, workforce, construction) -> dict:
+    return local_db.insert("duty_logs", {
+        "log_date": day, "factory": factory, "duty_type": "야간",
+        "workforce_status": workforce, "construction_status": construction, "approval_status": "작성중",
+    })[0]
+
+
+class TestFlatten:
+    """JSON 컬럼 펼침"""
+
+    def test_nested_and_string_json(self):
+        assert export_service.flatten_json("c", '{"주간": {"업체수": 2, "화기작업": true}, "목록": [1, 2]}') == {
+            "c.주간.업체수": 2, "c.주간.화기작업": True, "c.목록": "[1, 2]",
+        }
+        assert export_service.flatten_json("c", None) == {}
+
+
+class TestColumnarExport:
+    """CSV(gzip)/Parquet 내보내기 (로컬 백엔드)"""
+
+    @pytest.fixture
+    def month(self, local_db, sample_employee, sample_assignment):
+        main = local_db.insert("employees", dict(sample_employee, grade=1))[0]
+        sub = local_db.insert("employees", dict(sample_employee, employee_no="E9998", name="부당직", grade=4))[0]
+        local_db.insert("duty_assignments", dict(sample_assignment, main_duty_id=main["id"],
+                                                 sub_duty_id=sub["id"], status="확정"))
+        _log(local_db, "2025-03-01", "창원1공장", {"departments": {"세탁기": {"특근": 2}}},
+             json.dumps({"주간": {"업체수": 1, "화기작업": False}}))
+        _log(local_db, "2025-03-02", "창원2공장", {"departments": {"연구소": {"특근": 1.5}, "세탁기": {"특근": 3}}}, {})
+        return local_db, main, sub
+
+    def test_csv_gzip(self, month):
+        path = export_service.export_assignments("csv", "2025-03-01", "2025-04-01")
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        os.remove(path)
+        assert [name for name, _ in export_service.ASSIGNMENT_EXPORT_COLUMNS] == list(rows[0])
+        assert (rows[0]["main_duty_employee_no"], rows[0]["sub_duty_name"]) == ("E9999", "부당직")
+        assert rows[0]["change_count"] == "0"
+
+    def test_payments_csv(self, month):
+        path = export_service.export_payments("csv", 2025, 3, 3)
+        frame = pd.read_csv(path)
+        os.remove(path)
+        assert sorted(frame["employee_no"]) == ["E9998", "E9999"]
+        assert frame["amount"].sum() == payment_service.get_report(2025, 3).total["amount"]
+
+    def test_logs_flattened(self, month):
+        path = export_service.export_logs("csv", "2025-03-01", "2025-04-01")
+        frame = pd.read_csv(path)
+        os.remove(path)
+        assert list(frame.columns[-4:]) == [
+            "workforce_status.departments.세탁기.특근", "workforce_status.departments.연구소.특근",
+            "construction_status.주간.업체수", "construction_status.주간.화기작업",
+        ]
+        assert list(frame["workforce_status.departments.세탁기.특근"]) == [2, 3]
+
+    def test_parquet_batches_and_types(self, month, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        path = export_service.export_logs("parquet", "2025-03-01", "2025-04-01", path=str(tmp_path / "logs.parquet"))
+        schema = pq.read_schema(path)
+        assert str(schema.field("workforce_status.departments.연구소.특근").type) == "double"
+        assert str(schema.field("construction_status.주간.화기작업").type) == "bool"
+        records = ({"employee_no": f"E{i}", "duty_count": i} for i in range(25))
+        columns = [("employee_no", "string"), ("duty_count", "int64")]
+        target = str(tmp_path / "rows.parquet")
+        assert export_service.write_records(target, "parquet", columns, records, batch_size=10) == 25
+        assert pq.ParquetFile(target).metadata.num_row_groups == 3
+        assert pq.read_table(target, columns=["duty_count"]).column(0).to_pylist() == list(range(25))
+
+    def test_unknown_format(self, month):
+        with pytest.raises(ValueError):
+            export_service.export_assignments("xlsx", "2025-03-01", "2025-04-01")
@@ -0,0 +1,139 @@
+"""
+로컬 임베디드 백엔드(SQLite) 테스트
+- schema.sql 테이블 생성
+- PostgREST 필터/정렬/임베딩 호환성
+- 제약조건 오류 → APIError
+"""
+import pytest
+from postgrest.exceptions import APIError
+from services.local_backend import parse_select
+
+
+@pytest.fixture
+def client(local_db, sample_employee):
+    """직원 2명 + 발령 1건이 들어있는 로컬 클라이언트"""
+    client = local_db.get_client()
+    sub = dict(sample_employee, employee_no="E9998", name="부당직자", position="대리", grade=3)
+    client.table("employees").insert([sample_employee, sub]).execute()
+    return client
+
+
+def _employee_id(client, employee_no):
+    return client.table("employees").select("id").eq("employee_no", employee_no).single().execute().data["id"]
+
+
+class TestSchema:
+    """스키마 로딩 테스트"""
+
+    def test_all_tables_created(self, local_db):
+        client = local_db.get_client()
+        for table in ["employees", "duty_assignments", "duty_changes", "duty_logs",
+                      "duty_payments", "emergency_contacts", "duty_rules"]:
+            assert client.table(table).select("*").execute().data == []
+
+    def test_defaults_applied(self, client):
+        emp = client.table("employees").select("*").eq("employee_no", "E9999").single().execute().data
+        assert len(emp["id"]) == 36
+        assert emp["is_active"] is True
+        assert emp["created_at"]
+
+
+    def test_existing_file_backfills_pointers(self, tmp_path, sample_employee, sample_assignment):
+        from services.local_backend import LocalClient
+
+        path = str(tmp_path / "das.db")
+        client = LocalClient(path)
+        emp = client.table("employees").insert(sample_employee).execute().data[0]
+        client.table("duty_assignments").insert(dict(sample_assignment, main_duty_id=emp["id"], status="완료")).execute()
+        client.execute("DELETE FROM duty_rotation_pointers")  # 트리거 도입 전 DB 파일 재현
+        client.close()
+
+        client = LocalClient(path)
+        pointer = client.table("duty_rotation_pointers").select("employee_id").eq("duty_role", "총당직") \
+            .eq("day_category", "휴무일").single().execute().data
+        assert pointer == {"employee_id": emp["id"]}
+        client.close()
+
+
+class TestQueryBuilder:
+    """PostgREST 빌더 호환성 테스트"""
+
+    def test_filters_and_order(self, client):
+        rows = client.table("employees").select("employee_no").in_("grade", [2, 3]).order("employee_no").execute().data
+        assert [r["employee_no"] for r in rows] == ["E9998", "E9999"]
+        rows = client.table("employees").select("name").ilike("name", "%부당%").execute().data
+        assert rows == [{"name": "부당직자"}]
+        rows = client.table("employees").select("id").gte("grade", 3).lt("grade", 4).execute().data
+        assert len(rows) == 1
+
+    def test_or_filter(self, client):
+        rows = client.table("employees").select("employee_no").or_("grade.eq.2,and(grade.eq.3,name.eq.없음)").execute().data
+        assert [r["employee_no"] for r in rows] == ["E9999"]
+
+    def test_count_and_limit(self, client):
+        response = client.table("employees").select("*", count="exact").limit(1).execute()
+        assert len(response.data) == 1
+        assert response.count == 2
+
+    def test_forward_embedding_with_fk_hint(self, client, sample_assignment):
+        main_id, sub_id = _employee_id(client, "E9999"), _employee_id(client, "E9998")
+        client.table("duty_assignments").insert(dict(sample_assignment, main_duty_id=main_id, sub_duty_id=sub_id)).execute()
+        row = (
+            client.table("duty_assignments")
+            .select("duty_date, main_duty:employees!duty_assignments_main_duty_id_fkey(name), sub_duty:employees!duty_assignments_sub_duty_id_fkey(*)")
+            .execute().data[0]
+        )
+        assert row["main_duty"] == {"name": "테스트직원"}
+        assert row["sub_duty"]["employee_no"] == "E9998"
+
+    def test_ambiguous_embedding_raises(self, client):
+        with pytest.raises(APIError) as exc:
+            client.table("duty_assignments").select("*, employees(*)").execute()
+        assert exc.value.code == "PGRST201"
+
+    def test_reverse_one_to_one_embedding(self, client):
+        emp_id = _employee_id(client, "E9999")
+        client.table("emergency_contacts").insert({"employee_id": emp_id, "phone_mobile": "010-0000-0000"}).execute()
+        rows = client.table("employees").select("employee_no, contact:emergency_contacts(phone_mobile)").order("employee_no").execute().data
+        assert rows[0]["contact"] is None
+        assert rows[1]["contact"] == {"phone_mobile": "010-0000-0000"}
+
+    def test_update_and_delete_return_rows(self, client):
+        updated = client.table("employees").update({"is_active": False}).eq("employee_no", "E9998").execute().data
+        assert updated[0]["is_active"] is False
+        deleted = client.table("employees").delete().eq("employee_no", "E9998").execute().data
+        assert len(deleted) == 1
+
+    def test_upsert_on_conflict(self, client, sample_employee):
+        client.table("employees").upsert(dict(sample_employee, name="변경됨"), on_conflict="employee_no").execute()
+        rows = client.table("employees").select("name").eq("employee_no", "E9999").execute().data
+        assert rows == [{"name": "변경됨"}]
+
+
+class TestConstraints:
+    """제약조건 오류 테스트"""
+
+    def test_unique_violation(self, client, sample_employee):
+        with pytest.raises(APIError) as exc:
+            client.table("employees").insert(sample_employee).execute()
+        assert exc.value.code == "23505"
+
+    def test_bulk_insert_is_atomic(self, client, sample_employee):
+        new = dict(sample_employee, employee_no="E9000")
+        with pytest.raises(APIError):
+            client.table("employees").insert([new, sample_employee]).execute()
+        assert client.table("employees").select("id").eq("employee_no", "E9000").execute().data == []
+
+    def test_unknown_column_rejected(self, client):
+        with pytest.raises(APIError) as exc:
+            client.table("employees").select("*").eq("name; DROP TABLE employees", "x").execute()
+        assert exc.value.code == "42703"
+
+
+class TestSelectParser:
+    def test_nested_embedding(self):
+        items = parse_select("id, main:employees!fk_main(name, contact:emergency_contacts(phone_mobile))")
+        assert items[0] == {"alias": "id", "column": "id"}
+        assert items[1]["table"] == "employees"
+        assert items[1]["hint"] == "fk_main"
+        assert items[1]["children"][1]["alias"] == "contact"
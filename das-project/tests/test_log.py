@@ -1,8 +1,12 @@
 """
 당직근무일지 기능 테스트
 """
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
+from services import instrumentation, log_service
+
 
 class TestLogCRUD:
     def test_placeholder(self):
@@ -18,3 +22,38 @@ class TestLogCRUD:
     def test_rejection_with_reason(self):
         """[통합] 부결 시 사유 기록"""
         pytest.skip("Phase 4에서 구현")
+
+
+class TestSaveLog:
+    """일지 저장 upsert (로컬 백엔드)"""
+
+    @staticmethod
+    def _log(**overrides) -> dict:
+        return dict({"log_date": "2025-03-15", "factory": "창원1공장", "duty_type": "주간",
+                     "main_duty_id": None, "sub_duty_id": None, "issues": "없음"}, **overrides)
+
+    def test_single_request(self, local_db):
+        instrumentation.reset()
+        saved = log_service.save_log(self._log())
+        assert [r["operation"] for r in instrumentation.get_records() if not r["cached"]] == ["upsert"]
+        assert (saved["approval_status"], saved["issues"]) == ("작성중", "없음")
+
+    def test_resave_updates_same_row(self, local_db):
+        first = log_service.save_log(self._log())
+        second = log_service.save_log(self._log(issues="누수 조치"))
+        assert second["id"] == first["id"]
+        assert [r["issues"] for r in local_db.select("duty_logs")] == ["누수 조치"]
+
+    def test_approved_log_is_not_reset(self, local_db):
+        saved = log_service.save_log(self._log())
+        log_service.request_approval(saved["id"])
+        log_service.approve_log(saved["id"])
+        resaved = log_service.save_log(self._log(special_notes="추가", approval_status="작성중"))
+        assert (resaved["approval_status"], resaved["special_notes"]) == ("승인", "추가")
+        assert resaved["approved_at"] is not None
+
+    def test_concurrent_saves_do_not_conflict(self, local_db):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            saved = list(executor.map(lambda i: log_service.save_log(self._log(issues=f"저장{i}")), range(4)))
+        assert len({row["id"] for row in saved}) == 1
+        assert len(local_db.select("duty_logs")) == 1
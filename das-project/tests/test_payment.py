@@ -1,7 +1,14 @@
 """
 당직비 계산 테스트
 """
+import random
+import time
+from datetime import date
+
 import pytest
+from config import DUTY_PAYMENT_RATES
+from services import change_service, duty_calendar, instrumentation, payment_service
+from services.payment_service import duty_rate
 
 
 class TestPaymentCalculation:
@@ -18,3 +25,207 @@ class TestPaymentCalculation:
     def test_business_unit_subtotals(self):
         """[통합] 사업부별 소계/합계 일치"""
         pytest.skip("Phase 5에서 구현")
+
+
+class TestDutyRate:
+    """당직 달력 기준 당직비"""
+
+    def test_saturday_patterns(self):
+        assert duty_rate("2025-03-08", "야간", "평일") == DUTY_PAYMENT_RATES["weekday_night"]   # 2주 토요일
+        assert duty_rate("2025-03-29", "주간", "휴무일") == DUTY_PAYMENT_RATES["holiday_day"]   # 5주 토요일
+        assert duty_rate("2025-03-03", "야간", "평일") == DUTY_PAYMENT_RATES["holiday_night"]   # 대체공휴일
+
+    def test_shift_not_in_calendar_uses_stored_category(self):
+        assert duty_rate("2025-03-08", "주간", "휴무일") == DUTY_PAYMENT_RATES["holiday_day"]
+
+
+def _employee(i: int, business_unit: str = "세탁기", factory: str = "창원1공장") -> dict:
+    return {"employee_no": f"E{i:05d}", "name": f"직원{i}", "business_unit": business_unit, "factory": factory}
+
+
+def _roster(duty_date: str, duty_type: str, day_category: str, main: tuple, sub: tuple, status="확정") -> list:
+    """발령 1건의 유효 명단 행 (main/sub: (id, 직원 정보))"""
+    base = {"duty_date": duty_date, "duty_type": duty_type, "day_category": day_category, "status": status}
+    return [dict(base, duty_role=role, employee_id=emp[0], employee=emp[1])
+            for role, emp in (("총당직", main), ("부당직", sub))]
+
+
+class TestPaymentEngine:
+    """컬럼 기반 계산 엔진"""
+
+    @pytest.fixture
+    def totals(self):
+        a = ("a", _employee(1))
+        b = ("b", _employee(2, "에어컨", "창원2공장"))
+        c = ("c", _employee(3, "에어컨", "창원2공장"))
+        rows = [
+            *_roster("2025-03-04", "야간", "평일", a, b),
+            *_roster("2025-03-09", "주간", "휴무일", a, c),
+            *_roster("2025-03-09", "야간", "휴무일", b, c, status="예정"),   # 제외
+            *_roster("2025-04-01", "야간", "평일", b, c, status="완료"),
+        ]
+        return payment_service.aggregate_payments(
+            payment_service.payment_frame(rows, date(2025, 3, 1), date(2025, 5, 1)),
+            payment_service._employee_frame(rows),
+        )
+
+    def test_employee_totals(self, totals):
+        employee = totals["employee"].set_index("employee_id")
+        weekday, holiday_day = DUTY_PAYMENT_RATES["weekday_night"], DUTY_PAYMENT_RATES["holiday_day"]
+        assert employee.loc["a", "amount"] == weekday + holiday_day
+        assert employee.loc["c", "duty_count"] == 2
+        assert employee.loc["b", "factory"] == "창원2공장"
+
+    def test_rollups(self, totals):
+        assert totals["business_unit"].loc["에어컨", "employees"] == 2
+        assert totals["factory"]["duty_count"].sum() == 6
+        assert list(totals["month"].index) == ["2025-03", "2025-04"]
+        assert totals["month"].loc["2025-04", "duty_count"] == 2
+
+    def test_year_of_thousands_is_fast(self):
+        rng = random.Random(7)
+        staff = [(f"id{i}", _employee(i, rng.choice(["세탁기", "에어컨", "청소기"]))) for i in range(3000)]
+        rows = [
+            row for s in duty_calendar.shifts(date(2025, 1, 1), date(2025, 12, 31))
+            for row in _roster(s["duty_date"], s["duty_type"], s["day_category"], *rng.sample(staff, 2))
+        ]
+        start = time.perf_counter()
+        totals = payment_service.aggregate_payments(
+            payment_service.payment_frame(rows, date(2025, 1, 1), date(2026, 1, 1)),
+            payment_service._employee_frame(rows),
+        )
+        assert time.perf_counter() - start < 0.5
+        assert totals["month"]["duty_count"].sum() == len(rows)
+
+
+class TestCalculatePayments:
+    """DB 연동 (로컬 백엔드)"""
+
+    def test_monthly_rows(self, local_db, sample_employee, sample_assignment):
+        main = local_db.insert("employees", dict(sample_employee, grade=1))[0]
+        sub = local_db.insert("employees", dict(sample_employee, employee_no="E9998", grade=4))[0]
+        local_db.insert("duty_assignments", dict(sample_assignment, main_duty_id=main["id"], sub_duty_id=sub["id"],
+                                                 status="확정"))
+        payments = payment_service.calculate_monthly_payments(2025, 3)
+        assert [p["employee"]["employee_no"] for p in payments] == ["E9998", "E9999"]
+        assert {p["amount"] for p in payments} == {DUTY_PAYMENT_RATES["holiday_day"]}
+        assert payment_service.calculate_monthly_payments(2025, 4) == []
+
+
+class TestPaymentSnapshot:
+    """duty_payments 스냅샷 (로컬 백엔드)"""
+
+    @pytest.fixture
+    def staff(self, local_db, sample_employee):
+        payment_service.register_listeners()
+        main = local_db.insert("employees", dict(sample_employee, grade=1))[0]
+        sub = local_db.insert("employees", dict(sample_employee, employee_no="E9998", grade=4))[0]
+        return local_db, main, sub
+
+    def _snapshot(self, db):
+        payment_service.flush_pending()  # 쓰기 시에는 대기만, 조회 시 갱신
+        return {r["employee_id"]: r for r in db.select("duty_payments", filters=[("eq", "payment_month", "2025-03")])}
+
+    def test_status_change_refreshes_affected_employees(self, staff, sample_assignment):
+        db, main, sub = staff
+        asmt = db.insert("duty_assignments", dict(sample_assignment, main_duty_id=main["id"], sub_duty_id=sub["id"]))[0]
+        assert self._snapshot(db) == {}  # 예정은 미지급 대상
+        db.update("duty_assignments", asmt["id"], {"status": "확정"})
+        snapshot = self._snapshot(db)
+        assert {k: (r["duty_count"], r["amount"]) for k, r in snapshot.items()} == {
+            main["id"]: (1, DUTY_PAYMENT_RATES["holiday_day"]), sub["id"]: (1, DUTY_PAYMENT_RATES["holiday_day"]),
+        }
+
+    def test_change_removes_unpaid_rows_keeps_paid(self, staff, sample_assignment):
+        db, main, sub = staff
+        asmt = db.insert("duty_assignments", dict(sample_assignment, main_duty_id=main["id"], sub_duty_id=sub["id"],
+                                                  status="확정"))[0]
+        paid = self._snapshot(db)[main["id"]]
+        db.update("duty_payments", paid["id"], {"payment_status": "지급완료"})
+        change_service.create_change({
+            "assignment_id": asmt["id"], "original_employee_id": sub["id"], "new_employee_id": main["id"],
+            "duty_role": "부당직", "change_reason": "출장",
+        }, check_conflicts=False)  # 같은 직원 이중 배정 (스냅샷 갱신만 확인)
+        snapshot = self._snapshot(db)
+        assert list(snapshot) == [main["id"]]
+        assert snapshot[main["id"]]["payment_status"] == "지급완료"
+
+    def test_substitute_is_paid(self, staff, sample_employee, sample_assignment):
+        db, main, sub = staff
+        other = db.insert("employees", dict(sample_employee, employee_no="E9997", grade=4))[0]
+        asmt = db.insert("duty_assignments", dict(sample_assignment, main_duty_id=main["id"], sub_duty_id=sub["id"],
+                                                  status="확정"))[0]
+        change_service.register_change(asmt["id"], "부당직", "E9997", "출장")  # 발령 상태 → 변경
+        assert set(self._snapshot(db)) == {main["id"], other["id"]}
+        assert {p["employee_id"] for p in payment_service.calculate_monthly_payments(2025, 3)} == {
+            main["id"], other["id"]}
+
+    def test_write_only_marks_month(self, staff, sample_assignment):
+        db, main, sub = staff
+        asmt = db.insert("duty_assignments", dict(sample_assignment, main_duty_id=main["id"], sub_duty_id=sub["id"],
+                                                  status="확정"))[0]
+        instrumentation.reset()
+        db.update("duty_assignments", asmt["id"], {"status": "완료"})
+        assert [r["table"] for r in instrumentation.get_records() if not r["cached"]] == ["duty_assignments"]
+        payments = payment_service.get_monthly_payments(2025, 3)  # 조회 시 대기분 갱신
+        assert {p["employee_id"] for p in payments} == {main["id"], sub["id"]}
+        assert payment_service.refresh_errors() == {}
+
+    def test_refresh_failure_is_recorded_and_retried(self, staff, sample_assignment, monkeypatch):
+        db, main, sub = staff
+        db.insert("duty_assignments", dict(sample_assignment, main_duty_id=main["id"], sub_duty_id=sub["id"],
+                                           status="확정"))
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("연결 실패")
+
+        with monkeypatch.context() as m:
+            m.setattr(payment_service, "calculate_payments", fail)
+            assert payment_service.flush_pending() == {}
+        assert payment_service.refresh_errors() == {"2025-03": "연결 실패"}
+        assert payment_service.flush_pending()["2025-03"]["written"] == 2
+        assert payment_service.refresh_errors() == {}
+
+    def test_monthly_payments_read_snapshot(self, staff, sample_assignment):
+        db, main, sub = staff
+        db.insert("duty_assignments", dict(sample_assignment, main_duty_id=main["id"], sub_duty_id=sub["id"],
+                                           status="완료"))
+        payments = payment_service.get_monthly_payments(2025, 3)
+        assert payments == [
+            {k: p[k] for k in ("employee_id", "employee", "duty_count", "amount")} | {"payment_status": "미지급"}
+            for p in payment_service.calculate_monthly_payments(2025, 3)
+        ]
+
+
+class TestPaymentReport:
+    """월 보고서 공유 (로컬 백엔드)"""
+
+    @pytest.fixture
+    def month(self, local_db, sample_employee, sample_assignment):
+        payment_service.register_listeners()
+        main = local_db.insert("employees", dict(sample_employee, grade=1, factory="창원1공장"))[0]
+        sub = local_db.insert("employees", dict(sample_employee, employee_no="E9998", grade=4, factory="창원2공장"))[0]
+        asmt = local_db.insert("duty_assignments", dict(sample_assignment, main_duty_id=main["id"],
+                                                        sub_duty_id=sub["id"], status="확정"))[0]
+        payment_service.flush_pending()
+        return local_db, asmt
+
+    def test_consumers_share_one_computation(self, month):
+        instrumentation.reset()
+        report = payment_service.get_report(2025, 3)
+        assert payment_service.get_summary_by_business_unit(2025, 3) is report.business_units
+        assert payment_service.generate_excel_data(2025, 3) == report.to_excel()
+        assert [r["table"] for r in instrumentation.get_records() if not r["cached"]] == ["duty_payments"]
+
+    def test_factory_split(self, month):
+        factories = payment_service.get_report(2025, 3).factories
+        rate = DUTY_PAYMENT_RATES["holiday_day"]
+        assert factories["창원1공장"] == factories["창원2공장"] == {"count": 1, "amount": rate, "employees": 1}
+        assert factories["전체"]["amount"] == 2 * rate
+
+    def test_write_bumps_data_version(self, month):
+        db, asmt = month
+        report = payment_service.get_report(2025, 3)
+        db.update("duty_assignments", asmt["id"], {"status": "예정"})
+        assert payment_service.get_report(2025, 3) is not report
+        assert payment_service.get_report(2025, 3).payments == []
@@ -0,0 +1,120 @@
+"""
+당직 명단 일괄 생성 테스트
+- 메모리 배정 (LAST 사번 다음 순번부터 순환)
+- 일괄 저장 1회
+"""
+import time
+from datetime import date
+
+import pytest
+from services import duty_calendar, roster_service
+from services.conflict_index import ConflictIndex
+from services.eligibility import EligibilityPools
+
+
+def _staff(counts: dict) -> list:
+    """직급별 인원 → 직원 목록 (사번: G{직급}{순번})"""
+    return [{"id": f"G{grade}{i}", "employee_no": f"G{grade}{i:03d}", "grade": grade, "is_active": True}
+            for grade, count in counts.items() for i in range(count)]
+
+
+@pytest.fixture
+def pools():
+    # 휴무일 총당직: 1,2급 / 평일 총당직: 2급 / 부당직: 3,4급
+    return EligibilityPools(_staff({1: 1, 2: 2, 3: 2, 4: 2}))
+
+
+class TestPlanRoster:
+    """메모리 배정 테스트"""
+
+    def test_slots_per_day(self, pools):
+        # 2025-03-07(금) ~ 03-10(월): 2주 토요일은 야간 1회, 일요일은 주간+야간
+        rows = roster_service.plan_roster(date(2025, 3, 7), date(2025, 3, 10), pools, {})
+        assert [(r["duty_date"], r["duty_type"], r["day_category"]) for r in rows] == [
+            ("2025-03-07", "야간", "평일"), ("2025-03-08", "야간", "평일"),
+            ("2025-03-09", "주간", "휴무일"), ("2025-03-09", "야간", "휴무일"),
+            ("2025-03-10", "야간", "평일"),
+        ]
+        assert rows[1]["day_of_week"] == "토"
+
+    def test_public_holiday_slots(self, pools):
+        # 2025-03-03(월) 대체공휴일 → 휴무일 주간+야간
+        rows = roster_service.plan_roster(date(2025, 3, 3), date(2025, 3, 3), pools, {})
+        assert [(r["duty_type"], r["day_category"]) for r in rows] == [("주간", "휴무일"), ("야간", "휴무일")]
+
+    def test_rotation_continues_after_last(self, pools):
+        pointers = {("총당직", "휴무일"): "G2000"}
+        rows = roster_service.plan_roster(date(2025, 3, 1), date(2025, 3, 2), pools, pointers)
+        assert [r["main_duty_id"] for r in rows] == ["G21", "G10", "G20", "G21"]
+        assert [r["sub_duty_id"] for r in rows] == ["G30", "G31", "G40", "G41"]
+
+    def test_departed_last_continues_in_order(self, pools):
+        # LAST 사번(G2005)이 풀에 없어도 사번순 다음 직원부터
+        rows = roster_service.plan_roster(date(2025, 3, 4), date(2025, 3, 5), pools, {("부당직", "평일"): "G3005"})
+        assert [r["sub_duty_id"] for r in rows] == ["G40", "G41"]
+
+    def test_empty_pool_raises(self):
+        with pytest.raises(ValueError):
+            roster_service.plan_roster(date(2025, 3, 3), date(2025, 3, 3), EligibilityPools(_staff({1: 1, 3: 1})), {})
+
+    def test_full_year_is_fast(self):
+        big = EligibilityPools(_staff({1: 500, 2: 500, 3: 500, 4: 500}))
+        start = time.perf_counter()
+        rows = roster_service.plan_roster(date(2025, 1, 1), date(2025, 12, 31), big, {})
+        assert time.perf_counter() - start < 0.5
+        assert len(rows) == len(duty_calendar.shifts(date(2025, 1, 1), date(2025, 12, 31)))
+
+
+    def test_filled_slot_does_not_take_a_turn(self):
+        pools = EligibilityPools(_staff({1: 1, 2: 4, 3: 4}))
+        work = ConflictIndex().scratch()
+        work.set_assignment({"id": "a1", "duty_date": "2025-03-04", "duty_type": "야간", "day_category": "평일",
+                             "main_duty_id": "G23", "sub_duty_id": "G33"})
+        rows = roster_service.plan_roster(date(2025, 3, 4), date(2025, 3, 7), pools, {}, conflicts=work)
+        assert [r["duty_date"] for r in rows] == ["2025-03-05", "2025-03-06", "2025-03-07"]
+        assert [r["main_duty_id"] for r in rows] == ["G20", "G21", "G22"]
+
+
+class TestGenerateRoster:
+    """DB 연동 테스트 (로컬 백엔드)"""
+
+    @pytest.fixture
+    def staff(self, local_db, sample_employee):
+        rows = [dict(sample_employee, employee_no=f"E{grade}{i}", grade=grade)
+                for grade in (1, 2, 3, 4) for i in range(2)]
+        local_db.bulk_upsert("employees", rows)
+        return local_db
+
+    def test_month_written_in_one_bulk_call(self, staff, monkeypatch):
+        calls = []
+        real = staff.bulk_upsert
+        monkeypatch.setattr(staff, "bulk_upsert", lambda *a, **k: calls.append(a[0]) or real(*a, **k))
+        result = roster_service.generate_month(2025, 3)
+        assert calls == ["duty_assignments"]
+        # 2025년 3월: 평일 야간 20 + 2·4주 토요일 야간 2 + 휴무일 9일 x 2
+        assert result["written"] == len(result["rows"]) == 40
+        assert staff.count("duty_assignments") == 40
+
+    def test_existing_slots_are_kept(self, staff):
+        roster_service.generate_roster(date(2025, 3, 1), date(2025, 3, 1), status="확정")
+        result = roster_service.generate_month(2025, 3)
+        assert result["written"] == 38
+        kept = staff.select("duty_assignments", filters=[("eq", "duty_date", "2025-03-01")])
+        assert {r["status"] for r in kept} == {"확정"}
+
+    def test_partially_filled_month_keeps_turns(self, staff):
+        # 03-04(화) 야간이 이미 발령됨 → 그 슬롯은 계산/저장하지 않고 순번도 넘기지 않음
+        preview = roster_service.generate_roster(date(2025, 3, 4), date(2025, 3, 7), dry_run=True)["rows"]
+        roster_service.generate_roster(date(2025, 3, 4), date(2025, 3, 4), status="확정")
+        result = roster_service.generate_roster(date(2025, 3, 4), date(2025, 3, 7))
+        assert [r["duty_date"] for r in result["rows"]] == ["2025-03-05", "2025-03-06", "2025-03-07"]
+        assert result["written"] == len(result["rows"])
+        stored = {r["duty_date"]: r["main_duty_id"] for r in staff.select("duty_assignments")}
+        assert [stored[r["duty_date"]] for r in result["rows"]] == [r["main_duty_id"] for r in preview[1:]]
+
+    def test_rotation_follows_last_confirmed(self, staff):
+        first = roster_service.generate_roster(date(2025, 3, 1), date(2025, 3, 1), status="확정")
+        second = roster_service.generate_roster(date(2025, 3, 15), date(2025, 3, 15), dry_run=True)
+        assert second["written"] == 0
+        last_main = first["rows"][-1]["main_duty_id"]
+        assert second["rows"][0]["main_duty_id"] != last_main
@@ -0,0 +1,106 @@
+"""
+유효 명단 (duty_roster_effective) 테스트 (로컬 백엔드)
+- 발령/변경 쓰기 시 트리거 갱신 (변경 등록은 증분, 변경 수정/삭제는 재계산)
+- 재계산 RPC, 일지/알림/당직비가 같은 실제 당직자를 사용
+"""
+from datetime import date
+
+import pytest
+
+from services import assignment_service, change_service, log_service, notification_service
+
+
+@pytest.fixture
+def duty(local_db, sample_employee, sample_assignment):
+    staff = {no: local_db.insert("employees", dict(sample_employee, employee_no=no, name=no, grade=grade))[0]
+             for no, grade in (("M1", 1), ("M2", 1), ("S1", 4), ("S2", 4), ("S3", 4))}
+    asmt = local_db.insert("duty_assignments", dict(sample_assignment, main_duty_id=staff["M1"]["id"],
+                                                    sub_duty_id=staff["S1"]["id"], status="확정"))[0]
+    return local_db, staff, asmt
+
+
+def _holders(db, asmt_id: str) -> dict:
+    return {r["duty_role"]: r for r in db.select(assignment_service.EFFECTIVE_TABLE, use_cache=False,
+                                                 filters=[("eq", "assignment_id", asmt_id)])}
+
+
+def _employee_ids(db, asmt_id: str) -> dict:
+    return {role: row["employee_id"] for role, row in _holders(db, asmt_id).items()}
+
+
+class TestEffectiveTriggers:
+    def test_insert_uses_rostered(self, duty):
+        db, staff, asmt = duty
+        holders = _holders(db, asmt["id"])
+        assert {r: h["employee_id"] for r, h in holders.items()} == {"총당직": staff["M1"]["id"], "부당직": staff["S1"]["id"]}
+        assert {(h["duty_date"], h["status"], h["change_id"]) for h in holders.values()} == {("2025-03-15", "확정", None)}
+
+    def test_change_moves_holder_and_keeps_rostered(self, duty):
+        db, staff, asmt = duty
+        change = change_service.register_change(asmt["id"], "부당직", "S2", "출장")
+        holder = _holders(db, asmt["id"])["부당직"]
+        assert (holder["employee_id"], holder["rostered_employee_id"]) == (staff["S2"]["id"], staff["S1"]["id"])
+        assert (holder["change_id"], holder["status"]) == (change["id"], "변경")
+        # 편성 원본 수정: 변경된 역할은 실제 당직자 유지, 변경 없는 역할은 새 원본
+        db.update("duty_assignments", asmt["id"], {"main_duty_id": staff["M2"]["id"], "sub_duty_id": staff["S3"]["id"]})
+        assert _employee_ids(db, asmt["id"]) == {"총당직": staff["M2"]["id"], "부당직": staff["S2"]["id"]}
+
+    def test_last_change_wins_and_delete_recomputes(self, duty):
+        db, staff, asmt = duty
+        change_service.register_change(asmt["id"], "부당직", "S2", "출장")
+        last = change_service.register_change(asmt["id"], "부당직", "S3", "교육")
+        assert _employee_ids(db, asmt["id"])["부당직"] == staff["S3"]["id"]
+        db.delete("duty_changes", last["id"])
+        assert _employee_ids(db, asmt["id"])["부당직"] == staff["S2"]["id"]
+
+    def test_assignment_delete_cascades(self, duty):
+        db, staff, asmt = duty
+        db.delete("duty_assignments", asmt["id"])
+        assert db.select(assignment_service.EFFECTIVE_TABLE, use_cache=False) == []
+
+    def test_rebuild(self, duty):
+        db, staff, asmt = duty
+        change_service.register_change(asmt["id"], "총당직", "M2", "출장")
+        expected = _holders(db, asmt["id"])
+        assert assignment_service.rebuild_effective_roster() == 2
+        rebuilt = _holders(db, asmt["id"])
+        assert {r: (h["employee_id"], h["change_id"]) for r, h in rebuilt.items()} == {
+            r: (h["employee_id"], h["change_id"]) for r, h in expected.items()}
+
+    def test_rebuild_after_chained_bulk_change(self, duty):
+        db, staff, asmt = duty
+        written = change_service.apply_bulk_changes([
+            {"assignment_id": asmt["id"], "duty_role": "부당직", "change_reason": "출장",
+             "new_employee_id": staff[new]["id"], "original_employee_id": staff[old]["id"]}
+            for old, new in (("S1", "S2"), ("S2", "S3"))
+        ])["written"]
+        # PostgreSQL은 한 트랜잭션의 created_at(now())이 같음 → 입력 순서(seq)로 마지막 변경 판단
+        db.get_client().execute("UPDATE duty_changes SET created_at = '2025-03-01T00:00:00+00:00'")
+        assert written[0]["seq"] < written[1]["seq"]
+        assignment_service.rebuild_effective_roster()
+        holder = _holders(db, asmt["id"])["부당직"]
+        assert (holder["employee_id"], holder["change_id"]) == (staff["S3"]["id"], written[1]["id"])
+        db.delete("duty_changes", written[0]["id"])
+        assert _employee_ids(db, asmt["id"])["부당직"] == staff["S3"]["id"]
+
+
+class TestEffectiveConsumers:
+    def test_roster_query_by_employee(self, duty):
+        db, staff, asmt = duty
+        change_service.register_change(asmt["id"], "부당직", "S2", "출장")
+        rows = assignment_service.get_effective_roster("2025-03-01", "2025-04-01", employee_ids=[staff["S2"]["id"]])
+        assert [(r["duty_role"], r["employee"]["employee_no"]) for r in rows] == [("부당직", "S2")]
+        assert assignment_service.get_effective_roster("2025-03-01", "2025-04-01", employee_ids=[staff["S1"]["id"]]) == []
+
+    def test_log_records_actual_holders(self, duty):
+        db, staff, asmt = duty
+        change_service.register_change(asmt["id"], "부당직", "S2", "출장")
+        log_service.save_log({"log_date": "2025-03-15", "factory": "창원1공장", "duty_type": "주간", "issues": ""})
+        log = db.select("duty_logs")[0]
+        assert (log["main_duty_id"], log["sub_duty_id"]) == (staff["M1"]["id"], staff["S2"]["id"])
+
+    def test_reminder_defaults_to_actual_holders(self, duty):
+        db, staff, asmt = duty
+        change_service.register_change(asmt["id"], "총당직", "M2", "출장")
+        result = notification_service.send_duty_reminder(date(2025, 3, 15))
+        assert result["recipients"] == ["M2", "S1"]
@@ -0,0 +1,98 @@
+"""
+공정 배정 테스트
+- 부하 균등 (휴무일 가중, 이력 반영)
+- 최소 간격 / 직급 대상 조건
+"""
+import time
+from collections import Counter
+from datetime import date
+
+import pytest
+from services import roster_service
+from services.eligibility import EligibilityPools
+from services.roster_solver import RosterSolver
+from tests.test_roster import _staff
+
+
+def _grade(emp_id: str) -> int:
+    return int(emp_id[1])
+
+
+def _days_between(rows: list) -> dict:
+    """직원 id → 당직일 목록"""
+    days = {}
+    for row in rows:
+        for field in ("main_duty_id", "sub_duty_id"):
+            days.setdefault(row[field], []).append(date.fromisoformat(row["duty_date"]))
+    return days
+
+
+@pytest.fixture
+def pools():
+    return EligibilityPools(_staff({1: 4, 2: 8, 3: 10, 4: 10}))
+
+
+@pytest.fixture
+def march():
+    return roster_service.build_slots(date(2025, 3, 1), date(2025, 3, 31))
+
+
+class TestSolve:
+    """공정 배정"""
+
+    def test_grade_eligibility(self, pools, march):
+        rows = RosterSolver(pools).solve(march)
+        for row in rows:
+            main, sub = _grade(row["main_duty_id"]), _grade(row["sub_duty_id"])
+            assert main in ((1, 2) if row["day_category"] == "휴무일" else (2,))
+            assert sub in (3, 4)
+
+    def test_min_rest_days(self, pools, march):
+        rows = RosterSolver(pools, min_rest_days=4).solve(march)
+        for days in _days_between(rows).values():
+            assert all((b - a).days >= 4 for a, b in zip(days, days[1:]))
+
+    def test_loads_balanced(self, pools, march):
+        solver = RosterSolver(pools, holiday_weight=1.5)
+        solver.solve(march)
+        sub_loads = [load for emp_id, load in solver.loads().items() if _grade(emp_id) in (3, 4)]
+        assert max(sub_loads) - min(sub_loads) <= 1.5
+
+    def test_history_shifts_load(self, pools):
+        # 최근 이력이 많은 직원은 뒤로 밀림
+        history = [{"duty_date": "2025-02-20", "day_category": "휴무일",
+                    "main_duty_id": "G10", "sub_duty_id": "G30"}]
+        rows = RosterSolver(pools, history=history).solve(roster_service.build_slots(date(2025, 3, 1), date(2025, 3, 1)))
+        assert "G10" not in (rows[0]["main_duty_id"], rows[1]["main_duty_id"])
+        assert "G30" not in (rows[0]["sub_duty_id"], rows[1]["sub_duty_id"])
+
+    def test_infeasible_spacing_raises(self, march):
+        small = EligibilityPools(_staff({1: 1, 2: 1, 3: 2}))
+        with pytest.raises(ValueError):
+            RosterSolver(small, min_rest_days=7).solve(march)
+
+    def test_full_year_thousands_of_employees(self):
+        big = EligibilityPools(_staff({1: 500, 2: 1000, 3: 1000, 4: 1000}))
+        slots = roster_service.build_slots(date(2025, 1, 1), date(2025, 12, 31))
+        start = time.perf_counter()
+        rows = RosterSolver(big).solve(slots)
+        assert time.perf_counter() - start < 3
+        assert len(rows) == len(slots)
+        assert max(Counter(r["sub_duty_id"] for r in rows).values()) == 1
+
+
+class TestGenerateFair:
+    """generate_roster(mode="fair") - 로컬 백엔드"""
+
+    def test_keeps_existing_and_fills_rest(self, local_db, sample_employee):
+        staff = [dict(sample_employee, employee_no=f"E{grade}{i}", grade=grade)
+                 for grade in (1, 2, 3, 4) for i in range(6)]
+        local_db.bulk_upsert("employees", staff)
+        first = roster_service.generate_roster(date(2025, 3, 1), date(2025, 3, 1), mode="fair")
+        result = roster_service.generate_month(2025, 3, mode="fair")
+        assert result["written"] == len(result["rows"]) == 40 - len(first["rows"])
+        assert local_db.count("duty_assignments") == 40
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            roster_service.generate_roster(date(2025, 3, 1), date(2025, 3, 1), mode="random")